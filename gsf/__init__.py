@@ -3,9 +3,71 @@ Created on Feb 1, 2016
 
 @author: elefebvre
 '''
+import os as _os
+import sys as _sys
+from importlib import import_module as _import_module
 
-# Define the gsf implementation you want to use here.
-from .ese.server import Server
-from .ese.service import Service
-from .ese.task import Task
-from .ese.job import Job
+#: Environment variable naming the backend selected when gsf is imported.
+BACKEND_ENVIRONMENT_VARIABLE = 'GSF_BACKEND'
+
+_NAMES = ('Server', 'Service', 'Task', 'Job', 'wait_all', 'wait_any', 'as_completed')
+
+# The implementations of the gsf classes, by backend name. The implementation modules are
+# imported on first use of one of their names, so that importing gsf itself is cheap.
+_BACKENDS = dict(
+    ese=dict(Server='.ese.server', Service='.ese.service', Task='.ese.task', Job='.ese.job',
+             wait_all='.ese.job', wait_any='.ese.job', as_completed='.ese.job'),
+    local=dict((name, '.local') for name in _NAMES),
+)
+
+# The asyncio flavour of the implementation requires Python 3.5 or later.
+if _sys.version_info >= (3, 5):
+    _BACKENDS['ese'].update(AsyncServer='.ese.aio', AsyncService='.ese.aio',
+                            AsyncTask='.ese.aio', AsyncJob='.ese.aio')
+
+_implementation = _BACKENDS['ese']
+
+
+def use(backend):
+    """
+    Selects the implementation of the gsf classes.
+
+    Names imported from gsf before the call, e.g. with ``from gsf import Server``, keep
+    referring to the previous implementation.
+
+    :param backend: ``ese`` to run tasks on a GSF server, the default, or ``local`` to run
+        task functions registered with :func:`gsf.local.register` in a local process pool.
+    :return: None
+    """
+    global _implementation, __all__
+    try:
+        implementation = _BACKENDS[backend]
+    except KeyError:
+        raise ValueError('Unknown gsf backend {!r}, expected one of {}'.format(
+            backend, ', '.join(sorted(_BACKENDS))))
+    module_globals = globals()
+    for name in _implementation:
+        module_globals.pop(name, None)
+    _implementation = implementation
+    __all__ = sorted(_implementation) + ['use']
+    if _sys.version_info < (3, 7):
+        for name in _implementation:
+            __getattr__(name)
+
+
+def __getattr__(name):
+    try:
+        module = _implementation[name]
+    except KeyError:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(_import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_implementation))
+
+
+# Module __getattr__ requires Python 3.7 or later; before that use() imports everything up front.
+use(_os.environ.get(BACKEND_ENVIRONMENT_VARIABLE) or 'ese')
@@ -0,0 +1,188 @@
+"""
+Defines a thread-safe, size-bounded cache with optional expiry, used to cache server responses.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+#: Default maximum number of entries held by a cache.
+DEFAULT_MAXSIZE = 128
+
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'evictions', 'size'])
+
+_MISSING = object()
+
+
+class _Pending(object):
+    """A value that is being computed by one thread while others wait for it."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._value = None
+        self._error = None
+
+    def set_value(self, value):
+        self._value = value
+        self._event.set()
+
+    def set_error(self, error):
+        self._error = error
+        self._event.set()
+
+    def wait(self):
+        self._event.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class SingleFlight(object):
+    """
+    Merges concurrent calls made with the same key into one: while a call is in progress, other
+    callers with the same key wait for it and receive its result, or its exception, instead of
+    making their own. Calls made after it has finished run again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.merged = 0
+
+    def call(self, key, func, share=None):
+        """
+        Returns the result of *func*, shared with every concurrent call for *key*.
+
+        :param share: A function returning the copy of the result handed to each waiting
+            caller, such as copy.deepcopy, or None to hand them the result itself.
+        """
+        with self._lock:
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = _Pending()
+            else:
+                self.merged += 1
+        if not owner:
+            value = pending.wait()
+            return value if share is None else share(value)
+
+        try:
+            value = func()
+        except BaseException as err:
+            with self._lock:
+                del self._pending[key]
+            pending.set_error(err)
+            raise
+        with self._lock:
+            del self._pending[key]
+        pending.set_value(value)
+        return value
+
+
+class LRUCache(object):
+    """
+    A thread-safe least-recently-used cache whose entries can expire.
+
+    When several threads miss on the same key at once, :meth:`get_or_set` computes the value
+    only once and hands it to every waiting thread.
+
+    :param maxsize: The maximum number of entries, or None for no limit.
+    :param ttl: Seconds an entry stays valid, or None to keep entries until evicted.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._hits = self._misses = self._evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key, count=False) is not _MISSING
+
+    @property
+    def stats(self):
+        """
+        The hit, miss and eviction counts and the current number of entries.
+
+        :return: a CacheStats named tuple
+        """
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries))
+
+    def get(self, key, default=None):
+        """Returns the value cached for *key*, or *default* if there is none."""
+        with self._lock:
+            value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key, value):
+        """Caches *value* for *key*, evicting the least recently used entry if the cache is full."""
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_set(self, key, func):
+        """
+        Returns the value cached for *key*, calling *func* to compute it on a miss.
+
+        Concurrent misses on the same key wait for a single call of *func*. If *func* raises,
+        every waiting caller receives the exception and nothing is cached.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = _Pending()
+        if not owner:
+            return pending.wait()
+
+        try:
+            value = func()
+        except BaseException as err:
+            with self._lock:
+                del self._pending[key]
+            pending.set_error(err)
+            raise
+        with self._lock:
+            self._store(key, value)
+            del self._pending[key]
+        pending.set_value(value)
+        return value
+
+    def invalidate(self, key=_MISSING):
+        """Removes the entry for *key*, or every entry if no key is given."""
+        with self._lock:
+            if key is _MISSING:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _lookup(self, key, count=True):
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires = entry
+            if expires is None or expires > time.time():
+                self._entries[key] = self._entries.pop(key)
+                if count:
+                    self._hits += 1
+                return value
+            del self._entries[key]
+        if count:
+            self._misses += 1
+        return _MISSING
+
+    def _store(self, key, value):
+        expires = None if self.ttl is None else time.time() + self.ttl
+        self._entries.pop(key, None)
+        self._entries[key] = (value, expires)
+        while self.maxsize is not None and len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
@@ -2,16 +2,154 @@
 Contains utility decorator objects
 """
 import functools
+import threading
+import warnings
+import weakref
+
+from .cache import LRUCache, CacheStats, DEFAULT_MAXSIZE
+
+
+def cached(maxsize=DEFAULT_MAXSIZE, ttl=None):
+    """
+    Decorator function caches the return value of a method based on its input arguments.
+
+    Each instance gets its own :class:`gsf.cache.LRUCache`, held weakly so the cache never keeps
+    the instance alive. See :class:`CachedMethod` for invalidation and statistics.
+
+    :param maxsize: The maximum number of entries cached per instance, or None for no limit.
+    :param ttl: Seconds a cached value stays valid, or None to keep it until invalidated.
+    """
+    def decorator(func):
+        return CachedMethod(func, maxsize, ttl)
+    return decorator
 
 
 def memoize(obj):
-    """Decorator function caches the return value of a function based on its input arguments."""
-    cache = obj.cache = {}
+    """
+    Decorator function caches the return value of a function based on its input arguments.
+
+    The values are kept in an unbounded :class:`gsf.cache.LRUCache`, available as the ``cache``
+    attribute of the decorated function, and shared by every caller, including every instance
+    of a class when a method is decorated.
+
+    .. deprecated::
+        Use :func:`cached`, which bounds and expires the cache of each instance.
+    """
+    warnings.warn('gsf.decorators.memoize is deprecated, use gsf.decorators.cached instead',
+                  DeprecationWarning, stacklevel=2)
+    cache = LRUCache(maxsize=None)
 
     @functools.wraps(obj)
     def memoizer(*args, **kwargs):
         """Decorator function caches the return value of a function based on its input arguments."""
-        if args not in cache:
-            cache[args] = obj(*args, **kwargs)
-        return cache[args]
+        return cache.get_or_set(_make_key(args, kwargs), lambda: obj(*args, **kwargs))
+    memoizer.cache = cache
     return memoizer
+
+
+class CachedMethod(object):
+    """
+    A method whose return values are cached per instance and per arguments.
+
+    Accessed through an instance, the method is bound to that instance's cache, so
+    ``obj.method.invalidate()`` clears the values cached for ``obj`` only. Accessed through the
+    class, :meth:`invalidate` and :attr:`stats` apply to every instance.
+    """
+
+    def __init__(self, func, maxsize=DEFAULT_MAXSIZE, ttl=None):
+        functools.update_wrapper(self, func)
+        self._func = func
+        self.maxsize = maxsize
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._caches = weakref.WeakKeyDictionary()
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return _BoundCachedMethod(self, instance)
+
+    def __call__(self, instance, *args, **kwargs):
+        return self.cache(instance).get_or_set(
+            _make_key(args, kwargs), lambda: self._func(instance, *args, **kwargs))
+
+    @property
+    def ttl(self):
+        """Seconds a cached value stays valid. Setting it updates every instance's cache."""
+        return self._ttl
+
+    @ttl.setter
+    def ttl(self, ttl):
+        with self._lock:
+            self._ttl = ttl
+            for cache in self._caches.values():
+                cache.ttl = ttl
+
+    @property
+    def stats(self):
+        """
+        The cache statistics summed over every instance.
+
+        :return: a gsf.cache.CacheStats named tuple
+        """
+        with self._lock:
+            caches = list(self._caches.values())
+        return CacheStats(*[sum(values) for values in zip((0, 0, 0, 0),
+                                                          *[cache.stats for cache in caches])])
+
+    def cache(self, instance):
+        """Returns the LRUCache holding the values cached for *instance*."""
+        with self._lock:
+            cache = self._caches.get(instance)
+            if cache is None:
+                cache = self._caches[instance] = LRUCache(self.maxsize, self._ttl)
+            return cache
+
+    def seed(self, instance, value, *args, **kwargs):
+        """Caches *value* as the result of calling the method on *instance* with the arguments."""
+        self.cache(instance).set(_make_key(args, kwargs), value)
+
+    def invalidate(self, instance=None):
+        """Discards the values cached for *instance*, or for every instance if it is None."""
+        with self._lock:
+            if instance is None:
+                caches = list(self._caches.values())
+            else:
+                caches = [self._caches[instance]] if instance in self._caches else []
+        for cache in caches:
+            cache.invalidate()
+
+
+class _BoundCachedMethod(object):
+    """A CachedMethod bound to one instance."""
+
+    __slots__ = ('_method', '_instance')
+
+    def __init__(self, method, instance):
+        self._method = method
+        self._instance = instance
+
+    def __call__(self, *args, **kwargs):
+        return self._method(self._instance, *args, **kwargs)
+
+    @property
+    def stats(self):
+        """The cache statistics of the bound instance."""
+        return self._method.cache(self._instance).stats
+
+    def seed(self, value, *args, **kwargs):
+        """Caches *value* as the result of calling the bound method with the arguments."""
+        self._method.seed(self._instance, value, *args, **kwargs)
+
+    def invalidate(self):
+        """Discards the values cached for the bound instance."""
+        self._method.invalidate(self._instance)
+
+
+_KWARGS_MARK = object()
+
+
+def _make_key(args, kwargs):
+    if kwargs:
+        return args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    return args
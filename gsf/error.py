@@ -66,3 +66,56 @@ class JobNotFoundError(Exception):
     """
     pass
 
+
+class JobTimeoutError(Exception):
+    """Exception gets raised when a job is not done before the timeout passed to wait_for_done.
+
+    :Example:
+
+    >>> from gsf import Server
+    >>> server = Server('localhost','9191')
+    >>> job = server.job(42)
+    >>> job.wait_for_done(timeout=0.5)
+    # traceback information
+    gsf.error.JobTimeoutError: Job not done after 0.5 seconds
+
+    """
+    pass
+
+
+class JobFailedError(Exception):
+    """Exception gets raised when the result of a job is requested and the job has failed.
+    The message is the error message reported by the job.
+
+    :Example:
+
+    >>> from gsf import Server
+    >>> server = Server('localhost','9191')
+    >>> task = server.service('ENVI').task('SpectralIndex')
+    >>> future = task.submit_async(dict(INPUT_RASTER=dict(url='doesnotexist', factory='URLRaster')))
+    >>> future.result()
+    # traceback information
+    gsf.error.JobFailedError: Invalid value for parameter: INPUT_RASTER. Error: File: ...
+
+    """
+    pass
+
+
+class ParameterValidationError(Exception):
+    """Exception gets raised when job parameters do not match the task parameter definitions.
+    The errors attribute holds a gsf.ese.validation.ParameterError per problem found.
+
+    :Example:
+
+    >>> from gsf import Server
+    >>> server = Server('localhost','9191')
+    >>> task = server.service('ENVI').task('SpectralIndex')
+    >>> task.submit(dict(INDEX='doesnotexist'))
+    # traceback information
+    gsf.error.ParameterValidationError: Required parameter INPUT_RASTER is missing; INDEX must ...
+
+    """
+    def __init__(self, errors):
+        super(ParameterValidationError, self).__init__(
+            '; '.join(error.message for error in errors))
+        self.errors = list(errors)
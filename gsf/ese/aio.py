@@ -0,0 +1,599 @@
+"""
+Implements asyncio versions of the GSF classes for the ESE endpoints.
+
+Network calls are coroutines that share a small pool of keep-alive connections per host, so a
+single event loop can submit and track many jobs without a thread per request. Requires
+Python 3.5 or later.
+
+:Example:
+
+>>> import asyncio
+>>> from gsf import AsyncServer
+>>> async def run(parameters):
+...     async with AsyncServer('localhost', '9191') as server:
+...         task = server.service('ENVI').task('SpectralIndex')
+...         job = await task.submit(parameters)
+...         await job.wait_for_done()
+...         return await job.results
+>>> results = asyncio.get_event_loop().run_until_complete(run(parameters))
+"""
+import asyncio
+import time
+import weakref
+import zlib
+from io import BytesIO
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit, urlunparse
+
+from ..server import Server as BaseServer
+from ..service import Service as BaseService
+from ..task import Task as BaseTask
+from ..job import Job as BaseJob
+from ..error import (ServerNotFoundError, ServiceNotFoundError, TaskNotFoundError,
+                     JobNotFoundError, JobTimeoutError)
+from .http import (DEFAULT_POOL_SIZE, DEFAULT_IDLE_TIMEOUT, DEFAULT_MAX_LIFETIME,
+                   DEFAULT_TIMEOUT, ACCEPT_ENCODING, _DECODED_ENCODINGS, Decompressor,
+                   encode_request, get_codec, RequestEvent, _MAX_REDIRECTS, _RETRIED_METHODS,
+                   _STALE_ERRORS, _redirect)
+from . import http
+from .job import JobStatus, _STATUS_MAP, _build_result
+from .polling import (PollSchedule, DEFAULT_MIN_INTERVAL, DEFAULT_MAX_INTERVAL, DEFAULT_BACKOFF,
+                      DEFAULT_JITTER)
+from .arrays import encode_body
+from .task import _jobs_url, _parse_task_info
+from .validation import ParameterValidator
+
+# asyncio reports a connection closed before the end of a response as an IncompleteReadError.
+_ASYNC_STALE_ERRORS = _STALE_ERRORS + (asyncio.IncompleteReadError,)
+
+
+class _AsyncConnection(object):
+    """A stream pair along with its bookkeeping timestamps."""
+
+    __slots__ = ('reader', 'writer', 'created', 'last_used')
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.created = self.last_used = time.time()
+
+    def expired(self, now, idle_timeout, max_lifetime):
+        """Returns True if the connection has been idle or alive for too long."""
+        return (now - self.last_used > idle_timeout or
+                now - self.created > max_lifetime)
+
+    def dropped(self):
+        """Returns True if the server has closed the idle connection."""
+        return self.reader.at_eof() or self.writer.transport.is_closing()
+
+    def close(self):
+        """Closes the underlying socket."""
+        self.writer.close()
+
+
+class _LoopState(object):
+    """The idle connections, connection slots and shared GETs of a transport in one event loop."""
+
+    __slots__ = ('idle', 'slots', 'gets')
+
+    def __init__(self):
+        self.idle = {}
+        self.slots = {}
+        self.gets = {}
+
+
+class AsyncTransport(object):
+    """
+    An asyncio pool of persistent HTTP/1.1 connections, keyed by scheme and host.
+
+    At most *pool_size* connections are opened per host; further requests wait for one of them
+    to become free, so any number of coroutines are multiplexed over a bounded set of sockets.
+
+    Connections belong to the event loop they were opened in, so a transport used from several
+    loops, such as successive ``asyncio.run`` calls, keeps a separate pool for each of them.
+    Call :meth:`close` in each loop to close its connections.
+
+    :param pool_size: The maximum number of connections opened per host.
+    :param idle_timeout: Seconds an idle connection may stay in the pool.
+    :param max_lifetime: Seconds after which a connection is closed instead of reused.
+    :param timeout: Seconds allowed for a single request.
+    :param accept_compressed: If True, ask for gzip or deflate encoded responses.
+    :param compress_threshold: Request bodies of at least this many bytes are sent gzip
+        compressed, or None to never compress. See :class:`gsf.ese.http.Transport`.
+    :param codec: The JSON codec, or a codec name. See :func:`gsf.ese.http.get_codec`.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 max_lifetime=DEFAULT_MAX_LIFETIME, timeout=DEFAULT_TIMEOUT,
+                 accept_compressed=True, compress_threshold=None, codec=None):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.accept_compressed = accept_compressed
+        self.compress_threshold = compress_threshold
+        self.codec = get_codec(codec)
+        self._states = weakref.WeakKeyDictionary()
+
+    async def get(self, url):
+        """
+        Performs an ESE Rest HTTP GET command and returns the decoded JSON response.
+
+        Coroutines getting the same URL at the same time share a single request, and each
+        decodes its own document from the response.
+        """
+        gets = self._state().gets
+        future = gets.get(url)
+        if future is None:
+            future = gets[url] = asyncio.ensure_future(self.request('GET', url))
+            future.add_done_callback(lambda done: self._forget_get(gets, url, done))
+        return self.codec.loads(await asyncio.shield(future))
+
+    @staticmethod
+    def _forget_get(gets, url, future):
+        if gets.get(url) is future:
+            del gets[url]
+        if not future.cancelled():
+            # Every awaiting caller has received the exception; don't report it as unretrieved.
+            future.exception()
+
+    async def post(self, url, data):
+        """Performs an ESE Rest HTTP POST command and returns the decoded JSON response."""
+        headers = {
+            'Content-type': 'application/json; charset=UTF-8'
+            }
+        body = encode_body(data, self.codec)
+        if not isinstance(body, bytes):
+            body = b''.join(body)
+        return self.codec.loads(await self.request('POST', url, body, headers))
+
+    async def request(self, method, url, body=None, headers=None):
+        """
+        Sends a request over a pooled connection and returns the response body as bytes.
+
+        Redirects, errors and compressed responses are handled as by
+        :meth:`gsf.ese.http.Transport.send`.
+        """
+        body, headers = encode_request(body, headers, self.compress_threshold)
+        if self.accept_compressed:
+            headers.setdefault('Accept-Encoding', ACCEPT_ENCODING)
+        for _ in range(_MAX_REDIRECTS + 1):
+            status, reason, response_headers, data = await self._send(method, url, body, headers)
+            if response_headers.get('content-encoding', '').lower() in _DECODED_ENCODINGS:
+                data = _decompress(data)
+            redirect = _redirect(method, status, response_headers, headers)
+            if redirect is not None:
+                method, body, headers = redirect
+                url = urljoin(url, response_headers['location'])
+                continue
+            if status >= 400:
+                raise HTTPError(url, status, reason, response_headers, BytesIO(data))
+            return data
+        raise HTTPError(url, status, 'Too many redirects', response_headers, BytesIO(data))
+
+    async def close(self):
+        """Closes every idle connection held by the pool of the running event loop."""
+        state = self._state()
+        idle, state.idle = state.idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    async def _send(self, method, url, body, headers):
+        hooks = http._hooks
+        if not hooks:
+            return await self._exchange(method, url, body, headers)
+        start = time.time()
+        for hook in hooks:
+            hook.request_started(method, url)
+        status, data, error = None, b'', None
+        try:
+            status, reason, response_headers, data = await self._exchange(
+                method, url, body, headers)
+        except Exception as err:
+            error = err
+            raise
+        finally:
+            event = RequestEvent(method, url, status, time.time() - start, len(body or b''),
+                                 len(data), error)
+            for hook in hooks:
+                hook.request_finished(event)
+        return status, reason, response_headers, data
+
+    async def _exchange(self, method, url, body, headers):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path or '/'
+        if parts.query:
+            path = '?'.join((path, parts.query))
+        head = ['{} {} HTTP/1.1'.format(method, path),
+                'Host: {}'.format(parts.netloc),
+                'Accept: application/json']
+        for name, value in (headers or {}).items():
+            head.append('{}: {}'.format(name, value))
+        if body is not None:
+            head.append('Content-Length: {}'.format(len(body)))
+        message = '\r\n'.join(head).encode('latin-1') + b'\r\n\r\n' + (body or b'')
+
+        state = self._state()
+        slots = state.slots.get(key)
+        if slots is None:
+            slots = state.slots[key] = asyncio.Semaphore(self.pool_size)
+        async with slots:
+            connection, reused = await self._acquire(state, key)
+            response = None
+            try:
+                try:
+                    response = await asyncio.wait_for(
+                        self._roundtrip(connection, method, message), self.timeout)
+                except _ASYNC_STALE_ERRORS:
+                    # Retried as by gsf.ese.http.Transport.
+                    connection.close()
+                    if not reused or method not in _RETRIED_METHODS:
+                        raise
+                    connection = await self._connect(key)
+                    response = await asyncio.wait_for(
+                        self._roundtrip(connection, method, message), self.timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as err:
+                raise ServerNotFoundError(err)
+            finally:
+                # A connection left in the middle of an exchange, including by a cancellation,
+                # cannot carry another request.
+                if response is None:
+                    connection.close()
+
+            status, reason, response_headers, data, will_close = response
+            if will_close:
+                connection.close()
+            else:
+                self._release(state, key, connection)
+        return status, reason, response_headers, data
+
+    async def _roundtrip(self, connection, method, message):
+        connection.writer.write(message)
+        await connection.writer.drain()
+        reader = connection.reader
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Connection closed by server')
+        version, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(' ', 2) +
+                                   [''])[:3]
+        status = int(status)
+
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        will_close = (version == 'HTTP/1.0' or
+                      response_headers.get('connection', '').lower() == 'close')
+        if method == 'HEAD' or status in (204, 304):
+            data = b''
+        elif 'chunked' in response_headers.get('transfer-encoding', '').lower():
+            data = await _read_chunked(reader)
+        elif 'content-length' in response_headers:
+            data = await reader.readexactly(int(response_headers['content-length']))
+        else:
+            data = await reader.read()
+            will_close = True
+        return status, reason, response_headers, data, will_close
+
+    async def _acquire(self, state, key):
+        now = time.time()
+        connections = state.idle.get(key, [])
+        while connections:
+            connection = connections.pop()
+            if not (connection.expired(now, self.idle_timeout, self.max_lifetime) or
+                    connection.dropped()):
+                return connection, True
+            connection.close()
+        return await self._connect(key), False
+
+    async def _connect(self, key):
+        scheme, netloc = key
+        parts = urlsplit('//' + netloc)
+        secure = scheme == 'https'
+        port = parts.port or (443 if secure else 80)
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(parts.hostname, port, ssl=secure or None),
+                self.timeout)
+        except (OSError, asyncio.TimeoutError) as err:
+            raise ServerNotFoundError(err)
+        return _AsyncConnection(reader, writer)
+
+    def _state(self):
+        """Returns the pool of the running event loop."""
+        loop = asyncio.get_event_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState()
+        return state
+
+    def _release(self, state, key, connection):
+        now = time.time()
+        connections = state.idle.setdefault(key, [])
+        if now - connection.created <= self.max_lifetime and len(connections) < self.pool_size:
+            connection.last_used = now
+            connections.append(connection)
+        else:
+            connection.close()
+
+
+def _decompress(data):
+    try:
+        decompressor = Decompressor()
+        return decompressor.decompress(data) + decompressor.flush()
+    except zlib.error as err:
+        raise ServerNotFoundError(err)
+
+
+async def _read_chunked(reader):
+    chunks = []
+    while True:
+        size = int((await reader.readline()).split(b';')[0].strip(), 16)
+        if size == 0:
+            # Skip any trailers up to the terminating blank line.
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            return b''.join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+class _Once(object):
+    """Runs a coroutine function once and shares its result between every awaiting caller."""
+
+    def __init__(self, func):
+        self._func = func
+        self._future = None
+        self._loop = None
+
+    async def __call__(self):
+        loop = asyncio.get_event_loop()
+        if self._future is None or self._loop is not loop:
+            # A future of another event loop cannot be awaited in this one.
+            self._loop = loop
+            self._future = asyncio.ensure_future(self._func())
+        try:
+            return await asyncio.shield(self._future)
+        except Exception:
+            # Allow a failed lookup to be retried.
+            if self._future is not None and self._future.done():
+                self._future = None
+            raise
+
+
+class AsyncServer(BaseServer):
+    """
+    The AsyncServer connects to GSF using non-blocking HTTP requests.
+
+    Pass a ``transport`` keyword argument with an :class:`AsyncTransport` to use a dedicated
+    connection pool, or a ``codec`` keyword argument to use a dedicated pool with that JSON
+    codec. The server can be used as an async context manager, which closes the pool on exit.
+    """
+    def __init__(self, *args, **kwargs):
+        codec = kwargs.pop('codec', None)
+        self._transport = kwargs.pop('transport', None) or AsyncTransport(codec=codec)
+        super(AsyncServer, self).__init__(*args, **kwargs)
+        self._root_path = 'ese'
+        self._services_path = 'services'
+        self._url = urlunparse(('http', ':'.join((self._server, self._port)),
+                                self._root_path, None, None, None))
+        self._info = _Once(self._http_get)
+
+    def __str__(self):
+        return '\nname: {}\nport: {}\n'.format(self.name, self.port)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def name(self):
+        return self._server
+
+    @property
+    def port(self):
+        return self._port
+
+    async def services(self):
+        info = await self._info()
+        return [service['name'] for service in info['services']]
+
+    def service(self, service_name):
+        return AsyncService('/'.join((self._url, self._services_path, service_name)),
+                            transport=self._transport)
+
+    def job(self, job_id):
+        return AsyncJob('/'.join((self._url, 'jobs', str(job_id))), job_id,
+                        transport=self._transport)
+
+    async def close(self):
+        """Closes the connections held by the server's transport."""
+        await self._transport.close()
+
+    async def _http_get(self):
+        try:
+            return await self._transport.get('/'.join((self._url, self._services_path)))
+        except HTTPError as err:
+            raise ServerNotFoundError('HTTP code {}, Reason: {}'.format(err.code, err.reason))
+
+
+class AsyncService(BaseService):
+    """
+    Creates a GSF Service whose name, description and task list are awaitable.
+    """
+    def __init__(self, url, transport=None):
+        self._url = url
+        self._transport = transport or AsyncTransport()
+        self._info = _Once(self._http_get)
+
+    def __str__(self):
+        return '\nurl: {}\n'.format(self._url)
+
+    def task(self, task_name):
+        return AsyncTask('/'.join((self._url, task_name)), transport=self._transport)
+
+    async def tasks(self):
+        info = await self._info()
+        return info['tasks']
+
+    @property
+    async def name(self):
+        info = await self._info()
+        return str(info['name'])
+
+    @property
+    async def description(self):
+        info = await self._info()
+        return str(info['description'])
+
+    async def _http_get(self):
+        try:
+            return await self._transport.get(self._url)
+        except HTTPError as err:
+            raise ServiceNotFoundError('HTTP code {}, Reason: {}'.format(err.code, err.reason))
+
+
+class AsyncTask(BaseTask):
+    """
+    Creates a GSF task whose properties are awaitable and whose submit method is a coroutine.
+    """
+    def __init__(self, *args, **kwargs):
+        self._transport = kwargs.pop('transport', None) or AsyncTransport()
+        super(AsyncTask, self).__init__(*args, **kwargs)
+        self._submit_url = '/'.join((self._uri, 'submitJob'))
+        self._jobs_url = _jobs_url(self._uri)
+        self._info = _Once(self._http_get)
+        self._validator = _Once(self._compile_validator)
+
+    def __str__(self):
+        return '\nuri: {}\n'.format(self.uri)
+
+    @property
+    def uri(self):
+        return self._uri
+
+    @property
+    async def name(self):
+        info = await self._info()
+        return str(info['name'])
+
+    @property
+    async def display_name(self):
+        info = await self._info()
+        return str(info['displayName'])
+
+    @property
+    async def description(self):
+        info = await self._info()
+        return str(info['description'])
+
+    @property
+    async def parameters(self):
+        info = await self._info()
+        return info['parameters']
+
+    async def submit(self, parameters, validate=True):
+        """
+        Submits a job. If *validate* is True, the parameters are first checked against the task
+        parameter definitions and a ParameterValidationError is raised if they are invalid.
+        """
+        if validate:
+            (await self._validator()).validate(parameters)
+        try:
+            status = await self._transport.post(self._submit_url, parameters)
+        except HTTPError as err:
+            raise TaskNotFoundError('HTTP code {}, Reason: {}'.format(err.code, err.reason))
+        return AsyncJob('/'.join((self._jobs_url, str(status['jobId']))), status['jobId'],
+                        transport=self._transport)
+
+    async def _compile_validator(self):
+        return ParameterValidator(await self.parameters)
+
+    async def _http_get(self):
+        try:
+            return _parse_task_info(await self._transport.get(self._uri))
+        except HTTPError as err:
+            raise TaskNotFoundError('HTTP code {}, Reason: {}'.format(err.code, err.reason))
+
+
+class AsyncJob(BaseJob):
+    """
+    Creates a GSF job whose status properties are awaitable.
+
+    The job id is known when the job is created and is returned directly.
+    """
+    def __init__(self, url, job_id, transport=None):
+        self._url = '/'.join((url, 'status'))
+        self._job_id = int(job_id)
+        self._transport = transport or AsyncTransport()
+
+    def __str__(self):
+        return '\njob_id: {}\n'.format(self._job_id)
+
+    @property
+    def job_id(self):
+        return self._job_id
+
+    @property
+    async def status(self):
+        status = await self._http_get()
+        return _STATUS_MAP[status['jobStatus']]
+
+    @property
+    async def progress(self):
+        status = await self._http_get()
+        return status['jobProgress']
+
+    @property
+    async def progress_message(self):
+        status = await self._http_get()
+        return str(status['jobProgressMessage'])
+
+    @property
+    async def error_message(self):
+        status = await self._http_get()
+        return str(status['jobErrorMessage'])
+
+    @property
+    async def results(self):
+        status = await self._http_get()
+        return _build_result(status)
+
+    async def wait_for_done(self, timeout=None, callback=None, min_interval=DEFAULT_MIN_INTERVAL,
+                            max_interval=DEFAULT_MAX_INTERVAL, backoff=DEFAULT_BACKOFF,
+                            jitter=DEFAULT_JITTER):
+        """
+        Waits until the job status is either Succeeded or Failed, polling adaptively.
+
+        See :meth:`gsf.ese.job.Job.wait_for_done` for a description of the arguments.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        schedule = PollSchedule(min_interval, max_interval, backoff, jitter)
+        while True:
+            snapshot = JobStatus.from_status(await self._http_get())
+            if callback is not None:
+                callback(snapshot)
+            if snapshot.done:
+                return
+            interval = schedule.next_interval(snapshot)
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise JobTimeoutError('Job not done after {} seconds'.format(timeout))
+                interval = min(interval, remaining)
+            await asyncio.sleep(interval)
+
+    async def _http_get(self):
+        try:
+            return await self._transport.get(self._url)
+        except HTTPError as err:
+            raise JobNotFoundError('HTTP code: {}, Reason: {}'.format(err.code, err.reason))
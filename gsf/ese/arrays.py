@@ -0,0 +1,121 @@
+"""
+Encodes job parameters holding NumPy arrays.
+
+NumPy is an optional dependency. When it is installed, parameter values may be NumPy arrays or
+scalars; the request body is then produced in pieces, with each array converted and encoded a
+block of elements at a time, and sent with chunked transfer encoding. Neither the whole array
+as nested Python lists nor the whole JSON body is ever held in memory.
+
+NumPy is never imported here: a value can only be a NumPy array if the caller has already
+imported NumPy, so it is looked up in ``sys.modules`` instead.
+
+:Example:
+
+>>> import numpy
+>>> gains = numpy.linspace(0.5, 1.5, 1000000)
+>>> job = task.submit(dict(INPUT_RASTER=raster, GAIN=gains))
+"""
+import sys
+
+#: Number of array elements converted and encoded at a time.
+DEFAULT_CHUNK_ELEMENTS = 64 * 1024
+
+# Pieces of the body are joined until they reach this many bytes before they are sent.
+_PIECE_SIZE = 64 * 1024
+
+
+def get_numpy():
+    """Returns the numpy module if it has been imported, otherwise None."""
+    return sys.modules.get('numpy')
+
+
+def is_array(value):
+    """Returns True if *value* is a NumPy array or NumPy scalar."""
+    numpy = sys.modules.get('numpy')
+    return numpy is not None and isinstance(value, (numpy.ndarray, numpy.generic))
+
+
+def encode_body(data, codec, chunk_elements=DEFAULT_CHUNK_ELEMENTS):
+    """
+    Encodes a JSON request body.
+
+    :param data: The value to encode, usually a dictionary of parameters.
+    :param codec: The JSON codec, see :func:`gsf.ese.http.get_codec`.
+    :param chunk_elements: The number of array elements encoded at a time.
+    :return: bytes, or a JSONBody if a value of *data* is a NumPy array or scalar
+    """
+    if isinstance(data, dict) and any(is_array(value) for value in data.values()):
+        return JSONBody(data, codec, chunk_elements)
+    return codec.dumps(data)
+
+
+class JSONBody(object):
+    """
+    A JSON object whose encoded bytes are produced piece by piece while it is iterated.
+
+    Each iteration starts over from the beginning, so a request whose connection fails can
+    send the body again.
+    """
+
+    def __init__(self, data, codec, chunk_elements=DEFAULT_CHUNK_ELEMENTS):
+        self._data = data
+        self._codec = codec
+        self._chunk_elements = chunk_elements
+
+    def __iter__(self):
+        pieces = []
+        size = 0
+        for piece in self._pieces():
+            pieces.append(piece)
+            size += len(piece)
+            if size >= _PIECE_SIZE:
+                yield b''.join(pieces)
+                pieces = []
+                size = 0
+        if pieces:
+            yield b''.join(pieces)
+
+    def _pieces(self):
+        codec = self._codec
+        numpy = get_numpy()
+        separator = b'{'
+        for name, value in self._data.items():
+            yield separator + codec.dumps(name) + b':'
+            separator = b','
+            if numpy is not None and isinstance(value, numpy.ndarray):
+                for piece in _encode_array(value, codec, self._chunk_elements):
+                    yield piece
+            elif numpy is not None and isinstance(value, numpy.generic):
+                yield codec.dumps(value.item())
+            else:
+                yield codec.dumps(value)
+        yield b'{}' if separator == b'{' else b'}'
+
+
+def _dumps_array(codec, array):
+    # Codecs that can encode arrays without converting them to lists provide dumps_array.
+    dumps_array = getattr(codec, 'dumps_array', None)
+    if dumps_array is not None:
+        return dumps_array(array)
+    return codec.dumps(array.tolist())
+
+
+def _encode_array(array, codec, chunk_elements):
+    if array.size <= chunk_elements:
+        yield _dumps_array(codec, array)
+        return
+    row_size = array.size // len(array)
+    yield b'['
+    if row_size > chunk_elements:
+        for index, row in enumerate(array):
+            if index:
+                yield b','
+            for piece in _encode_array(row, codec, chunk_elements):
+                yield piece
+    else:
+        # Encode blocks of whole rows and drop the brackets of each block's list.
+        step = chunk_elements // row_size
+        for start in range(0, len(array), step):
+            piece = _dumps_array(codec, array[start:start + step])
+            yield (b',' if start else b'') + piece[1:-1]
+    yield b']'
@@ -0,0 +1,197 @@
+"""
+Implements an immutable, indexed snapshot of every service and task definition on an ESE server.
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from types import MappingProxyType
+except ImportError:
+    MappingProxyType = dict
+
+from .service import Service
+from .task import Task
+
+#: Number of catalog requests Server.catalog sends in parallel.
+DEFAULT_CONCURRENCY = 8
+
+
+class Catalog(object):
+    """
+    A read-only index of the services, tasks and task parameters of a GSF server, as returned by
+    :meth:`gsf.ese.server.Server.catalog`.
+
+    Definitions are returned as read-only mappings and tuples. Service and Task objects created
+    through the catalog start with their definitions already cached, so reading their
+    properties makes no request.
+
+    :Example:
+
+    >>> catalog = server.catalog(concurrency=16)
+    >>> catalog.tasks('ENVI')
+    ('AdditiveLeeAdaptiveFilter', ...)
+    >>> catalog.parameter('ENVI', 'SpectralIndex', 'INDEX')['choice_list']
+    >>> task = catalog.task('ENVI', 'SpectralIndex')
+    """
+
+    __slots__ = ('_services', '_tasks', '_parameters', '_urls', '_transport', '_errors')
+
+    def __init__(self, services, tasks, urls, transport=None, errors=None):
+        """
+        :param services: An ordered mapping of service name to service definition.
+        :param tasks: A mapping of (service name, task name) to the parsed task definition.
+        :param urls: A mapping of service name to service URL.
+        :param transport: The Transport given to the Service and Task objects.
+        :param errors: A mapping of (service name, task name or None) to the exception raised
+            while fetching that definition.
+        """
+        self._services = OrderedDict((name, _freeze(info)) for name, info in services.items())
+        self._tasks = dict((key, _freeze(info)) for key, info in tasks.items())
+        self._parameters = dict(
+            (key, dict((parameter['name'], parameter) for parameter in info['parameters']))
+            for key, info in self._tasks.items())
+        self._urls = dict(urls)
+        self._transport = transport
+        self._errors = dict(errors or {})
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __iter__(self):
+        """Iterates over (service name, task name) pairs."""
+        for service_name, info in self._services.items():
+            for task_name in info['tasks']:
+                if (service_name, task_name) in self._tasks:
+                    yield service_name, task_name
+
+    def __contains__(self, key):
+        return key in self._services or key in self._tasks
+
+    def __repr__(self):
+        return '<Catalog: {} services, {} tasks>'.format(len(self._services), len(self._tasks))
+
+    @property
+    def errors(self):
+        """
+        The exceptions raised while fetching definitions, keyed by (service name, task name),
+        with None as the task name for a service that could not be fetched.
+
+        :return: a dictionary
+        """
+        return dict(self._errors)
+
+    def services(self):
+        """
+        Returns the names of the services in the catalog.
+
+        :return: a tuple
+        """
+        return tuple(self._services)
+
+    def service_info(self, service_name):
+        """Returns the definition of a service."""
+        return self._services[service_name]
+
+    def tasks(self, service_name):
+        """
+        Returns the names of the tasks of a service whose definitions are in the catalog.
+
+        :return: a tuple
+        """
+        return tuple(task_name for task_name in self._services[service_name]['tasks']
+                     if (service_name, task_name) in self._tasks)
+
+    def task_info(self, service_name, task_name):
+        """Returns the definition of a task, with its parameters normalized as in Task."""
+        return self._tasks[(service_name, task_name)]
+
+    def parameters(self, service_name, task_name):
+        """
+        Returns the parameter definitions of a task. See :attr:`gsf.task.Task.parameters`.
+
+        :return: a tuple of parameter mappings
+        """
+        return self._tasks[(service_name, task_name)]['parameters']
+
+    def parameter(self, service_name, task_name, parameter_name):
+        """Returns the definition of one task parameter."""
+        return self._parameters[(service_name, task_name)][parameter_name]
+
+    def service(self, service_name):
+        """
+        Returns a GSF Service object whose definition is already cached.
+
+        :return: a GSF Service object
+        """
+        service = Service(self._urls[service_name], transport=self._transport)
+        service._http_get.seed(_thaw(self._services[service_name]))
+        return service
+
+    def task(self, service_name, task_name):
+        """
+        Returns a GSF Task object whose definition is already cached.
+
+        :return: a GSF Task object
+        """
+        info = self._tasks[(service_name, task_name)]
+        task = Task('/'.join((self._urls[service_name], task_name)), transport=self._transport)
+        task._http_get.seed(_thaw(info))
+        return task
+
+
+def fetch_catalog(server, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Fetches every service and task definition of *server* with up to *concurrency* requests in
+    parallel. Definitions that cannot be fetched are recorded in :attr:`Catalog.errors`.
+
+    :return: a Catalog
+    """
+    service_names = server.services()
+    services = [server.service(name) for name in service_names]
+    urls = dict((name, service._url) for name, service in zip(service_names, services))
+    service_infos = OrderedDict()
+    tasks = dict()
+    errors = dict()
+
+    def fetch(obj):
+        try:
+            return obj._http_get(), None
+        except Exception as err:
+            return None, err
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        service_futures = [executor.submit(fetch, service) for service in services]
+        task_futures = []
+        for name, service, future in zip(service_names, services, service_futures):
+            info, error = future.result()
+            if error is not None:
+                errors[(name, None)] = error
+                continue
+            service_infos[name] = info
+            for task_name in info['tasks']:
+                task_futures.append(((name, task_name),
+                                     executor.submit(fetch, service.task(task_name))))
+        for key, future in task_futures:
+            info, error = future.result()
+            if error is not None:
+                errors[key] = error
+            else:
+                tasks[key] = info
+
+    return Catalog(service_infos, tasks, urls, server._transport, errors)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType(dict((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, (dict, MappingProxyType)):
+        return dict((key, _thaw(item)) for key, item in value.items())
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
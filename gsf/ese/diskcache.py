@@ -0,0 +1,136 @@
+"""
+Implements an on-disk cache of ESE catalog documents (the service list, service descriptions and
+task definitions), so short-lived processes can start without downloading the catalog again.
+
+:Example:
+
+>>> from gsf import Server
+>>> from gsf.ese.http import Transport
+>>> from gsf.ese.diskcache import DiskCache
+>>> transport = Transport(catalog_cache=DiskCache('/tmp/gsf-catalog', ttl=3600))
+>>> server = Server('localhost', '9191', transport=transport)
+>>> task = server.service('ENVI').task('SpectralIndex')
+>>> task.parameters  # read from disk when a fresh copy is cached
+
+The default transport uses a DiskCache when the ``GSF_CATALOG_CACHE`` environment variable is set
+to a directory.
+"""
+import hashlib
+import json
+import os
+import time
+
+from ..error import ServerNotFoundError
+from .files import make_directory, remove, write_atomic
+
+#: Format version of the cache files. Bump it when the stored documents change shape, e.g. when
+#: the task parameter normalization changes, so that older files are ignored.
+CACHE_VERSION = 1
+
+#: Seconds a cached document is used without contacting the server.
+DEFAULT_TTL = 24 * 60 * 60.0
+
+#: Environment variable naming the cache directory used by the default transport.
+CACHE_DIR_ENVIRONMENT_VARIABLE = 'GSF_CATALOG_CACHE'
+
+
+class DiskCache(object):
+    """
+    A cache of catalog documents stored as one JSON file per URL.
+
+    Documents younger than *ttl* are returned without any request. Older documents are
+    revalidated with a conditional GET using the ETag and Last-Modified headers of the original
+    response, and are kept if the server answers 304 Not Modified. If the server cannot be
+    reached, a stale document is returned rather than failing.
+
+    Files are written to a temporary name and atomically renamed, so several processes can
+    share one directory; readers always see either a complete old file or a complete new one.
+
+    :param directory: The directory holding the cache files. It is created if needed.
+    :param ttl: Seconds a document is used without contacting the server.
+    :param revalidate: If False, stale documents are downloaded again without a conditional GET.
+    """
+
+    def __init__(self, directory, ttl=DEFAULT_TTL, revalidate=True):
+        self.directory = directory
+        self.ttl = ttl
+        self.revalidate = revalidate
+
+    @classmethod
+    def from_environment(cls):
+        """Returns a DiskCache for the directory named by GSF_CATALOG_CACHE, or None if unset."""
+        directory = os.environ.get(CACHE_DIR_ENVIRONMENT_VARIABLE)
+        return cls(directory) if directory else None
+
+    def fetch(self, url, transport, parse=None):
+        """
+        Returns the document at *url*, from disk if a usable copy is cached.
+
+        :param url: The catalog URL.
+        :param transport: The Transport used when the server has to be contacted.
+        :param parse: A function applied to a newly downloaded document before it is cached.
+        :return: the decoded document
+        """
+        entry = self._read(url)
+        if entry is not None and time.time() - entry['stored'] < self.ttl:
+            return entry['data']
+
+        headers = {}
+        if entry is not None and self.revalidate:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        try:
+            response = transport.send('GET', url, headers=headers)
+        except ServerNotFoundError:
+            if entry is not None:
+                return entry['data']
+            raise
+
+        if response.status == 304 and entry is not None:
+            data = entry['data']
+        else:
+            data = transport.codec.loads(response.body)
+            if parse is not None:
+                data = parse(data)
+        self._write(url, data, response.headers.get('etag', entry and entry.get('etag')),
+                    response.headers.get('last-modified', entry and entry.get('last_modified')))
+        return data
+
+    def invalidate(self, url=None):
+        """Removes the cached document for *url*, or every cached document if url is None."""
+        if url is not None:
+            paths = [self._path(url)]
+        elif os.path.isdir(self.directory):
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                     if name.endswith('.json')]
+        else:
+            paths = []
+        for path in paths:
+            remove(path)
+
+    def _path(self, url):
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + '.json')
+
+    def _read(self, url):
+        try:
+            with open(self._path(url), 'rb') as cache_file:
+                entry = json.loads(cache_file.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get('version') != CACHE_VERSION or \
+                entry.get('url') != url:
+            return None
+        return entry
+
+    def _write(self, url, data, etag, last_modified):
+        entry = dict(version=CACHE_VERSION, url=url, stored=time.time(), etag=etag,
+                     last_modified=last_modified, data=data)
+        if not make_directory(self.directory):
+            return
+        try:
+            write_atomic(self._path(url), json.dumps(entry).encode('utf-8'))
+        except (IOError, OSError):
+            pass
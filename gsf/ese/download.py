@@ -0,0 +1,255 @@
+"""
+Streams job output files from the ESE server to disk.
+
+Files are read in fixed-size chunks into a single reusable buffer, so memory use does not depend
+on the file size. Partial downloads are kept next to the destination with a ``.part`` suffix and
+resumed with HTTP Range requests. The ETag, or else the Last-Modified date, of the file is kept
+alongside and sent as If-Range, so that a partial file is only resumed with the bytes of the
+same version of the file; partial files without it are downloaded again from the start.
+"""
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Python 3
+try:
+    from urllib.parse import urlsplit, unquote
+    from urllib.error import HTTPError
+except ImportError:
+    from urlparse import urlsplit
+    from urllib import unquote
+    from urllib2 import HTTPError
+
+from ..error import ServerNotFoundError
+from .files import make_directory, remove, replace, write_atomic
+
+#: Bytes read from the connection at a time.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+#: Number of times an interrupted download is resumed before giving up.
+DEFAULT_RETRIES = 3
+
+#: Number of files fetch_files downloads in parallel.
+DEFAULT_CONCURRENCY = 4
+
+PART_SUFFIX = '.part'
+
+VALIDATOR_SUFFIX = '.validator'
+
+MANIFEST_NAME = 'manifest.json'
+
+
+class DownloadReport(namedtuple('DownloadReport', ['url', 'path', 'size', 'transferred',
+                                                   'resumed_from', 'elapsed'])):
+    """
+    Describes a completed download: the final *size* of the file, the bytes *transferred* by
+    this call, the offset it *resumed_from*, and the *elapsed* seconds.
+    """
+    __slots__ = ()
+
+    @property
+    def rate(self):
+        """Bytes per second transferred by the download."""
+        return self.transferred / self.elapsed if self.elapsed > 0 else float('inf')
+
+
+def filename(url):
+    """Returns the file name at the end of *url*."""
+    return unquote(urlsplit(url).path.rstrip('/').split('/')[-1])
+
+
+def download(url, dest, transport, chunk_size=DEFAULT_CHUNK_SIZE, resume=True,
+             retries=DEFAULT_RETRIES, callback=None):
+    """
+    Streams the file at *url* to *dest*.
+
+    :param url: The URL of the file.
+    :param dest: A file path, a directory to save the file into under its own name, or a
+        writable binary file object.
+    :param transport: The gsf.ese.http.Transport used for the requests.
+    :param chunk_size: The number of bytes read at a time.
+    :param resume: If True, continue a partial download left by an earlier attempt.
+    :param retries: The number of times an interrupted transfer is resumed.
+    :param callback: A function called with (bytes written, total bytes or None) after each chunk.
+    :return: a DownloadReport; its rate property gives the throughput in bytes per second
+    """
+    if hasattr(dest, 'write'):
+        return _download(url, dest, None, 0, None, None, transport, chunk_size, retries,
+                         callback)
+
+    path = os.path.join(dest, filename(url)) if os.path.isdir(dest) else dest
+    part_path = path + PART_SUFFIX
+    validator_path = part_path + VALIDATOR_SUFFIX
+    validator = _read_validator(validator_path) if resume else None
+    offset = os.path.getsize(part_path) if validator and os.path.exists(part_path) else 0
+    with open(part_path, 'ab' if offset else 'wb') as part_file:
+        report = _download(url, part_file, path, offset, validator, validator_path, transport,
+                           chunk_size, retries, callback)
+    replace(part_path, path)
+    remove(validator_path)
+    return report
+
+
+def fetch_files(files, concurrency=DEFAULT_CONCURRENCY, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Downloads several files in parallel. A file that already exists with the size reported by
+    the server is skipped.
+
+    Every file is attempted even if some fail; the first exception is then raised, and a new
+    call resumes where the failed downloads stopped.
+
+    :param files: An iterable of (url, path, transport) tuples.
+    :param concurrency: The maximum number of downloads in flight.
+    :param chunk_size: The number of bytes read at a time.
+    :return: a list holding a DownloadReport per file, or None for skipped files
+    """
+    def fetch(item):
+        url, path, transport = item
+        if os.path.isfile(path) and remote_size(url, transport) == os.path.getsize(path):
+            return None
+        directory = os.path.dirname(path)
+        if directory:
+            # A directory that cannot be created makes the download itself fail.
+            make_directory(directory)
+        return download(url, path, transport, chunk_size)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(fetch, item) for item in files]
+    reports = []
+    error = None
+    for future in futures:
+        try:
+            reports.append(future.result())
+        except Exception as err:
+            error = error or err
+            reports.append(None)
+    if error is not None:
+        raise error
+    return reports
+
+
+def remote_size(url, transport):
+    """Returns the size in bytes of the file at *url*, or None if the server does not say."""
+    try:
+        # Ask for the file itself, as the download does; the length of a compressed encoding
+        # would not match the file on disk.
+        length = transport.send('HEAD', url, headers={'Accept-Encoding': 'identity'}).headers.get(
+            'content-length')
+    except HTTPError:
+        return None
+    return int(length) if length and length.isdigit() else None
+
+
+def write_manifest(directory, manifest):
+    """Atomically writes *manifest* as JSON to the manifest file in *directory*."""
+    write_atomic(os.path.join(directory, MANIFEST_NAME),
+                 json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+
+def _download(url, output, path, offset, validator, validator_path, transport, chunk_size,
+              retries, callback):
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    start_time = time.time()
+    resumed_from = offset
+    total = None
+    while True:
+        headers = dict()
+        if offset:
+            headers['Range'] = 'bytes={}-'.format(offset)
+            if validator:
+                headers['If-Range'] = validator
+        try:
+            with transport.open('GET', url, headers=headers) as response:
+                if offset and response.status != 206:
+                    # The server ignored the range, or the file has changed; start over.
+                    _rewind(output, url)
+                    offset = resumed_from = 0
+                if not offset:
+                    validator = _validator(response.headers)
+                    if validator_path is not None:
+                        _write_validator(validator_path, validator)
+                total = _total_size(response.headers, offset)
+                while True:
+                    count = response.readinto(buffer)
+                    if not count:
+                        break
+                    output.write(view[:count])
+                    offset += count
+                    if callback is not None:
+                        callback(offset, total)
+        except HTTPError as err:
+            if err.code != 416 or not offset:
+                raise
+            if _total_size(err.headers or {}, None) == offset:
+                # The partial file already holds the whole output.
+                break
+            # The partial file is longer than the output; start over.
+            _rewind(output, url)
+            offset = resumed_from = 0
+            continue
+        except ServerNotFoundError:
+            if retries <= 0:
+                raise
+            retries -= 1
+            output.flush()
+            continue
+        if total is not None and offset < total:
+            if retries <= 0:
+                raise ServerNotFoundError('Download of {} ended after {} of {} bytes'.format(
+                    url, offset, total))
+            retries -= 1
+            continue
+        break
+    output.flush()
+    return DownloadReport(url, path, offset, offset - resumed_from, resumed_from,
+                          time.time() - start_time)
+
+
+def _total_size(headers, offset):
+    content_range = headers.get('content-range')
+    if content_range and '/' in content_range:
+        total = content_range.rsplit('/', 1)[1]
+        return int(total) if total.isdigit() else None
+    length = headers.get('content-length')
+    if offset is None:
+        return None
+    return offset + int(length) if length and length.isdigit() else None
+
+
+def _rewind(output, url):
+    seekable = getattr(output, 'seekable', None)
+    if seekable is None or not seekable():
+        raise ServerNotFoundError('Cannot resume the download of {}: the server sent the whole '
+                                  'file again and the destination is not seekable'.format(url))
+    output.seek(0)
+    output.truncate()
+
+
+def _validator(headers):
+    """Returns the If-Range value identifying the version of a file, or None."""
+    etag = headers.get('etag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return headers.get('last-modified')
+
+
+def _read_validator(validator_path):
+    try:
+        with open(validator_path, 'rb') as validator_file:
+            return validator_file.read().decode('utf-8').strip() or None
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _write_validator(validator_path, validator):
+    if validator is None:
+        remove(validator_path)
+        return
+    try:
+        with open(validator_path, 'wb') as validator_file:
+            validator_file.write(validator.encode('utf-8'))
+    except (IOError, OSError):
+        pass
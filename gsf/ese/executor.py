@@ -0,0 +1,26 @@
+"""
+Provides the thread pool shared by the non-blocking methods of the ESE client classes.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from ..executor import DefaultExecutor
+
+#: Number of threads in the process-wide executor.
+DEFAULT_MAX_WORKERS = 8
+
+_default = DefaultExecutor(lambda: ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS))
+
+
+def default_executor():
+    """Returns the process-wide executor used by methods that were not given their own."""
+    return _default.get()
+
+
+def set_default_executor(executor):
+    """
+    Replaces the process-wide executor, e.g. to share a pool with other parts of a pipeline.
+
+    :param executor: A concurrent.futures.Executor.
+    :return: None
+    """
+    _default.set(executor)
@@ -0,0 +1,58 @@
+"""
+File helpers shared by the on-disk caches and the downloads.
+
+Files are written to a temporary name in their destination directory and atomically renamed
+over the destination, so several processes can share one directory; readers always see either
+a complete old file or a complete new one.
+"""
+import os
+import tempfile
+
+
+def write_atomic(path, data):
+    """
+    Writes *data* to *path* atomically. The temporary file is removed if writing fails.
+
+    :param path: The destination file. Its directory must exist.
+    :param data: The bytes to write.
+    :raises OSError: if the file cannot be written, or IOError on Python 2
+    """
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or os.curdir, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as temp_file:
+            temp_file.write(data)
+        replace(temp_path, path)
+    except BaseException:
+        remove(temp_path)
+        raise
+
+
+def make_directory(directory):
+    """Creates *directory* if needed, and returns False if it does not exist afterwards."""
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+    except OSError:
+        # Another process may have created it in the meantime.
+        return os.path.isdir(directory)
+    return True
+
+
+def replace(source, destination):
+    """Renames *source* to *destination*, replacing it atomically if it exists."""
+    try:
+        os.replace(source, destination)
+    except AttributeError:
+        # Python 2 has no os.replace; rename is atomic on POSIX but fails on Windows if the
+        # destination exists.
+        if os.name == 'nt' and os.path.exists(destination):
+            os.remove(destination)
+        os.rename(source, destination)
+
+
+def remove(path):
+    """Removes the file at *path*, if it exists."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -1,43 +1,109 @@
 """
 Implements the GSF job class for the ESE job endpoint.
 """
+import copy
+import os
+import threading
 import time
-import re
+from collections import namedtuple
 from string import Template
 
 # Python 3
 try:
     from urllib.error import HTTPError
+    from queue import Queue, Empty
 except ImportError:
     from urllib2 import HTTPError
+    from Queue import Queue, Empty
 
-from ..job import Job as BaseJob
+from ..job import Job as BaseJob, DoneAndNotDone
 from ..dict import Dict as gsfdict
-from ..error import JobNotFoundError
+from ..error import JobNotFoundError, JobTimeoutError
 from . import http
+from .download import (download, fetch_files, filename, write_manifest, DEFAULT_CHUNK_SIZE,
+                       DEFAULT_CONCURRENCY as DEFAULT_FETCH_CONCURRENCY, DEFAULT_RETRIES)
+from .polling import (PollSchedule, default_poller, DEFAULT_MIN_INTERVAL, DEFAULT_MAX_INTERVAL,
+                      DEFAULT_BACKOFF, DEFAULT_JITTER)
 
 _STATUS_MAP = dict(esriJobSucceeded='Succeeded',
                    esriJobFailed='Failed',
                    esriJobSubmitted='Accepted',
                    esriJobExecuting='Started')
 
+_TERMINAL_STATUSES = ('Succeeded', 'Failed')
+
+#: Seconds a status snapshot is reused by the job properties before a new one is requested.
+DEFAULT_MAX_AGE = 1.0
+
+
+class JobStatus(namedtuple('JobStatus', ['job_id', 'status', 'progress', 'progress_message',
+                                         'error_message', 'results', 'timestamp'])):
+    """
+    An immutable snapshot of a job's status, filled in from a single status request.
+
+    The results dictionary is shared by every holder of the snapshot and must not be modified;
+    :attr:`Job.results` returns a copy of it.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_status(cls, status, timestamp=None):
+        """Creates a snapshot from an ESE job status document."""
+        return cls(job_id=status['jobId'],
+                   status=_STATUS_MAP[status['jobStatus']],
+                   progress=status['jobProgress'],
+                   progress_message=str(status['jobProgressMessage']),
+                   error_message=str(status['jobErrorMessage']),
+                   results=_build_result(status),
+                   timestamp=time.time() if timestamp is None else timestamp)
+
+    @property
+    def done(self):
+        """True if the job has either succeeded or failed."""
+        return self.status in _TERMINAL_STATUSES
+
+    @property
+    def age(self):
+        """Seconds since the snapshot was taken."""
+        return time.time() - self.timestamp
+
 
 class Job(BaseJob):
     """
     Creates a GSF job used for querying job information.
+
+    The job properties are read from a status snapshot that is reused for *max_age* seconds,
+    so reading several properties together costs a single request. Once the job has succeeded
+    or failed the snapshot is kept for good. Call :meth:`refresh` to request a new snapshot.
+
+    A job may be shared between threads. Threads refreshing the same job, or different Job
+    objects for the same job on one transport, at the same time share a single status request.
     """
-    def __init__(self,  url):
+    def __init__(self, url, transport=None, max_age=DEFAULT_MAX_AGE):
         self._url = '/'.join((url, 'status'))
+        self._transport = transport or http.default_transport()
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.max_age = max_age
+
+    def __eq__(self, other):
+        return isinstance(other, Job) and self._url == other._url
 
-        def __str__(self):
-            status = self._http_get()
-            props = dict(job_id=status['jobId'],
-                         status=_STATUS_MAP[status['jobStatus']],
-                         progress=status['jobProgress'],
-                         progress_message=str(status['jobProgressMessage']),
-                         error_message=str(status['jobErrorMessage']),
-                         results=self._build_result())
-            return Template('''
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._url)
+
+    def __str__(self):
+        snapshot = self.snapshot
+        props = dict(job_id=snapshot.job_id,
+                     status=snapshot.status,
+                     progress=snapshot.progress,
+                     progress_message=snapshot.progress_message,
+                     error_message=snapshot.error_message,
+                     results=snapshot.results)
+        return Template('''
 job_id: ${job_id}
 status: ${status}
 progress: ${progress}
@@ -46,49 +112,339 @@ error_message: ${error_message}
 results: ${results}
 ''').substitute(props)
 
+    @property
+    def snapshot(self):
+        """
+        Returns the latest status snapshot, requesting a new one if it is older than max_age.
+
+        :return: a JobStatus
+        """
+        snapshot = self._snapshot
+        if snapshot is None or not (snapshot.done or snapshot.age < self.max_age):
+            snapshot = self.refresh()
+        return snapshot
+
+    def refresh(self):
+        """
+        Requests the job status from the server and stores it as the current snapshot.
+
+        :return: a JobStatus
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.done:
+            return snapshot
+        return self._store(JobStatus.from_status(self._http_get()))
+
+    def _store(self, snapshot):
+        """Stores a snapshot, requested or pushed by the server, unless the job is already done."""
+        with self._lock:
+            # A thread that started earlier may already have stored the final status.
+            if self._snapshot is not None and self._snapshot.done:
+                return self._snapshot
+            self._snapshot = snapshot
+        return snapshot
+
     @property
     def job_id(self):
-        status = self._http_get()
-        return status['jobId']
+        return self.snapshot.job_id
 
     @property
     def status(self):
-        status = self._http_get()
-        return _STATUS_MAP[status['jobStatus']]
+        return self.snapshot.status
 
     @property
     def progress(self):
-        status = self._http_get()
-        return status['jobProgress']
+        return self.snapshot.progress
 
     @property
     def progress_message(self):
-        status = self._http_get()
-        return str(status['jobProgressMessage'])
+        return self.snapshot.progress_message
 
     @property
     def error_message(self):
-        status = self._http_get()
-        return str(status['jobErrorMessage'])
+        return self.snapshot.error_message
 
     @property
     def results(self):
-        status = self._http_get()
-        return self._build_result(status)
+        # The final snapshot is kept for good and shared, so callers get their own copy.
+        return copy.deepcopy(self.snapshot.results)
+
+    def wait_for_done(self, timeout=None, callback=None, min_interval=DEFAULT_MIN_INTERVAL,
+                      max_interval=DEFAULT_MAX_INTERVAL, backoff=DEFAULT_BACKOFF,
+                      jitter=DEFAULT_JITTER):
+        """
+        Blocks execution until the job status is either Succeeded or Failed.
+
+        The status is polled with an adaptive interval, see :class:`gsf.ese.polling.PollSchedule`.
+
+        :param timeout: The maximum number of seconds to wait, or None to wait indefinitely.
+        :param callback: A function called with the JobStatus snapshot after every poll.
+        :param min_interval: The shortest wait in seconds between two polls.
+        :param max_interval: The longest wait in seconds between two polls.
+        :param backoff: The factor the wait grows by after each poll.
+        :param jitter: The fraction of the wait that is randomized.
+        :return: None
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        schedule = PollSchedule(min_interval, max_interval, backoff, jitter)
+        while True:
+            snapshot = self.refresh()
+            if callback is not None:
+                callback(snapshot)
+            if snapshot.done:
+                return
+            interval = schedule.next_interval(snapshot)
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise JobTimeoutError('Job not done after {} seconds'.format(timeout))
+                interval = min(interval, remaining)
+            time.sleep(interval)
+
+    def download(self, output_name, dest, chunk_size=DEFAULT_CHUNK_SIZE, resume=True,
+                 retries=DEFAULT_RETRIES, callback=None):
+        """
+        Streams the file of an output parameter, such as a URLRaster, to disk.
+
+        The file is read in chunks of *chunk_size* bytes over the job's transport, so memory use
+        is bounded whatever the file size. An interrupted transfer is resumed with a Range
+        request, both within this call and by a later call with the same destination.
+
+        :param output_name: The name of the output parameter in the job results.
+        :param dest: A file path, a directory to save the file into under its own name, or a
+            writable binary file object.
+        :param chunk_size: The number of bytes read at a time.
+        :param resume: If True, continue a partial download left by an earlier attempt.
+        :param retries: The number of times an interrupted transfer is resumed.
+        :param callback: A function called with (bytes written, total bytes or None) after
+            each chunk.
+        :return: a gsf.ese.download.DownloadReport with the size, elapsed time and rate
+        """
+        return download(_output_url(self.results, output_name), dest, self._transport,
+                        chunk_size, resume, retries, callback)
+
+    def fetch_all(self, directory, concurrency=DEFAULT_FETCH_CONCURRENCY):
+        """
+        Downloads every output file of the job, including auxiliary files such as ENVI headers,
+        into *directory* in parallel, and writes a manifest.json that maps each output parameter
+        name to its local files. Files already present with the size reported by the server are
+        not downloaded again.
 
-    def wait_for_done(self):
-        while not re.match('(Failed|Succeeded)', self.status):
-            time.sleep(1)
+        :param directory: The directory to save the files into. It is created if needed.
+        :param concurrency: The maximum number of downloads in flight.
+        :return: a dictionary of output name to a dictionary with the local ``path`` and the
+            list of ``auxiliary_paths``
+        """
+        return _fetch_outputs([(self, directory)], concurrency)[0]
 
     def _http_get(self):
         try:
-            return http.get(self._url)
+            return http.get(self._url, self._transport)
         except HTTPError as err:
             raise JobNotFoundError('HTTP code: {}, Reason: {}'.format(err.code, err.reason))
 
-    def _build_result(self, status):
-        kv_result = gsfdict()
-        for result in status['results']:
-            kv_result[result['name']] = result['value']
-        return kv_result
+
+class JobBatch(object):
+    """
+    An ordered collection of jobs submitted together by Task.submit_many.
+
+    Only the integer job ids are stored; Job objects are created when an item is read. Indexing the
+    batch returns the Job for that input, or None if its submission failed, in which case the
+    exception is available from :attr:`errors`.
+    """
+    def __init__(self, jobs_url, transport=None):
+        self._jobs_url = jobs_url
+        self._transport = transport
+        self._job_ids = []
+        self.errors = dict()
+
+    def __len__(self):
+        return len(self._job_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index in self.errors:
+            self._job_ids[index]  # raises IndexError for out of range indices
+            return None
+        return self._job(self._job_ids[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        return '<JobBatch: {} jobs, {} errors>'.format(len(self) - len(self.errors),
+                                                      len(self.errors))
+
+    @property
+    def job_ids(self):
+        """
+        The job ids in input order, with None for failed submissions.
+
+        :return: a list
+        """
+        return [None if index in self.errors else job_id
+                for index, job_id in enumerate(self._job_ids)]
+
+    def jobs(self):
+        """
+        Returns the jobs that were submitted successfully, in input order.
+
+        :return: a list of GSF Job objects
+        """
+        return [self._job(job_id) for index, job_id in enumerate(self._job_ids)
+                if index not in self.errors]
+
+    def append(self, job_id, error=None):
+        """
+        Adds the outcome of one submission to the batch.
+
+        :param job_id: The id of the submitted job, ignored if error is set.
+        :param error: The exception raised by a failed submission.
+        :return: None
+        """
+        if error is not None:
+            self.errors[len(self._job_ids)] = error
+            job_id = 0
+        self._job_ids.append(job_id)
+
+    def _job(self, job_id):
+        return Job('/'.join((self._jobs_url, str(job_id))), transport=self._transport)
+
+
+def as_completed(jobs, timeout=None, poller=None):
+    """
+    Returns an iterator that yields each job as soon as it has succeeded or failed.
+
+    The jobs are polled together by a shared :class:`gsf.ese.polling.Poller`. A job whose id
+    does not exist is yielded as well; reading its status raises the JobNotFoundError.
+
+    :param jobs: An iterable of GSF Job objects.
+    :param timeout: The maximum number of seconds to wait for all jobs, or None to wait
+        indefinitely. A JobTimeoutError is raised if some jobs are not done in time.
+    :param poller: The Poller to use instead of the process-wide one, or a
+        :class:`gsf.ese.monitor.StatusMonitor` to be notified by the server instead of polling.
+    :return: an iterator of GSF Job objects
+    """
+    poller = poller or default_poller()
+    deadline = None if timeout is None else time.time() + timeout
+    pending = set(jobs)
+    completed = Queue()
+    callback = completed.put
+    for job in pending:
+        poller.watch(job, callback)
+    try:
+        while pending:
+            remaining = None if deadline is None else max(deadline - time.time(), 0)
+            try:
+                job = completed.get(timeout=remaining)
+            except Empty:
+                raise JobTimeoutError('{} of the jobs not done after {} seconds'.format(
+                    len(pending), timeout))
+            pending.discard(job)
+            yield job
+    finally:
+        for job in pending:
+            poller.unwatch(job, callback)
+
+
+def wait_all(jobs, timeout=None, poller=None):
+    """
+    Blocks execution until every job has succeeded or failed, or the timeout has passed.
+
+    :param jobs: An iterable of GSF Job objects.
+    :param timeout: The maximum number of seconds to wait, or None to wait indefinitely.
+    :param poller: The Poller to use instead of the process-wide one.
+    :return: a (done, not_done) named tuple of sets of jobs
+    """
+    return _wait(jobs, timeout, poller, None)
+
+
+def wait_any(jobs, timeout=None, poller=None):
+    """
+    Blocks execution until at least one job has succeeded or failed, or the timeout has passed.
+
+    :param jobs: An iterable of GSF Job objects.
+    :param timeout: The maximum number of seconds to wait, or None to wait indefinitely.
+    :param poller: The Poller to use instead of the process-wide one.
+    :return: a (done, not_done) named tuple of sets of jobs
+    """
+    return _wait(jobs, timeout, poller, 1)
+
+
+def _wait(jobs, timeout, poller, count):
+    jobs = set(jobs)
+    done = set()
+    iterator = as_completed(jobs, timeout, poller)
+    try:
+        for job in iterator:
+            done.add(job)
+            if count is not None and len(done) >= count:
+                break
+    except JobTimeoutError:
+        pass
+    finally:
+        iterator.close()
+    return DoneAndNotDone(done, jobs - done)
+
+
+def fetch_all(jobs, directory, concurrency=DEFAULT_FETCH_CONCURRENCY):
+    """
+    Downloads the output files of several jobs in parallel, each into a subdirectory of
+    *directory* named after the job id. See :meth:`Job.fetch_all`.
+
+    A manifest.json in *directory* maps each job id to the manifest of that job.
+
+    :param jobs: An iterable of GSF Job objects.
+    :param directory: The directory to save the files into.
+    :param concurrency: The maximum number of downloads in flight over all jobs.
+    :return: a dictionary of job id to job manifest
+    """
+    jobs = list(jobs)
+    manifests = _fetch_outputs([(job, os.path.join(directory, str(job.job_id))) for job in jobs],
+                               concurrency)
+    manifest = dict((str(job.job_id), job_manifest) for job, job_manifest in zip(jobs, manifests))
+    write_manifest(directory, manifest)
+    return manifest
+
+
+def _fetch_outputs(targets, concurrency):
+    manifests = []
+    files = []
+    for job, directory in targets:
+        manifest = dict()
+        for name, value in job.results.items():
+            if not isinstance(value, dict) or 'url' not in value:
+                continue
+            urls = [value['url']] + list(value.get('auxiliary_url') or [])
+            paths = [os.path.abspath(os.path.join(directory, filename(url))) for url in urls]
+            manifest[name] = dict(path=paths[0], auxiliary_paths=paths[1:])
+            files.extend((url, path, job._transport) for url, path in zip(urls, paths))
+        manifests.append(manifest)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    fetch_files(files, concurrency)
+    for (_, directory), manifest in zip(targets, manifests):
+        write_manifest(directory, manifest)
+    return manifests
+
+
+def _output_url(results, output_name):
+    """Returns the file URL of an output parameter."""
+    value = results[output_name]
+    if isinstance(value, dict) and 'url' in value:
+        return value['url']
+    raise ValueError('Output {} does not reference a file'.format(output_name))
+
+
+def _build_result(status):
+    """Returns the output parameters of an ESE status document keyed by parameter name."""
+    kv_result = gsfdict()
+    for result in status['results']:
+        kv_result[result['name']] = result['value']
+    return kv_result
 
@@ -0,0 +1,158 @@
+"""
+Implements the listing of the jobs of an ESE server, page by page, and the retrieval of the
+status of many jobs in few requests.
+
+Both use the jobs endpoint of the server, ``GET /ese/jobs``, which takes the query parameters
+``offset`` and ``limit`` to select a page, ``status`` to select jobs by ESE status name,
+``since`` to select jobs submitted at or after a time in seconds since the epoch, and ``jobIds``
+to select jobs by id. It returns a document with the status documents of the selected jobs, in
+increasing id order, under ``jobs``.
+
+Servers that ignore some of these parameters are tolerated: the jobs returned are checked
+against the requested filters, which are applied again on the client. When a server does not
+select jobs by id, the status of each job is requested instead. The submission time is read
+from the ``jobSubmitted`` field of the status documents, in seconds since the epoch or as an
+ISO 8601 UTC time; jobs whose documents do not give it are kept as the server selected them.
+
+:Example:
+
+>>> for record in server.jobs(status='Failed', since=time.time() - 3600):
+...     print(record.job_id, record.error_message)
+>>> statuses = server.job_statuses([41, 42, 43])
+>>> statuses[42].status
+'Succeeded'
+"""
+import calendar
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Python 3
+try:
+    from urllib.parse import urlencode
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib import urlencode
+    from urllib2 import HTTPError
+
+from ..error import ServerNotFoundError
+from . import http
+from .job import JobStatus, _STATUS_MAP
+
+#: Number of jobs requested per page.
+DEFAULT_PAGE_SIZE = 100
+
+#: Number of status requests sent in parallel when the server cannot list jobs by id.
+DEFAULT_CONCURRENCY = 8
+
+_ESE_STATUSES = dict((status, ese_status) for ese_status, status in _STATUS_MAP.items())
+
+
+def iter_jobs(jobs_url, transport, status=None, since=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Returns a generator over the status of every job on the server, requesting one page of
+    jobs at a time as it is consumed. See :meth:`gsf.ese.server.Server.jobs`.
+    """
+    return _iter_pages(jobs_url, transport, _filters(status, since), page_size)
+
+
+def _iter_pages(jobs_url, transport, query, page_size):
+    statuses = set(query['status'].split(',')) if 'status' in query else None
+    since = float(query['since']) if 'since' in query else None
+    offset = 0
+    last_id = None
+    while True:
+        try:
+            page = _get_page(jobs_url, transport, dict(query, offset=offset, limit=page_size))
+        except HTTPError as err:
+            raise ServerNotFoundError('HTTP code {}, Reason: {}'.format(err.code, err.reason))
+        new_ids = False
+        for status_document in page:
+            # Skip the jobs already yielded, in case the server ignores the offset.
+            if last_id is not None and status_document['jobId'] <= last_id:
+                continue
+            last_id = status_document['jobId']
+            new_ids = True
+            if statuses is not None and status_document['jobStatus'] not in statuses:
+                continue
+            submitted = _submitted(status_document)
+            if since is not None and submitted is not None and submitted < since:
+                continue
+            yield JobStatus.from_status(status_document)
+        if len(page) < page_size or not new_ids:
+            return
+        offset += len(page)
+
+
+def job_statuses(jobs_url, transport, job_ids, page_size=DEFAULT_PAGE_SIZE,
+                 concurrency=DEFAULT_CONCURRENCY):
+    """
+    Returns the status of several jobs. See :meth:`gsf.ese.server.Server.job_statuses`.
+    """
+    job_ids = [int(job_id) for job_id in job_ids]
+    statuses = dict((job_id, None) for job_id in job_ids)
+    unique_ids = list(statuses)
+    try:
+        for start in range(0, len(unique_ids), page_size):
+            ids = unique_ids[start:start + page_size]
+            page = _get_page(jobs_url, transport, dict(jobIds=','.join(str(job_id)
+                                                                      for job_id in ids)))
+            records = [JobStatus.from_status(status_document) for status_document in page]
+            if any(record.job_id not in statuses for record in records):
+                # The server ignores jobIds; its page says nothing about the requested jobs.
+                break
+            for record in records:
+                statuses[record.job_id] = record
+    except HTTPError as err:
+        if err.code != 404:
+            raise ServerNotFoundError('HTTP code {}, Reason: {}'.format(err.code, err.reason))
+
+    # Ask for each status the listing did not give, which also tells apart jobs that do not
+    # exist from jobs a server left out of its listing.
+    missing = [job_id for job_id in unique_ids if statuses[job_id] is None]
+
+    def get_status(job_id):
+        try:
+            return JobStatus.from_status(http.get(
+                '{}/{}/status'.format(jobs_url, job_id), transport))
+        except HTTPError:
+            return None
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for job_id, record in zip(missing, executor.map(get_status, missing)):
+                statuses[job_id] = record
+    return statuses
+
+
+def _filters(status, since):
+    query = dict()
+    if status is not None:
+        statuses = list(status) if isinstance(status, (list, tuple, set, frozenset)) else [status]
+        try:
+            query['status'] = ','.join(_ESE_STATUSES[name] for name in statuses)
+        except KeyError as err:
+            raise ValueError('Unknown job status {}, expected one of {}'.format(
+                err, ', '.join(sorted(_ESE_STATUSES))))
+    if since is not None:
+        if hasattr(since, 'timestamp'):
+            since = since.timestamp()
+        query['since'] = repr(float(since))
+    return query
+
+
+def _submitted(status_document):
+    """Returns the submission time of a job in seconds since the epoch, or None if unknown."""
+    submitted = status_document.get('jobSubmitted')
+    if isinstance(submitted, (int, float)):
+        return float(submitted)
+    try:
+        seconds = calendar.timegm(time.strptime(submitted[:19], '%Y-%m-%dT%H:%M:%S'))
+    except (TypeError, ValueError):
+        return None
+    fraction = re.match(r'\.\d+', submitted[19:])
+    return seconds + (float(fraction.group()) if fraction else 0.0)
+
+
+def _get_page(jobs_url, transport, query):
+    return http.get('?'.join((jobs_url, urlencode(sorted(query.items())))), transport)['jobs']
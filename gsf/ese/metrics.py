@@ -0,0 +1,237 @@
+"""
+Implements a request hook that collects metrics about the HTTP requests of the ESE client.
+
+:Example:
+
+>>> from gsf.ese.metrics import MetricsCollector
+>>> collector = MetricsCollector(slow_threshold=0.5).install()
+>>> job = task.submit(parameters)
+>>> job.wait_for_done()
+>>> print(collector.prometheus())
+# HELP gsf_http_request_duration_seconds Duration of GSF HTTP requests.
+# TYPE gsf_http_request_duration_seconds histogram
+gsf_http_request_duration_seconds_bucket{method="GET",endpoint="/ese/jobs/{id}/status",le="0.005"} 12
+...
+>>> collector.slow_requests
+[RequestEvent(method='POST', url='http://localhost:9191/ese/services/ENVI/...', ...)]
+"""
+import threading
+from collections import deque
+
+# Python 3
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+from . import http
+
+#: Upper bounds in seconds of the latency histogram buckets.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+#: Requests taking at least this many seconds are kept in the slow request log.
+DEFAULT_SLOW_THRESHOLD = 1.0
+
+#: Number of slow requests kept in the log.
+DEFAULT_SLOW_LOG_SIZE = 100
+
+
+def endpoint(url):
+    """
+    Returns the path of *url* with numeric segments such as job ids replaced by ``{id}``, so
+    that requests for different jobs are counted together.
+    """
+    return '/'.join('{id}' if segment.isdigit() else segment
+                    for segment in urlsplit(url).path.split('/'))
+
+
+class _EndpointMetrics(object):
+    """The counters of one method and endpoint."""
+
+    __slots__ = ('buckets', 'count', 'total', 'sent', 'received', 'errors', 'in_flight')
+
+    def __init__(self, bucket_count):
+        self.buckets = [0] * bucket_count
+        self.count = 0
+        self.total = 0.0
+        self.sent = 0
+        self.received = 0
+        self.errors = {}
+        self.in_flight = 0
+
+
+class MetricsCollector(object):
+    """
+    A request hook keeping, per method and endpoint, a latency histogram, sent and received byte
+    counters, error counts and the number of requests in flight, along with a log of the
+    slowest recent requests.
+
+    Errors are counted by kind: ``connection`` when no response was received, or the HTTP
+    status code for responses of 400 and above.
+
+    :param buckets: The upper bounds in seconds of the histogram buckets, in increasing order.
+    :param slow_threshold: Requests taking at least this many seconds are logged.
+    :param slow_log_size: The number of slow requests kept.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, slow_threshold=DEFAULT_SLOW_THRESHOLD,
+                 slow_log_size=DEFAULT_SLOW_LOG_SIZE):
+        self.buckets = tuple(buckets)
+        self.slow_threshold = slow_threshold
+        self._slow = deque(maxlen=slow_log_size)
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def install(self):
+        """Starts collecting metrics for every transport. Returns the collector."""
+        http.add_request_hook(self)
+        return self
+
+    def uninstall(self):
+        """Stops collecting metrics."""
+        http.remove_request_hook(self)
+
+    def request_started(self, method, url):
+        """Counts a request in flight. Called by the transports."""
+        key = (method, endpoint(url))
+        with self._lock:
+            self._get(key).in_flight += 1
+
+    def request_finished(self, event):
+        """Records a finished request. Called by the transports."""
+        key = (event.method, endpoint(event.url))
+        index = 0
+        for bound in self.buckets:
+            if event.elapsed <= bound:
+                break
+            index += 1
+        if event.error is not None and event.status is None:
+            error = 'connection'
+        elif event.status is not None and event.status >= 400:
+            error = str(event.status)
+        else:
+            error = None
+        with self._lock:
+            metrics = self._get(key)
+            metrics.in_flight -= 1
+            metrics.count += 1
+            metrics.total += event.elapsed
+            if index < len(self.buckets):
+                metrics.buckets[index] += 1
+            metrics.sent += event.bytes_sent
+            metrics.received += event.bytes_received
+            if error is not None:
+                metrics.errors[error] = metrics.errors.get(error, 0) + 1
+            if event.elapsed >= self.slow_threshold:
+                self._slow.append(event)
+
+    @property
+    def slow_requests(self):
+        """
+        The most recent requests that took at least slow_threshold seconds, oldest first.
+
+        :return: a list of gsf.ese.http.RequestEvent tuples
+        """
+        with self._lock:
+            return list(self._slow)
+
+    def reset(self):
+        """Discards every recorded metric, keeping the counts of requests in flight."""
+        with self._lock:
+            for key, metrics in list(self._metrics.items()):
+                fresh = self._metrics[key] = _EndpointMetrics(len(self.buckets))
+                fresh.in_flight = metrics.in_flight
+            self._slow.clear()
+
+    def summary(self):
+        """
+        Returns the metrics of every endpoint.
+
+        :return: a dictionary of (method, endpoint) to a dictionary with the request ``count``,
+            ``total_seconds``, ``bytes_sent``, ``bytes_received``, ``errors`` by kind,
+            ``in_flight`` and cumulative histogram ``buckets`` as (upper bound, count) pairs
+        """
+        with self._lock:
+            return dict((key, dict(count=metrics.count, total_seconds=metrics.total,
+                                   bytes_sent=metrics.sent, bytes_received=metrics.received,
+                                   errors=dict(metrics.errors), in_flight=metrics.in_flight,
+                                   buckets=self._cumulative(metrics)))
+                        for key, metrics in self._metrics.items())
+
+    def prometheus(self, prefix='gsf_http'):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+
+        :param prefix: The prefix of the metric names.
+        :return: a string
+        """
+        summary = sorted(self.summary().items())
+        lines = []
+
+        def family(name, kind, description):
+            lines.append('# HELP {}_{} {}'.format(prefix, name, description))
+            lines.append('# TYPE {}_{} {}'.format(prefix, name, kind))
+
+        def sample(name, labels, value):
+            lines.append('{}_{}{{{}}} {}'.format(prefix, name, ','.join(
+                '{}="{}"'.format(label, _escape(label_value)) for label, label_value in labels),
+                _format(value)))
+
+        family('request_duration_seconds', 'histogram', 'Duration of GSF HTTP requests.')
+        for (method, path), metrics in summary:
+            labels = [('method', method), ('endpoint', path)]
+            for bound, count in metrics['buckets']:
+                sample('request_duration_seconds_bucket', labels + [('le', _format(bound))],
+                       count)
+            sample('request_duration_seconds_sum', labels, metrics['total_seconds'])
+            sample('request_duration_seconds_count', labels, metrics['count'])
+
+        family('request_bytes_total', 'counter', 'Bytes sent in GSF HTTP request bodies.')
+        for (method, path), metrics in summary:
+            sample('request_bytes_total', [('method', method), ('endpoint', path)],
+                   metrics['bytes_sent'])
+
+        family('response_bytes_total', 'counter', 'Bytes received in GSF HTTP response bodies.')
+        for (method, path), metrics in summary:
+            sample('response_bytes_total', [('method', method), ('endpoint', path)],
+                   metrics['bytes_received'])
+
+        family('request_errors_total', 'counter', 'Failed GSF HTTP requests by kind.')
+        for (method, path), metrics in summary:
+            for kind, count in sorted(metrics['errors'].items()):
+                sample('request_errors_total',
+                       [('method', method), ('endpoint', path), ('kind', kind)], count)
+
+        family('requests_in_flight', 'gauge', 'GSF HTTP requests in progress.')
+        for (method, path), metrics in summary:
+            sample('requests_in_flight', [('method', method), ('endpoint', path)],
+                   metrics['in_flight'])
+
+        return '\n'.join(lines) + '\n'
+
+    def _get(self, key):
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics[key] = _EndpointMetrics(len(self.buckets))
+        return metrics
+
+    def _cumulative(self, metrics):
+        pairs = []
+        count = 0
+        for bound, bucket_count in zip(self.buckets, metrics.buckets):
+            count += bucket_count
+            pairs.append((bound, count))
+        pairs.append((float('inf'), metrics.count))
+        return pairs
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
@@ -0,0 +1,365 @@
+"""
+Implements an event-driven monitor of job status changes.
+
+A :class:`StatusMonitor` receives job status documents pushed by the server through a
+:class:`Notifier`, instead of requesting the status of every job in flight over and over, and
+calls the registered callbacks as soon as a job's status or progress changes. The default
+notifier, :class:`EventStreamNotifier`, reads server-sent events from the jobs event endpoint
+of the server, ``GET /ese/jobs/events``, where each event carries the ESE status document of a
+job in its ``data`` field. When the server does not support notifications, or the stream is
+interrupted, the monitor falls back to the adaptive polling of a
+:class:`gsf.ese.polling.Poller`.
+
+:Example:
+
+>>> from gsf import Server
+>>> from gsf.ese.job import wait_all
+>>> from gsf.ese.monitor import StatusMonitor
+>>> server = Server('localhost', '9191')
+>>> monitor = StatusMonitor(server)
+>>> job = server.service('ENVI').task('SpectralIndex').submit(parameters)
+>>> monitor.watch(job, on_progress=lambda job, snapshot: print(snapshot.progress))
+>>> monitor.wait(job)
+>>> done, not_done = wait_all(jobs, poller=monitor)
+>>> monitor.close()
+"""
+import json
+import logging
+import threading
+from abc import abstractmethod
+
+# Python 3
+try:
+    from urllib.error import HTTPError
+except ImportError:
+    from urllib2 import HTTPError
+
+from ..error import JobNotFoundError, JobTimeoutError, ServerNotFoundError
+from ..gsfmeta import GSFMeta
+from ..utils import with_metaclass
+from . import http
+from .job import JobStatus
+from .polling import default_poller, _call
+
+_logger = logging.getLogger(__name__)
+
+#: Socket timeout in seconds of the event stream. Servers send keep-alive comments more often.
+DEFAULT_EVENT_TIMEOUT = 300.0
+
+
+class Notifier(with_metaclass(GSFMeta, object)):
+    """
+    The base class of the transports a StatusMonitor receives job status changes through.
+
+    Subclasses implement :meth:`start`, and call the listener with a
+    :class:`gsf.ese.job.JobStatus` for every status document the server sends. The listener
+    may receive the status of jobs that are not watched; they are ignored.
+    """
+
+    @abstractmethod
+    def start(self, listener, disconnected):
+        """
+        Starts receiving notifications in the background.
+
+        :param listener: A function called with a JobStatus for every notification.
+        :param disconnected: A function called without arguments once no more notifications
+            will be received, unless the notifier was closed.
+        :return: True if the server supports the notifications, False otherwise
+        """
+        pass
+
+    def close(self):
+        """Stops receiving notifications."""
+
+
+class EventStreamNotifier(Notifier):
+    """
+    Receives job status documents as server-sent events.
+
+    The stream is read on a dedicated connection with a long socket timeout, so the
+    connections of the server's transport are left for ordinary requests. Events are separated
+    by blank lines; comment lines, such as keep-alives, are ignored.
+
+    :param events_url: The URL of the event stream, such as
+        ``http://localhost:9191/ese/jobs/events``.
+    :param timeout: Seconds without any data, including keep-alive comments, after which the
+        stream is considered interrupted.
+    :param connect_timeout: Seconds to wait for the connection and the response headers.
+    """
+
+    def __init__(self, events_url, timeout=DEFAULT_EVENT_TIMEOUT,
+                 connect_timeout=http.DEFAULT_TIMEOUT):
+        self.events_url = events_url
+        self.timeout = timeout
+        self._transport = http.Transport(pool_size=0, timeout=connect_timeout)
+        self._response = None
+        self._thread = None
+        self._closed = False
+
+    def start(self, listener, disconnected):
+        try:
+            self._response = self._transport.open('GET', self.events_url,
+                                                  headers={'Accept': 'text/event-stream'})
+        except (HTTPError, ServerNotFoundError):
+            return False
+        if not self._response.headers.get('content-type', '').startswith('text/event-stream'):
+            self._response.close()
+            return False
+        self._response.set_timeout(self.timeout)
+        self._thread = threading.Thread(target=self._read, args=(listener, disconnected),
+                                        name='gsf-events')
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def close(self):
+        self._closed = True
+        response = self._response
+        if response is not None:
+            response.abort()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _read(self, listener, disconnected):
+        response = self._response
+        data = []
+        try:
+            while not self._closed:
+                line = response.readline()
+                if not line:
+                    break
+                line = line.decode('utf-8').rstrip('\r\n')
+                if not line:
+                    if data:
+                        self._dispatch('\n'.join(data), listener)
+                    data = []
+                    continue
+                field, _, value = line.partition(':')
+                if field == 'data':
+                    data.append(value[1:] if value.startswith(' ') else value)
+        except ServerNotFoundError:
+            pass
+        except Exception:
+            _logger.exception('Cannot read the job status events of %s', self.events_url)
+        finally:
+            response.close()
+        if not self._closed:
+            disconnected()
+
+    @staticmethod
+    def _dispatch(data, listener):
+        try:
+            status = json.loads(data)
+            snapshot = JobStatus.from_status(status)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # Events that are not job status documents are not meant for us.
+            return
+        listener(snapshot)
+
+
+class _Subscription(object):
+    __slots__ = ('job', 'handlers', 'last', 'lock', 'polled')
+
+    def __init__(self, job):
+        self.job = job
+        self.handlers = []
+        self.last = None
+        self.lock = threading.Lock()
+        self.polled = False
+
+
+class StatusMonitor(object):
+    """
+    Watches the jobs of a server and calls back on status and progress changes, using the
+    notifications pushed by the server when it supports them and polling otherwise.
+
+    A StatusMonitor may be passed as the *poller* of :func:`gsf.ese.job.as_completed`,
+    :func:`gsf.ese.job.wait_all` and :func:`gsf.ese.job.wait_any`. The snapshots it receives
+    are stored in the watched Job objects, so reading their properties sends no request.
+
+    Callbacks are called from background threads, in order for each job. They must not block
+    for long, since they hold up the notifications of the other jobs.
+
+    :param server: The gsf.ese.server.Server whose jobs are watched.
+    :param notifier: The Notifier receiving the status changes, by default an
+        EventStreamNotifier reading the server's event stream.
+    :param poller: The Poller used when the server does not send notifications, by default the
+        process-wide one.
+    :param events: If False, do not try to receive notifications and always poll.
+    """
+
+    def __init__(self, server, notifier=None, poller=None, events=True):
+        self._jobs_url = '/'.join((server._url, 'jobs'))
+        self._poller = poller or default_poller()
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+        self._notifier = None
+        if events:
+            notifier = notifier or EventStreamNotifier(self._jobs_url + '/events')
+            if notifier.start(self._notified, self._disconnected):
+                self._notifier = notifier
+
+    @property
+    def notified(self):
+        """True while job status changes are pushed by the server, False when they are polled."""
+        return self._notifier is not None
+
+    def watch(self, job, callback=None, on_status=None, on_progress=None):
+        """
+        Starts watching *job*. The current status of the job is requested once, so that changes
+        that happened before the call are not missed.
+
+        :param job: A gsf.ese.job.Job of the monitor's server.
+        :param callback: A function called with the job once it has succeeded or failed, or
+            once it turns out not to exist.
+        :param on_status: A function called with the job and its JobStatus snapshot when its
+            status changes, starting with the current status.
+        :param on_progress: A function called with the job and its JobStatus snapshot when its
+            progress or progress message changes, starting with the current progress.
+        :return: None
+        """
+        with self._lock:
+            subscription = self._subscriptions.get(job._url)
+            new = subscription is None
+            if new:
+                subscription = self._subscriptions[job._url] = _Subscription(job)
+            subscription.handlers.append((callback, on_status, on_progress))
+            notified = self._notifier is not None
+            if new and not notified:
+                subscription.polled = True
+        if not new:
+            last = subscription.last
+            if last is not None:
+                with subscription.lock:
+                    if on_status is not None:
+                        _call(on_status, job, last)
+                    if on_progress is not None:
+                        _call(on_progress, job, last)
+            return
+        if not notified:
+            self._poller.watch(job, self._polled, self._update)
+            return
+        try:
+            snapshot = job.refresh()
+        except JobNotFoundError:
+            return self._finish(subscription)
+        except Exception:
+            # Poll this job rather than risk missing a change that happened before the call.
+            self._poll(subscription)
+            return
+        self._update(job, snapshot)
+
+    def unwatch(self, job, callback=None):
+        """
+        Removes the callbacks registered with :meth:`watch` along with *callback*, or every
+        callback of the job if it is None. The job stops being watched once none are left.
+
+        :return: None
+        """
+        with self._lock:
+            subscription = self._subscriptions.get(job._url)
+            if subscription is None:
+                return
+            subscription.handlers = [handlers for handlers in subscription.handlers
+                                     if callback is not None and handlers[0] != callback]
+            if subscription.handlers:
+                return
+            del self._subscriptions[job._url]
+        if subscription.polled:
+            self._poller.unwatch(job, self._polled, self._update)
+
+    def wait(self, job, timeout=None):
+        """
+        Blocks execution until the job has succeeded or failed.
+
+        :param job: A gsf.ese.job.Job of the monitor's server.
+        :param timeout: The maximum number of seconds to wait, or None to wait indefinitely.
+        :return: None
+        """
+        done = threading.Event()
+
+        def callback(job):
+            done.set()
+        self.watch(job, callback)
+        if not done.wait(timeout):
+            self.unwatch(job, callback)
+            raise JobTimeoutError('Job not done after {} seconds'.format(timeout))
+
+    def close(self):
+        """Stops receiving notifications and stops watching every job."""
+        with self._lock:
+            notifier, self._notifier = self._notifier, None
+            subscriptions, self._subscriptions = self._subscriptions, {}
+        if notifier is not None:
+            notifier.close()
+        for subscription in subscriptions.values():
+            if subscription.polled:
+                self._poller.unwatch(subscription.job, self._polled, self._update)
+
+    def _notified(self, snapshot):
+        subscription = self._subscriptions.get('{}/{}/status'.format(self._jobs_url,
+                                                                      snapshot.job_id))
+        if subscription is not None:
+            self._update(subscription.job, snapshot)
+
+    def _disconnected(self):
+        # The server stopped sending notifications; poll the jobs from now on.
+        with self._lock:
+            if self._notifier is None:
+                return
+            self._notifier = None
+            subscriptions = [subscription for subscription in self._subscriptions.values()
+                             if not subscription.polled]
+            for subscription in subscriptions:
+                subscription.polled = True
+        for subscription in subscriptions:
+            self._poller.watch(subscription.job, self._polled, self._update)
+
+    def _poll(self, subscription):
+        with self._lock:
+            if self._subscriptions.get(subscription.job._url) is not subscription or \
+                    subscription.polled:
+                return
+            subscription.polled = True
+        self._poller.watch(subscription.job, self._polled, self._update)
+
+    def _polled(self, job):
+        # The poller found the job done, or not found.
+        subscription = self._subscriptions.get(job._url)
+        if subscription is not None:
+            self._finish(subscription)
+
+    def _update(self, job, snapshot):
+        subscription = self._subscriptions.get(job._url)
+        if subscription is None:
+            return
+        with subscription.lock:
+            last = subscription.last
+            # Snapshots may arrive out of order from the notifier and a status request.
+            if last is not None and (last.done or snapshot.timestamp < last.timestamp):
+                return
+            status_changed = last is None or last.status != snapshot.status
+            progress_changed = last is None or (last.progress, last.progress_message) != (
+                snapshot.progress, snapshot.progress_message)
+            if not (status_changed or progress_changed):
+                return
+            subscription.last = snapshot
+            job._store(snapshot)
+            for _, on_status, on_progress in list(subscription.handlers):
+                if status_changed and on_status is not None:
+                    _call(on_status, job, snapshot)
+                if progress_changed and on_progress is not None:
+                    _call(on_progress, job, snapshot)
+        if snapshot.done:
+            self._finish(subscription)
+
+    def _finish(self, subscription):
+        with self._lock:
+            if self._subscriptions.get(subscription.job._url) is not subscription:
+                return
+            del self._subscriptions[subscription.job._url]
+        if subscription.polled:
+            self._poller.unwatch(subscription.job, self._polled, self._update)
+        for callback, _, _ in subscription.handlers:
+            if callback is not None:
+                _call(callback, subscription.job)
@@ -0,0 +1,277 @@
+"""
+Schedules polls of the ESE job status endpoint.
+
+:class:`PollSchedule` computes adaptive intervals for a single job, and :class:`Poller` polls
+many jobs from a shared set of background threads under a global request budget.
+"""
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+
+from ..error import JobNotFoundError
+
+_logger = logging.getLogger(__name__)
+
+#: Seconds to wait before the first status poll.
+DEFAULT_MIN_INTERVAL = 0.1
+
+#: Upper bound in seconds on the wait between two status polls.
+DEFAULT_MAX_INTERVAL = 30.0
+
+#: Factor the interval grows by after each poll.
+DEFAULT_BACKOFF = 1.5
+
+#: Fraction of the interval that is randomly added or removed, to spread out many pollers.
+DEFAULT_JITTER = 0.1
+
+#: Maximum number of status requests per second sent by a Poller.
+DEFAULT_REQUEST_BUDGET = 50.0
+
+#: Number of threads a Poller uses to send status requests.
+DEFAULT_POLLER_THREADS = 4
+
+
+class PollSchedule(object):
+    """
+    Decides how long to wait before the next status poll of a job.
+
+    The interval starts at *min_interval* and grows by *backoff* after every poll, up to
+    *max_interval*. When the server reports progress, the rate of progress between two polls
+    is used to estimate when the job will finish, and the next poll is never scheduled later
+    than that estimate. Each interval is randomly spread by *jitter* so that many pollers
+    started together do not hit the server at the same moment.
+
+    :param min_interval: The shortest wait in seconds.
+    :param max_interval: The longest wait in seconds.
+    :param backoff: The factor the interval grows by after each poll.
+    :param jitter: The fraction of the interval that is randomized.
+    """
+
+    def __init__(self, min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL,
+                 backoff=DEFAULT_BACKOFF, jitter=DEFAULT_JITTER):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff = backoff
+        self.jitter = jitter
+        self._interval = min_interval
+        self._last = None
+
+    def next_interval(self, snapshot=None):
+        """
+        Returns the number of seconds to wait before polling again.
+
+        :param snapshot: The JobStatus returned by the latest poll, if any.
+        :return: a float
+        """
+        interval = self._interval
+        self._interval = min(self._interval * self.backoff, self.max_interval)
+
+        if snapshot is not None:
+            remaining = self._estimate_remaining(snapshot)
+            if remaining is not None:
+                interval = min(interval, remaining)
+
+        if self.jitter:
+            interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _estimate_remaining(self, snapshot):
+        last, self._last = self._last, (snapshot.progress, snapshot.timestamp)
+        if last is None:
+            return None
+        try:
+            rate = (snapshot.progress - last[0]) / float(snapshot.timestamp - last[1])
+        except (TypeError, ZeroDivisionError):
+            return None
+        if rate <= 0:
+            return None
+        return (100 - snapshot.progress) / rate
+
+
+class _Watch(object):
+    """The polling state of one job watched by a Poller."""
+
+    __slots__ = ('job', 'schedule', 'callbacks', 'listeners')
+
+    def __init__(self, job, schedule):
+        self.job = job
+        self.schedule = schedule
+        self.callbacks = []
+        self.listeners = []
+
+
+class Poller(object):
+    """
+    Polls the status of many jobs from a small set of background threads.
+
+    Every watched job is polled on its own :class:`PollSchedule`, while the poller as a whole
+    sends at most *request_budget* status requests per second. When a job succeeds or fails,
+    or turns out not to exist, each callback registered for it is called with the job and the
+    job stops being polled. A job watched several times is still polled only once.
+
+    :param request_budget: The maximum number of status requests per second.
+    :param threads: The number of threads sending status requests.
+    :param min_interval: The shortest wait in seconds between two polls of a job.
+    :param max_interval: The longest wait in seconds between two polls of a job.
+    :param backoff: The factor the wait grows by after each poll.
+    :param jitter: The fraction of the wait that is randomized.
+    """
+
+    def __init__(self, request_budget=DEFAULT_REQUEST_BUDGET, threads=DEFAULT_POLLER_THREADS,
+                 min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL,
+                 backoff=DEFAULT_BACKOFF, jitter=DEFAULT_JITTER):
+        self.request_budget = request_budget
+        self.threads = threads
+        self._schedule_args = (min_interval, max_interval, backoff, jitter)
+        self._condition = threading.Condition()
+        self._watches = {}
+        self._queue = []
+        self._counter = itertools.count()
+        self._tokens = float(request_budget)
+        self._refilled = time.time()
+        self._workers = []
+        self._closed = False
+
+    def watch(self, job, callback, listener=None):
+        """
+        Starts polling *job*, and calls ``callback(job)`` once it is done.
+
+        :param job: The job to poll.
+        :param callback: A function taking the job as its only argument.
+        :param listener: A function called with the job and its JobStatus snapshot after every
+            successful poll, including the last one.
+        :return: None
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Poller is closed')
+            watch = self._watches.get(job)
+            if watch is None:
+                watch = self._watches[job] = _Watch(job, PollSchedule(*self._schedule_args))
+                self._push(time.time(), watch)
+            watch.callbacks.append(callback)
+            if listener is not None:
+                watch.listeners.append(listener)
+            self._start()
+            self._condition.notify()
+
+    def unwatch(self, job, callback, listener=None):
+        """
+        Removes a callback, and its listener, registered with :meth:`watch`. The job stops being
+        polled once no callbacks are left for it.
+
+        :return: None
+        """
+        with self._condition:
+            watch = self._watches.get(job)
+            if watch is None:
+                return
+            for registered, item in ((watch.callbacks, callback), (watch.listeners, listener)):
+                try:
+                    registered.remove(item)
+                except ValueError:
+                    pass
+            if not watch.callbacks:
+                del self._watches[job]
+
+    def close(self):
+        """Stops the polling threads. Callbacks of jobs that are still watched are not called."""
+        with self._condition:
+            self._closed = True
+            self._watches.clear()
+            del self._queue[:]
+            self._condition.notify_all()
+        for worker in self._workers:
+            if worker is not threading.current_thread():
+                worker.join()
+
+    def _start(self):
+        # Replace the threads that have stopped, so the poller recovers whatever happened.
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < self.threads:
+            worker = threading.Thread(target=self._run, name='gsf-poller')
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def _push(self, due, watch):
+        heapq.heappush(self._queue, (due, next(self._counter), watch))
+
+    def _next(self):
+        """Waits for the next watch that is due and within the request budget."""
+        with self._condition:
+            while not self._closed:
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+                due, _, watch = self._queue[0]
+                if self._watches.get(watch.job) is not watch:
+                    heapq.heappop(self._queue)
+                    continue
+                now = time.time()
+                if due > now:
+                    self._condition.wait(due - now)
+                    continue
+                self._tokens = min(float(self.request_budget),
+                                   self._tokens + (now - self._refilled) * self.request_budget)
+                self._refilled = now
+                if self._tokens < 1:
+                    self._condition.wait((1 - self._tokens) / self.request_budget)
+                    continue
+                self._tokens -= 1
+                heapq.heappop(self._queue)
+                return watch
+        return None
+
+    def _run(self):
+        while True:
+            watch = self._next()
+            if watch is None:
+                return
+            try:
+                snapshot = watch.job.refresh()
+                done = snapshot.done
+            except JobNotFoundError:
+                done, snapshot = True, None
+            except Exception:
+                # Connection problems are often transient; keep polling on the schedule.
+                done, snapshot = False, None
+            if snapshot is not None and watch.listeners:
+                for listener in list(watch.listeners):
+                    _call(listener, watch.job, snapshot)
+            with self._condition:
+                if self._watches.get(watch.job) is not watch:
+                    continue
+                if not done:
+                    self._push(time.time() + watch.schedule.next_interval(snapshot), watch)
+                    self._condition.notify()
+                    continue
+                del self._watches[watch.job]
+                callbacks = watch.callbacks
+            for callback in callbacks:
+                _call(callback, watch.job)
+
+
+def _call(function, *args):
+    # An exception raised by a callback must not stop the threads shared by every watch.
+    try:
+        function(*args)
+    except Exception:
+        _logger.exception('Exception in job status callback %r', function)
+
+
+_default_poller = None
+_default_lock = threading.Lock()
+
+
+def default_poller():
+    """Returns the process-wide Poller shared by the multi-job wait functions."""
+    global _default_poller
+    if _default_poller is None:
+        with _default_lock:
+            if _default_poller is None:
+                _default_poller = Poller()
+    return _default_poller
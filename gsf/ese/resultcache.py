@@ -0,0 +1,228 @@
+"""
+Implements a cache of submitted jobs keyed by task and parameters, so that submitting the same
+job again returns the existing job instead of running it a second time.
+
+The key is a hash of the task URI and a canonical JSON encoding of the parameters, in which
+dictionary keys are sorted, so equal parameter dictionaries give the same key whatever their
+order. NumPy arrays are hashed from their data, without converting them to lists. Only the
+job id is stored; the job is looked up on the server when it is reused, and jobs that have
+failed or no longer exist are submitted again.
+
+:Example:
+
+>>> from gsf import Server
+>>> from gsf.ese.http import Transport
+>>> from gsf.ese.resultcache import ResultCache, DiskStore
+>>> transport = Transport(result_cache=ResultCache(DiskStore('/tmp/gsf-results'), ttl=3600))
+>>> server = Server('localhost', '9191', transport=transport)
+>>> task = server.service('ENVI').task('SpectralIndex')
+>>> job = task.submit(parameters)
+>>> task.submit(parameters) == job
+True
+>>> task.submit(parameters, reuse=False) == job
+False
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from ..cache import LRUCache
+from .arrays import get_numpy
+from .files import make_directory, remove, write_atomic
+
+#: Seconds a submitted job is reused for identical submissions.
+DEFAULT_TTL = 24 * 60 * 60.0
+
+#: Maximum number of jobs remembered by a store.
+DEFAULT_MAXSIZE = 1024
+
+#: A DiskStore checks its size once per this fraction of maxsize new entries.
+PRUNE_FRACTION = 8
+
+#: Format version of the DiskStore files.
+STORE_VERSION = 1
+
+
+def result_key(uri, parameters):
+    """
+    Returns the key of a submission.
+
+    :param uri: The task URI.
+    :param parameters: The dictionary of job parameters. NumPy arrays are hashed by their
+        dtype, shape and data.
+    :return: a hexadecimal string
+    """
+    arrays = []
+    canonical = json.dumps(parameters, sort_keys=True, separators=(',', ':'),
+                           default=lambda value: _canonical_default(value, arrays))
+    digest = hashlib.sha256(uri.encode('utf-8'))
+    digest.update(b'\n')
+    digest.update(canonical.encode('utf-8'))
+    for array in arrays:
+        _update_array(digest, array)
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    """
+    Remembers the job submitted for each task and parameter combination for *ttl* seconds.
+
+    Pass it to a :class:`gsf.ese.http.Transport` as *result_cache*. Task.submit then consults
+    it unless called with ``reuse=False``.
+
+    :param store: A MemoryStore, the default, or a DiskStore shared between processes.
+    :param ttl: Seconds a job is reused, or None to reuse it for as long as the store keeps it.
+    """
+
+    def __init__(self, store=None, ttl=DEFAULT_TTL):
+        self.store = store if store is not None else MemoryStore()
+        self.ttl = ttl
+
+    def get(self, key):
+        """Returns the id of the job recorded for *key*, or None."""
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+        if self.ttl is not None and time.time() - entry['stored'] >= self.ttl:
+            self.store.delete(key)
+            return None
+        return entry['job_id']
+
+    def set(self, key, job_id):
+        """Records the job submitted for *key*."""
+        self.store.set(key, dict(job_id=job_id, stored=time.time()))
+
+    def discard(self, key):
+        """Forgets the job recorded for *key*."""
+        self.store.delete(key)
+
+    def clear(self):
+        """Forgets every recorded job."""
+        self.store.clear()
+
+
+class MemoryStore(object):
+    """
+    Keeps entries in memory, evicting the least recently used beyond *maxsize*.
+
+    :param maxsize: The maximum number of entries.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self._entries = LRUCache(maxsize)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, entry):
+        self._entries.set(key, entry)
+
+    def delete(self, key):
+        self._entries.invalidate(key)
+
+    def clear(self):
+        self._entries.invalidate()
+
+
+class DiskStore(object):
+    """
+    Keeps entries as one small JSON file per key in *directory*, so that several processes, or
+    later runs of a pipeline, reuse each other's jobs. Files are written atomically. Beyond
+    *maxsize* files, the oldest are removed. The directory is listed on the first write and then
+    only every ``maxsize / PRUNE_FRACTION`` writes, so it may briefly hold that many extra files.
+
+    :param directory: The directory holding the entry files. It is created if needed.
+    :param maxsize: The maximum number of entries.
+    """
+
+    def __init__(self, directory, maxsize=DEFAULT_MAXSIZE):
+        self.directory = directory
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._writes = None
+
+    def __len__(self):
+        return len(self._paths())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as entry_file:
+                entry = json.loads(entry_file.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get('version') != STORE_VERSION or \
+                entry.get('key') != key:
+            return None
+        return entry
+
+    def set(self, key, entry):
+        entry = dict(entry, version=STORE_VERSION, key=key)
+        if not make_directory(self.directory):
+            return
+        try:
+            write_atomic(self._path(key), json.dumps(entry).encode('utf-8'))
+        except (IOError, OSError):
+            return
+        with self._lock:
+            if self._writes is None or self._writes >= self._prune_interval():
+                self._writes = 0
+                self._prune()
+            self._writes += 1
+
+    def delete(self, key):
+        remove(self._path(key))
+
+    def clear(self):
+        for path in self._paths():
+            remove(path)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def _paths(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                if name.endswith('.json')]
+
+    def _prune_interval(self):
+        if self.maxsize is None:
+            return float('inf')
+        return max(1, self.maxsize // PRUNE_FRACTION)
+
+    def _prune(self):
+        paths = self._paths()
+        if self.maxsize is None or len(paths) <= self.maxsize:
+            return
+        ages = []
+        for path in paths:
+            try:
+                ages.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+        ages.sort()
+        for _, path in ages[:len(ages) - self.maxsize]:
+            remove(path)
+
+
+def _canonical_default(value, arrays):
+    numpy = get_numpy()
+    if numpy is not None:
+        if isinstance(value, numpy.ndarray) and not value.dtype.hasobject:
+            # The data is hashed after the JSON encoding, in the order the arrays appear in it.
+            arrays.append(value)
+            return {'ndarray': len(arrays) - 1}
+        if isinstance(value, (numpy.ndarray, numpy.generic)):
+            return value.tolist()
+    raise TypeError('Cannot encode {!r} in a result cache key'.format(value))
+
+
+def _update_array(digest, array):
+    """Adds the dtype, shape and data of a NumPy array to a hash without converting it."""
+    digest.update('\n{!r} {!r}\n'.format(array.dtype.descr, array.shape).encode('utf-8'))
+    digest.update(get_numpy().ascontiguousarray(array))
\ No newline at end of file
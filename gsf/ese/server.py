@@ -15,16 +15,35 @@ except ImportError:
 from ..server import Server as BaseServer
 from .service import Service
 from .job import Job
-from ..decorators import memoize
+from .catalog import fetch_catalog, DEFAULT_CONCURRENCY
+from .joblist import iter_jobs, job_statuses, DEFAULT_PAGE_SIZE
+from ..decorators import cached
 from ..error import ServerNotFoundError
+from .diskcache import DiskCache
 from . import http
 
 
 class Server(BaseServer):
     """
     The Server connects to GSF using HTTP requests.
+
+    Pass a ``transport`` keyword argument with a :class:`gsf.ese.http.Transport` to use a
+    dedicated connection pool instead of the process-wide default, or a ``codec`` keyword
+    argument with a JSON codec or codec name (see :func:`gsf.ese.http.get_codec`) to use a
+    dedicated pool with that codec.
+
+    Servers, and the services, tasks and jobs obtained from them, are thread-safe and may be
+    shared by any number of threads. Identical GET requests made at the same time by several
+    threads are sent once and their response is shared, see :class:`gsf.ese.http.Transport`.
     """
     def __init__(self, *args, **kwargs):
+        codec = kwargs.pop('codec', None)
+        transport = kwargs.pop('transport', None)
+        if transport is None and codec is not None:
+            transport = http.Transport(codec=codec, catalog_cache=DiskCache.from_environment())
+        elif codec is not None:
+            raise ValueError('Pass either a transport or a codec, not both')
+        self._transport = transport or http.default_transport()
         super(Server, self).__init__(*args, **kwargs)
         self._root_path = 'ese'
         self._services_path = 'services'
@@ -54,7 +73,8 @@ class Server(BaseServer):
         :param service_name: The name of the service to return.
         :return: Returns the gsf.service object.
         """
-        return Service('/'.join((self._url, self._services_path, service_name)))
+        return Service('/'.join((self._url, self._services_path, service_name)),
+                       transport=self._transport)
 
     def job(self, job_id):
         """
@@ -62,15 +82,68 @@ class Server(BaseServer):
         :param jobID:
         :return:
         """
-        return Job('/'.join((self._url, 'jobs', str(job_id))))
+        return Job('/'.join((self._url, 'jobs', str(job_id))), transport=self._transport)
+
+    def jobs(self, status=None, since=None, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Returns a generator over the jobs on the server, in increasing job id order, see
+        :mod:`gsf.ese.joblist`. Pages of *page_size* jobs are requested as the generator is
+        consumed, so stopping early requests no further pages.
+
+        Jobs are selected by offset, so a job whose status changes while the pages are read may
+        be missed or yielded twice when filtering by status.
+
+        :param status: A job status, such as ``Failed``, or a list of them, to list only jobs
+            in those statuses.
+        :param since: Seconds since the epoch, or a datetime, to list only jobs submitted at or
+            after that time.
+        :param page_size: The number of jobs requested at a time.
+        :return: an iterator of gsf.ese.job.JobStatus records
+        """
+        return iter_jobs('/'.join((self._url, 'jobs')), self._transport, status, since,
+                         page_size)
+
+    def job_statuses(self, job_ids, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Returns the status of several jobs, requesting up to *page_size* of them at a time. If
+        the server cannot list jobs by id, the statuses are requested in parallel instead.
+
+        :param job_ids: An iterable of job ids.
+        :param page_size: The number of jobs requested at a time.
+        :return: a dictionary of job id to gsf.ese.job.JobStatus, or to None for a job that
+            does not exist
+        """
+        return job_statuses('/'.join((self._url, 'jobs')), self._transport, job_ids,
+                            page_size)
+
+    def catalog(self, concurrency=DEFAULT_CONCURRENCY):
+        """
+        Fetches every service and task definition in parallel.
+
+        :param concurrency: The maximum number of requests in flight.
+        :return: an immutable gsf.ese.catalog.Catalog indexing services, tasks and parameters
+        """
+        return fetch_catalog(self, concurrency)
+
+    def invalidate(self):
+        """
+        Discards the cached list of services so that it is requested again on next use.
+
+        :return: None
+        """
+        self._http_get.invalidate()
+        http.invalidate_catalog(self._services_url(), self._transport)
+
+    def _services_url(self):
+        return '/'.join((self._url, self._services_path))
 
-    @memoize
+    @cached()
     def _http_get(self):
         """
 
         :return:
         """
         try:
-            return http.get('/'.join((self._url, self._services_path)))
+            return http.get_catalog(self._services_url(), self._transport)
         except HTTPError as err:
             raise ServerNotFoundError('HTTP code {}, Reason: {}'.format(err.code, err.reason))
@@ -12,7 +12,7 @@ from ..error import ServiceNotFoundError
 
 from ..service import Service as BaseService
 from .task import Task
-from ..decorators import memoize
+from ..decorators import cached
 from . import http
 
 
@@ -20,11 +20,12 @@ class Service(BaseService):
     """
     Creates a GSF Service object that can list tasks and create task objects.
     """
-    def __init__(self, url):
+    def __init__(self, url, transport=None):
         self._url = url
+        self._transport = transport or http.default_transport()
 
     def task(self, task_name):
-        return Task('/'.join((self._url, task_name)))
+        return Task('/'.join((self._url, task_name)), transport=self._transport)
 
     def tasks(self):
         service_info = self._http_get()
@@ -40,10 +41,19 @@ class Service(BaseService):
         service_info = self._http_get()
         return str(service_info['description'])
 
-    @memoize
+    def invalidate(self):
+        """
+        Discards the cached service information so that it is requested again on next use.
+
+        :return: None
+        """
+        self._http_get.invalidate()
+        http.invalidate_catalog(self._url, self._transport)
+
+    @cached()
     def _http_get(self):
         try:
-            return  http.get(self._url)
+            return http.get_catalog(self._url, self._transport)
         except HTTPError as err:
             raise ServiceNotFoundError('HTTP code {}, Reason: {}'.format(err.code, err.reason))
 
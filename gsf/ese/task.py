@@ -10,19 +10,31 @@ except ImportError:
     from urllib2 import HTTPError
     from urlparse import urlparse, urlunparse
 
+from concurrent.futures import Future, ThreadPoolExecutor
+
 from ..task import Task as BaseTask
-from ..error import TaskNotFoundError
-from ..decorators import memoize
+from ..error import TaskNotFoundError, JobFailedError, JobNotFoundError
+from ..decorators import cached
 from . import http
-from .job import Job
+from .executor import default_executor
+from .job import Job, JobBatch
+from .polling import default_poller
+from .resultcache import result_key
+from .validation import ValidatorMixin
+
+#: Number of submit requests Task.submit_many sends in parallel.
+DEFAULT_CONCURRENCY = 8
 
 
-class Task(BaseTask):
+class Task(ValidatorMixin, BaseTask):
     """
     Creates a GSF task that can submit jobs and list task parameters.
     """
     def __init__(self, *args, **kwargs):
+        self._transport = kwargs.pop('transport', None) or http.default_transport()
         super(Task, self).__init__(*args, **kwargs)
+        self._submit_url = '/'.join((self._uri, 'submitJob'))
+        self._jobs_url = _jobs_url(self._uri)
 
     @property
     def uri(self):
@@ -48,45 +60,207 @@ class Task(BaseTask):
         info = self._http_get()
         return info['parameters']
 
-    def submit(self, parameters):
-        submit_job_url = '/'.join((self._uri, 'submitJob'))
+    def submit(self, parameters, validate=True, reuse=True):
+        """
+        Submits a job. See :meth:`gsf.task.Task.submit`.
+
+        If the transport has a result cache, see :mod:`gsf.ese.resultcache`, and the same
+        parameters were submitted to this task before, the earlier job is returned instead,
+        unless it has failed or no longer exists on the server. Identical submissions made by
+        several threads at once then share a single job.
+
+        :param parameters: A dictionary of key-value pairs of parameter names and values.
+            Array values may be NumPy arrays, which are streamed to the server; see
+            :mod:`gsf.ese.arrays`.
+        :param validate: If True, check the parameters against the task parameter definitions
+            first and raise a ParameterValidationError instead of submitting an invalid job.
+        :param reuse: If False, always submit a new job, and record it in the result cache.
+        :return: GSF Job object
+        """
+        if validate:
+            self.validator.validate(parameters)
+        return self._job(self._submit_cached(parameters, reuse))
+
+    def submit_many(self, parameters_list, concurrency=DEFAULT_CONCURRENCY, validate=True,
+                    reuse=True):
+        """
+        Submits a job for every parameter dictionary, sending up to *concurrency* requests in
+        parallel.
+
+        A failed submission does not stop the others; its exception is recorded in the errors
+        of the returned batch instead. Parameter dictionaries that fail validation are recorded
+        with a ParameterValidationError and never sent.
+
+        :param parameters_list: An iterable of parameter dictionaries, see :meth:`submit`.
+        :param concurrency: The maximum number of submit requests in flight.
+        :param validate: If True, check every parameter dictionary before submitting.
+        :param reuse: If False, always submit new jobs. Otherwise earlier jobs are reused
+            through the result cache of the transport, as by :meth:`submit`.
+        :return: a JobBatch holding a Job, or None for a failed submission, per input in order
+        """
+        validator = self.validator if validate else None
+
+        def submit(parameters):
+            try:
+                if validator is not None:
+                    validator.validate(parameters)
+                return _job_id(self._submit_cached(parameters, reuse)), None
+            except Exception as err:
+                return None, err
+
+        batch = JobBatch(self._jobs_url, self._transport)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for job_id, error in executor.map(submit, parameters_list):
+                batch.append(job_id, error)
+        return batch
+
+    def submit_async(self, parameters, executor=None, poller=None):
+        """
+        Submits a job without blocking and returns a future for its results.
+
+        The submit request runs on *executor* and the job is then polled by *poller*, so no
+        thread is held while the job runs. The future resolves to the job results, or raises a
+        JobFailedError with the job error message if the job fails, or the error raised by the
+        submission. The future can be cancelled until the submit request is sent; after that it
+        is running and cancel returns False, since the job cannot be cancelled on the server.
+
+        :param parameters: A dictionary of key-value pairs of parameter names and values.
+        :param executor: The concurrent.futures.Executor that sends the submit request. Defaults
+            to the shared executor from :mod:`gsf.ese.executor`.
+        :param poller: The Poller that waits for the job. Defaults to the shared poller.
+        :return: a concurrent.futures.Future
+        """
+        poller = poller or default_poller()
+        future = Future()
+
+        def finished(job):
+            try:
+                snapshot = job.refresh()
+            except Exception as err:
+                future.set_exception(err)
+                return
+            if snapshot.status == 'Failed':
+                future.set_exception(JobFailedError(snapshot.error_message))
+            else:
+                future.set_result(snapshot.results)
+
+        def submit():
+            # Mark the future running before sending the request, so that it cannot be
+            # cancelled once a job may exist on the server.
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                poller.watch(self.submit(parameters), finished)
+            except Exception as err:
+                future.set_exception(err)
+
+        (executor or default_executor()).submit(submit)
+        return future
+
+    def _submit(self, parameters):
         try:
-            status = http.post(submit_job_url, parameters)
+            status = http.post(self._submit_url, parameters, self._transport)
         except HTTPError as err:
             raise TaskNotFoundError('HTTP code {}, Reason: {}'.format(err.code, err.reason))
+        return status['jobId']
 
-        parsed_url = urlparse(self._uri)
-        split_path = parsed_url.path.split('/')
-        job_url = urlunparse((parsed_url.scheme,
-                              parsed_url.netloc,
-                              '/'.join((split_path[1], 'jobs', str(status['jobId']))),
-                              None, None, None))
-        return Job(job_url)
+    def _job(self, job_id):
+        return Job('/'.join((self._jobs_url, str(job_id))), transport=self._transport)
 
-    @memoize
-    def _http_get(self):
-        try:
-            info = http.get(self._uri)
-            parameters = info['parameters']
-            for parameter in parameters:
-                parameter['name'] = str(parameter['name'])
-                parameter['description'] = str(parameter['description'])
-                parameter['display_name'] = str(parameter.pop('displayName'))
-                if parameter['dataType'].count('['):
-                    parameter['dimensions'] = '[' + parameter['dataType'].split('[')[1]
-                parameter['type'] = str(parameter.pop('dataType').split('[')[0])
+    def _submit_cached(self, parameters, reuse):
+        """Submits a job through the result cache of the transport, if any, and returns its id."""
+        cache = self._transport.result_cache
+        if cache is None:
+            return self._submit(parameters)
+        key = result_key(self._uri, parameters)
+        if not reuse:
+            job_id = self._submit(parameters)
+            cache.set(key, job_id)
+            return job_id
 
-                parameter['direction'] = parameter['direction'].lower()
-                parameter['required'] = True if parameter['parameterType'] == 'required' else False
-                parameter.pop('parameterType')
+        def submit():
+            job_id = self._reusable_job_id(cache, key)
+            if job_id is None:
+                job_id = self._submit(parameters)
+                cache.set(key, job_id)
+            return job_id
+        return self._transport.flights.call(('submitJob', key), submit)
 
-                if 'defaultValue' in parameter:
-                    parameter['default_value'] = parameter.pop('defaultValue')
+    def _reusable_job_id(self, cache, key):
+        """Returns the id of the job recorded for *key* unless it failed or is gone, or None."""
+        job_id = cache.get(key)
+        if job_id is None:
+            return None
+        try:
+            failed = self._job(job_id).status == 'Failed'
+        except JobNotFoundError:
+            failed = True
+        if failed:
+            cache.discard(key)
+            return None
+        return job_id
 
-                if 'choiceList' in parameter:
-                    parameter['choice_list'] = parameter.pop('choiceList')
+    def invalidate(self):
+        """
+        Discards the cached task information so that it is requested again on next use.
 
-            return info
+        :return: None
+        """
+        self._http_get.invalidate()
+        self._validator.invalidate()
+        http.invalidate_catalog(self._uri, self._transport)
 
+    @cached()
+    def _http_get(self):
+        try:
+            return http.get_catalog(self._uri, self._transport, _parse_task_info)
         except HTTPError as err:
             raise TaskNotFoundError('HTTP code {}, Reason: {}'.format(err.code, err.reason))
+
+
+def _job_id(job_id):
+    """Returns a job id returned by the server as an integer."""
+    try:
+        return int(job_id)
+    except (TypeError, ValueError):
+        raise ValueError('The server returned job id {!r}, which is not an integer'.format(
+            job_id))
+
+
+def _jobs_url(task_uri):
+    """Returns the ESE jobs endpoint for jobs submitted through the task at *task_uri*."""
+    parsed_url = urlparse(task_uri)
+    split_path = parsed_url.path.split('/')
+    return urlunparse((parsed_url.scheme,
+                       parsed_url.netloc,
+                       '/'.join((split_path[1], 'jobs')),
+                       None, None, None))
+
+
+def _parse_task_info(info):
+    """
+    Returns a copy of an ESE task description with normalized parameter definitions. The
+    description itself is left unchanged, since it may be shared with other callers.
+    """
+    parameters = []
+    for source in info['parameters']:
+        parameter = dict(source)
+        parameter['name'] = str(parameter['name'])
+        parameter['description'] = str(parameter['description'])
+        parameter['display_name'] = str(parameter.pop('displayName'))
+        if parameter['dataType'].count('['):
+            parameter['dimensions'] = '[' + parameter['dataType'].split('[')[1]
+        parameter['type'] = str(parameter.pop('dataType').split('[')[0])
+
+        parameter['direction'] = parameter['direction'].lower()
+        parameter['required'] = True if parameter['parameterType'] == 'required' else False
+        parameter.pop('parameterType')
+
+        if 'defaultValue' in parameter:
+            parameter['default_value'] = parameter.pop('defaultValue')
+
+        if 'choiceList' in parameter:
+            parameter['choice_list'] = parameter.pop('choiceList')
+        parameters.append(parameter)
+
+    return dict(info, parameters=parameters)
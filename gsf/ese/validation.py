@@ -0,0 +1,324 @@
+"""
+Implements client-side validation of job parameters against the task parameter definitions.
+
+The definitions of a task are compiled once into a list of small check functions per parameter,
+so a parameter dictionary is validated without looking anything up in the definitions again.
+Problems are reported as ParameterError tuples rather than as a single message.
+
+:Example:
+
+>>> validator = ParameterValidator(task.parameters)
+>>> validator.errors(dict(INDEX='Unknown Index'))
+[ParameterError(parameter='INPUT_RASTER', code='missing', message='...'),
+ ParameterError(parameter='INDEX', code='choice', message='...')]
+"""
+import numbers
+from collections import namedtuple
+
+from ..decorators import cached
+from ..error import ParameterValidationError
+from .arrays import get_numpy
+
+try:
+    _STRING_TYPES = (str, unicode)
+except NameError:
+    _STRING_TYPES = (str,)
+
+# Value ranges of the IDL integer types.
+_INTEGER_RANGES = {
+    'BYTE': (0, 2 ** 8 - 1),
+    'INT': (-2 ** 15, 2 ** 15 - 1),
+    'UINT': (0, 2 ** 16 - 1),
+    'LONG': (-2 ** 31, 2 ** 31 - 1),
+    'ULONG': (0, 2 ** 32 - 1),
+    'LONG64': (-2 ** 63, 2 ** 63 - 1),
+    'ULONG64': (0, 2 ** 64 - 1),
+}
+
+_FLOAT_TYPES = ('FLOAT', 'DOUBLE')
+
+
+class ParameterError(namedtuple('ParameterError', ['parameter', 'code', 'message'])):
+    """
+    Describes one invalid parameter.
+
+    The *code* is one of ``missing``, ``unknown``, ``type``, ``dimensions``, ``choice`` or
+    ``range``.
+    """
+    __slots__ = ()
+
+
+class ParameterValidator(object):
+    """
+    Validates job parameter dictionaries against the parameter definitions of a task, as
+    returned by :attr:`gsf.task.Task.parameters`.
+
+    Required input parameters must be present and names must match a definition. Values are
+    checked against the type, dimensions, choice_list, min and max of their definition. Types
+    the client does not know, such as ENVIRASTER, are left for the server to check.
+
+    Dimensions are given in IDL order, fastest varying first, so a ``[3,2]`` parameter takes a
+    list of 2 lists of 3 values, or a NumPy array of shape (2, 3). NumPy arrays are checked
+    with whole-array operations on their dtype, shape and values.
+
+    :param parameters: A list of parameter definitions.
+    """
+
+    __slots__ = ('_checks', '_array_checks', '_required')
+
+    def __init__(self, parameters):
+        self._checks = dict()
+        self._array_checks = dict()
+        self._required = []
+        for definition in parameters:
+            name = definition['name']
+            if definition.get('direction', 'input') == 'input' and definition.get('required'):
+                self._required.append(name)
+            self._checks[name] = _compile(definition)
+            self._array_checks[name] = _compile_array(definition)
+
+    def errors(self, parameters):
+        """
+        Returns the problems found in a parameter dictionary.
+
+        :param parameters: A dictionary of parameter names and values.
+        :return: a list of ParameterError tuples, empty if the parameters are valid
+        """
+        errors = [ParameterError(name, 'missing', 'Required parameter {} is missing'.format(name))
+                  for name in self._required if parameters.get(name) is None]
+        checks = self._checks
+        numpy = get_numpy()
+        for name, value in parameters.items():
+            parameter_checks = checks.get(name)
+            if parameter_checks is None:
+                errors.append(ParameterError(name, 'unknown',
+                                             'Unknown parameter {}'.format(name)))
+                continue
+            if value is None:
+                continue
+            if numpy is not None and isinstance(value, (numpy.ndarray, numpy.generic)):
+                if value.ndim:
+                    error = self._array_checks[name](name, value)
+                    if error is not None:
+                        errors.append(error)
+                    continue
+                value = value.item()
+            for check in parameter_checks:
+                error = check(name, value)
+                if error is not None:
+                    errors.append(error)
+                    break
+        return errors
+
+    def validate(self, parameters):
+        """
+        Raises a ParameterValidationError listing every problem if the parameters are invalid.
+
+        :param parameters: A dictionary of parameter names and values.
+        """
+        errors = self.errors(parameters)
+        if errors:
+            raise ParameterValidationError(errors)
+
+
+class ValidatorMixin(object):
+    """
+    Adds the :attr:`validator` of its parameters to a task class. The task's ``invalidate``
+    method must call ``self._validator.invalidate()``.
+    """
+
+    @property
+    def validator(self):
+        """
+        The ParameterValidator compiled from the task parameters. It is compiled once and kept
+        until :meth:`invalidate` is called.
+
+        :return: a gsf.ese.validation.ParameterValidator
+        """
+        return self._validator()
+
+    @cached()
+    def _validator(self):
+        return ParameterValidator(self.parameters)
+
+
+def _compile(definition):
+    """Returns the check functions for one parameter definition."""
+    checks = []
+    dimensions = _parse_dimensions(definition.get('dimensions'))
+    if dimensions is not None:
+        checks.append(_dimensions_check(dimensions, definition.get('dimensions')))
+
+    element_checks = []
+    type_check = _type_check(definition.get('type', '').upper())
+    if type_check is not None:
+        element_checks.append(type_check)
+    if definition.get('choice_list'):
+        element_checks.append(_choice_check(definition['choice_list']))
+    if definition.get('min') is not None or definition.get('max') is not None:
+        element_checks.append(_range_check(definition.get('min'), definition.get('max')))
+
+    if dimensions is None:
+        checks.extend(element_checks)
+    elif element_checks:
+        checks.append(_elements_check(element_checks))
+    return checks
+
+
+def _compile_array(definition):
+    """Returns a check function for a NumPy array value of one parameter definition."""
+    dimensions = definition.get('dimensions')
+    sizes = _parse_dimensions(dimensions)
+    shape = tuple(reversed(sizes)) if sizes is not None else None
+    type_name = definition.get('type', '').upper()
+    choice_list = definition.get('choice_list')
+    minimum = definition.get('min')
+    maximum = definition.get('max')
+    if type_name in _INTEGER_RANGES:
+        kinds, bounds = 'iu', _INTEGER_RANGES[type_name]
+    elif type_name in _FLOAT_TYPES:
+        kinds, bounds = 'iuf', None
+    elif type_name == 'STRING':
+        kinds, bounds = 'US', None
+    elif type_name == 'BOOLEAN':
+        kinds, bounds = 'b', None
+    else:
+        kinds, bounds = None, None
+
+    def check(name, value):
+        if shape is None or len(shape) != value.ndim or any(
+                size is not None and size != actual for size, actual in zip(shape, value.shape)):
+            return ParameterError(name, 'dimensions', '{} must be {}, not an array of shape {}'
+                                  .format(name, 'an array of dimensions ' + dimensions
+                                          if dimensions else 'a scalar', value.shape))
+        if kinds is not None and value.dtype.kind not in kinds:
+            return ParameterError(name, 'type', '{} must be {}, not an array of dtype {}'.format(
+                name, type_name, value.dtype))
+        if not value.size:
+            return None
+        if bounds is not None and (value.min() < bounds[0] or value.max() > bounds[1]):
+            return ParameterError(name, 'range', '{} values do not fit in {}'.format(
+                name, type_name))
+        if choice_list and not get_numpy().isin(value, choice_list).all():
+            return ParameterError(name, 'choice', '{} values must be in {}'.format(
+                name, ', '.join(str(choice) for choice in choice_list)))
+        if ((minimum is not None and value.min() < minimum) or
+                (maximum is not None and value.max() > maximum)):
+            return ParameterError(name, 'range', '{} values must be in [{}, {}]'.format(
+                name, '' if minimum is None else minimum, '' if maximum is None else maximum))
+    return check
+
+
+def _parse_dimensions(dimensions):
+    """Returns the sizes of the dimensions, with None for ``*``, or None for a scalar."""
+    if not dimensions:
+        return None
+    sizes = []
+    for size in dimensions.strip('[]').split(','):
+        size = size.strip()
+        sizes.append(int(size) if size.isdigit() else None)
+    return sizes
+
+
+def _type_check(type_name):
+    if type_name in _INTEGER_RANGES:
+        low, high = _INTEGER_RANGES[type_name]
+
+        def check(name, value):
+            if isinstance(value, bool) or not isinstance(value, numbers.Integral):
+                return ParameterError(name, 'type', '{} must be an integer, not {!r}'.format(
+                    name, value))
+            if not low <= value <= high:
+                return ParameterError(name, 'range', '{} value {} does not fit in {}'.format(
+                    name, value, type_name))
+        return check
+
+    if type_name in _FLOAT_TYPES:
+        def check(name, value):
+            if isinstance(value, bool) or not isinstance(value, numbers.Real):
+                return ParameterError(name, 'type', '{} must be a number, not {!r}'.format(
+                    name, value))
+        return check
+
+    if type_name == 'STRING':
+        def check(name, value):
+            if not isinstance(value, _STRING_TYPES):
+                return ParameterError(name, 'type', '{} must be a string, not {!r}'.format(
+                    name, value))
+        return check
+
+    if type_name == 'BOOLEAN':
+        def check(name, value):
+            if value not in (True, False):
+                return ParameterError(name, 'type', '{} must be a boolean, not {!r}'.format(
+                    name, value))
+        return check
+
+    return None
+
+
+def _choice_check(choice_list):
+    choices = frozenset(choice_list)
+
+    def check(name, value):
+        try:
+            if value in choices:
+                return None
+        except TypeError:
+            pass
+        return ParameterError(name, 'choice', '{} must be one of {}, not {!r}'.format(
+            name, ', '.join(str(choice) for choice in choice_list), value))
+    return check
+
+
+def _range_check(minimum, maximum):
+    def check(name, value):
+        try:
+            if ((minimum is None or value >= minimum) and
+                    (maximum is None or value <= maximum)):
+                return None
+        except TypeError:
+            return None
+        return ParameterError(name, 'range', '{} value {!r} is outside [{}, {}]'.format(
+            name, value, '' if minimum is None else minimum, '' if maximum is None else maximum))
+    return check
+
+
+def _dimensions_check(sizes, dimensions):
+    # Nested lists hold the slowest varying dimension outermost.
+    shape = list(reversed(sizes))
+
+    def check(name, value):
+        if not _has_shape(value, shape):
+            return ParameterError(name, 'dimensions', '{} must be an array of dimensions {}'.format(
+                name, dimensions))
+    return check
+
+
+def _has_shape(value, shape):
+    if not shape:
+        return not isinstance(value, (list, tuple))
+    if not isinstance(value, (list, tuple)):
+        return False
+    if shape[0] is not None and len(value) != shape[0]:
+        return False
+    return all(_has_shape(item, shape[1:]) for item in value)
+
+
+def _elements_check(element_checks):
+    def check(name, value):
+        for item in _flatten(value):
+            for element_check in element_checks:
+                error = element_check(name, item)
+                if error is not None:
+                    return error
+    return check
+
+
+def _flatten(value):
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            for element in _flatten(item):
+                yield element
+    else:
+        yield value
@@ -0,0 +1,36 @@
+"""
+Provides the process-wide executors of the GSF backends, created on first use.
+"""
+import threading
+
+
+class DefaultExecutor(object):
+    """
+    Holds a process-wide executor, created by calling *factory* when it is first needed, so
+    that importing a backend starts no threads or processes.
+
+    :param factory: A function returning a new concurrent.futures.Executor.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Returns the executor, creating it on first use."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._factory()
+        return self._executor
+
+    def set(self, executor):
+        """
+        Replaces the executor.
+
+        :param executor: A concurrent.futures.Executor.
+        :return: None
+        """
+        with self._lock:
+            self._executor = executor
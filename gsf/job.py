@@ -3,10 +3,14 @@ A GSF job object is returned from the GSF Task submit method and is used to quer
 """
 from __future__ import absolute_import
 from abc import abstractmethod, abstractproperty
+from collections import namedtuple
 from string import Template
 from .gsfmeta import GSFMeta
 from .utils import with_metaclass
 
+#: The (done, not_done) sets of jobs returned by the wait_all and wait_any functions.
+DoneAndNotDone = namedtuple('DoneAndNotDone', ['done', 'not_done'])
+
 class Job(with_metaclass(GSFMeta, object)):
     """
     A GSF Job object connects to a GSF Job and its status.
@@ -146,10 +150,12 @@ results: ${results}
         pass
 
     @abstractmethod
-    def wait_for_done(self):
+    def wait_for_done(self, timeout=None):
         """
-        Blocks execution until the job status message is either Succeeded or Failed. 
+        Blocks execution until the job status message is either Succeeded or Failed.
 
+        :param timeout: The maximum number of seconds to wait, or None to wait indefinitely.
+            A gsf.error.JobTimeoutError is raised if the job is not done in time.
         :return: None
         """
         pass
@@ -0,0 +1,26 @@
+"""
+Implements the GSF classes with task functions run in a local process pool instead of on a GSF
+server. Jobs cost no HTTP request and spread over every CPU, which suits development and tasks
+written in Python.
+
+Select the backend with :func:`gsf.use` or the ``GSF_BACKEND`` environment variable, or import
+the classes from this package directly.
+
+:Example:
+
+>>> import gsf
+>>> from gsf.local import register
+>>> @register('Python')
+... def scale(VALUES, FACTOR=2.0):
+...     return dict(OUTPUT=[value * FACTOR for value in VALUES])
+>>> gsf.use('local')
+>>> job = gsf.Server().service('Python').task('scale').submit(dict(VALUES=[1, 2, 3]))
+>>> job.wait_for_done()
+>>> print(job.results)
+{'OUTPUT': [2.0, 4.0, 6.0]}
+"""
+from .registry import register, register_service, unregister
+from .server import Server
+from .service import Service
+from .task import Task
+from .job import Job, wait_all, wait_any, as_completed
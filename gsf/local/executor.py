@@ -0,0 +1,26 @@
+"""
+Provides the process pool that runs the jobs of the local backend.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from ..executor import DefaultExecutor
+
+#: Number of worker processes in the process-wide pool; None uses one per CPU.
+DEFAULT_MAX_WORKERS = None
+
+_default = DefaultExecutor(lambda: ProcessPoolExecutor(max_workers=DEFAULT_MAX_WORKERS))
+
+
+def default_executor():
+    """Returns the process-wide pool used by local servers that were not given their own."""
+    return _default.get()
+
+
+def set_default_executor(executor):
+    """
+    Replaces the process-wide pool, e.g. with a ThreadPoolExecutor while debugging tasks.
+
+    :param executor: A concurrent.futures.Executor.
+    :return: None
+    """
+    _default.set(executor)
@@ -0,0 +1,147 @@
+"""
+Implements the GSF job class for jobs run by the local backend.
+"""
+import itertools
+import threading
+import weakref
+
+import concurrent.futures
+
+from ..job import Job as BaseJob, DoneAndNotDone
+from ..dict import Dict as gsfdict
+from ..error import JobNotFoundError, JobTimeoutError
+
+# Jobs are found by id for as long as they run, and afterwards for as long as the caller keeps
+# them, so that finished jobs and their results do not accumulate for the life of the process.
+_jobs = weakref.WeakValueDictionary()
+_running_jobs = dict()
+_job_ids = itertools.count(1)
+_jobs_lock = threading.Lock()
+
+
+class Job(BaseJob):
+    """
+    A job running, or queued to run, in the local process pool.
+
+    The status is read from the job's future, so the properties never block and cost no
+    request. A job is Accepted while it is queued, Started once it has been handed to a worker
+    process, and Succeeded or Failed when the task function has returned or raised.
+    """
+    def __init__(self, job_id, future):
+        self._job_id = job_id
+        self._future = future
+
+    @property
+    def job_id(self):
+        return self._job_id
+
+    @property
+    def status(self):
+        future = self._future
+        if future.done():
+            return 'Failed' if future.exception() is not None else 'Succeeded'
+        return 'Started' if future.running() else 'Accepted'
+
+    @property
+    def progress(self):
+        return 100 if self._future.done() else 0
+
+    @property
+    def progress_message(self):
+        return ''
+
+    @property
+    def error_message(self):
+        if not self._future.done():
+            return ''
+        error = self._future.exception()
+        return '' if error is None else str(error)
+
+    @property
+    def results(self):
+        future = self._future
+        if not future.done() or future.exception() is not None:
+            return gsfdict()
+        return gsfdict(future.result())
+
+    def wait_for_done(self, timeout=None):
+        done, _ = concurrent.futures.wait([self._future], timeout)
+        if not done:
+            raise JobTimeoutError('Job not done after {} seconds'.format(timeout))
+
+
+def add_job(future):
+    """
+    Creates a job for the future of a submitted task function and records it so that it can
+    be looked up by id while it runs, and once done for as long as the Job object is in use.
+
+    :param future: The concurrent.futures.Future of the task function call.
+    :return: a Job
+    """
+    with _jobs_lock:
+        job = Job(next(_job_ids), future)
+        _jobs[job.job_id] = _running_jobs[job.job_id] = job
+    future.add_done_callback(lambda done: _forget_running(job.job_id))
+    return job
+
+
+def _forget_running(job_id):
+    with _jobs_lock:
+        _running_jobs.pop(job_id, None)
+
+
+def get_job(job_id):
+    """Returns the Job with the given id, or raises a JobNotFoundError."""
+    try:
+        return _jobs[int(job_id)]
+    except (KeyError, ValueError):
+        raise JobNotFoundError('No local job with id {}'.format(job_id))
+
+
+def as_completed(jobs, timeout=None):
+    """
+    Returns an iterator that yields each job as soon as it has succeeded or failed.
+
+    :param jobs: An iterable of local GSF Job objects.
+    :param timeout: The maximum number of seconds to wait for all jobs, or None to wait
+        indefinitely. A JobTimeoutError is raised if some jobs are not done in time.
+    :return: an iterator of GSF Job objects
+    """
+    futures = dict((job._future, job) for job in jobs)
+    done = 0
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout):
+            done += 1
+            yield futures[future]
+    except concurrent.futures.TimeoutError:
+        raise JobTimeoutError('{} of the jobs not done after {} seconds'.format(
+            len(futures) - done, timeout))
+
+
+def wait_all(jobs, timeout=None):
+    """
+    Blocks execution until every job has succeeded or failed, or the timeout has passed.
+
+    :param jobs: An iterable of local GSF Job objects.
+    :param timeout: The maximum number of seconds to wait, or None to wait indefinitely.
+    :return: a (done, not_done) named tuple of sets of jobs
+    """
+    return _wait(jobs, timeout, concurrent.futures.ALL_COMPLETED)
+
+
+def wait_any(jobs, timeout=None):
+    """
+    Blocks execution until at least one job has succeeded or failed, or the timeout has passed.
+
+    :param jobs: An iterable of local GSF Job objects.
+    :param timeout: The maximum number of seconds to wait, or None to wait indefinitely.
+    :return: a (done, not_done) named tuple of sets of jobs
+    """
+    return _wait(jobs, timeout, concurrent.futures.FIRST_COMPLETED)
+
+
+def _wait(jobs, timeout, return_when):
+    futures = dict((job._future, job) for job in jobs)
+    done, not_done = concurrent.futures.wait(futures, timeout, return_when)
+    return DoneAndNotDone(set(futures[future] for future in done),
+                          set(futures[future] for future in not_done))
@@ -0,0 +1,114 @@
+"""
+Holds the services and task callables known to the local backend.
+"""
+import inspect
+import threading
+from collections import OrderedDict, namedtuple
+
+TaskDefinition = namedtuple('TaskDefinition', ['function', 'display_name', 'description',
+                                               'parameters'])
+
+_services = OrderedDict()
+_descriptions = dict()
+_lock = threading.Lock()
+
+
+def register(service, name=None, display_name=None, description=None, parameters=None):
+    """
+    Decorator registering a function as a task of the local backend.
+
+    The function is called in a worker process with the job parameters as keyword arguments
+    and returns a dictionary of output parameter names and values. It must be defined at the
+    top level of a module so the worker processes can import it.
+
+    :param service: The name of the service the task belongs to. It is created if needed.
+    :param name: The task name, by default the function name.
+    :param display_name: The task display name, by default the task name.
+    :param description: The task description, by default the function docstring.
+    :param parameters: A list of parameter definitions as described by
+        :attr:`gsf.task.Task.parameters`. By default an input parameter of unknown type is
+        defined for each argument of the function, required if it has no default value.
+    :return: the decorator, which returns the function unchanged
+    """
+    def decorator(function):
+        task_name = name or function.__name__
+        definition = TaskDefinition(
+            function=function,
+            display_name=display_name or task_name,
+            description=description if description is not None else
+            inspect.cleandoc(function.__doc__ or ''),
+            parameters=parameters if parameters is not None else _signature_parameters(function))
+        with _lock:
+            _services.setdefault(service, OrderedDict())[task_name] = definition
+        return function
+    return decorator
+
+
+def register_service(service, description):
+    """
+    Sets the description of a local service.
+
+    :param service: The name of the service.
+    :param description: The description returned by :attr:`gsf.service.Service.description`.
+    :return: None
+    """
+    with _lock:
+        _services.setdefault(service, OrderedDict())
+        _descriptions[service] = description
+
+
+def unregister(service, name=None):
+    """
+    Removes a task, or a whole service if *name* is None, from the local backend.
+
+    :param service: The name of the service.
+    :param name: The name of the task.
+    :return: None
+    """
+    with _lock:
+        if name is None:
+            _services.pop(service, None)
+            _descriptions.pop(service, None)
+        elif service in _services:
+            _services[service].pop(name, None)
+
+
+def services():
+    """Returns the names of the registered services."""
+    with _lock:
+        return list(_services)
+
+
+def tasks(service):
+    """Returns the names of the tasks of a service, or None if the service does not exist."""
+    with _lock:
+        service_tasks = _services.get(service)
+        return None if service_tasks is None else list(service_tasks)
+
+
+def description(service):
+    """Returns the description of a service."""
+    with _lock:
+        return _descriptions.get(service, '')
+
+
+def task(service, name):
+    """Returns the TaskDefinition of a task, or None if it does not exist."""
+    with _lock:
+        return _services.get(service, {}).get(name)
+
+
+def _signature_parameters(function):
+    """Defines an input parameter for each argument of *function*."""
+    try:
+        signature = inspect.signature(function)
+        arguments = [(parameter.name, parameter.default is parameter.empty)
+                     for parameter in signature.parameters.values()
+                     if parameter.kind in (parameter.POSITIONAL_OR_KEYWORD,
+                                           parameter.KEYWORD_ONLY)]
+    except AttributeError:
+        spec = inspect.getargspec(function)
+        required = len(spec.args) - len(spec.defaults or ())
+        arguments = [(argument, index < required) for index, argument in enumerate(spec.args)]
+    return [dict(name=argument, display_name=argument, description='', type='',
+                 direction='input', required=required) for argument, required in arguments]
@@ -0,0 +1,37 @@
+"""
+Implements the GSF Server class for the local backend.
+"""
+from ..server import Server as BaseServer
+from . import registry
+from .job import get_job
+from .service import Service
+
+
+class Server(BaseServer):
+    """
+    A server running registered task functions in a local process pool, without HTTP.
+
+    The server and port arguments are accepted so that code written for a GSF server runs
+    unchanged, and are otherwise ignored. Pass an ``executor`` keyword argument with a
+    concurrent.futures.Executor to use a dedicated pool instead of the process-wide one.
+    """
+    def __init__(self, server='localhost', port='9191', executor=None):
+        super(Server, self).__init__(server, port)
+        self._executor = executor
+
+    @property
+    def name(self):
+        return self._server
+
+    @property
+    def port(self):
+        return self._port
+
+    def services(self):
+        return registry.services()
+
+    def service(self, service_name):
+        return Service(service_name, executor=self._executor)
+
+    def job(self, job_id):
+        return get_job(job_id)
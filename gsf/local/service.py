@@ -0,0 +1,35 @@
+"""
+Implements the GSF Service class for the services of the local backend.
+"""
+from ..service import Service as BaseService
+from ..error import ServiceNotFoundError
+from . import registry
+from .task import Task
+
+
+class Service(BaseService):
+    """
+    Creates a GSF Service object listing the task functions registered under a service name.
+    """
+    def __init__(self, name, executor=None):
+        self._name = name
+        self._executor = executor
+
+    def task(self, task_name):
+        return Task(self._name, task_name, executor=self._executor)
+
+    def tasks(self):
+        tasks = registry.tasks(self._name)
+        if tasks is None:
+            raise ServiceNotFoundError('No local service {}'.format(self._name))
+        return tasks
+
+    @property
+    def name(self):
+        self.tasks()
+        return self._name
+
+    @property
+    def description(self):
+        self.tasks()
+        return registry.description(self._name)
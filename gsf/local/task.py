@@ -0,0 +1,83 @@
+"""
+Implements the GSF task class for task functions run by the local backend.
+"""
+from ..task import Task as BaseTask
+from ..error import TaskNotFoundError
+from ..ese.validation import ValidatorMixin
+from . import registry
+from .executor import default_executor
+from .job import add_job
+
+
+class Task(ValidatorMixin, BaseTask):
+    """
+    A task function registered with :func:`gsf.local.register`, submitted to a process pool.
+    """
+    def __init__(self, service_name, task_name, executor=None):
+        super(Task, self).__init__('local://{}/{}'.format(service_name, task_name))
+        self._service_name = service_name
+        self._task_name = task_name
+        self._executor = executor
+
+    @property
+    def uri(self):
+        return self._uri
+
+    @property
+    def name(self):
+        self._definition()
+        return self._task_name
+
+    @property
+    def display_name(self):
+        return self._definition().display_name
+
+    @property
+    def description(self):
+        return self._definition().description
+
+    @property
+    def parameters(self):
+        return self._definition().parameters
+
+    def submit(self, parameters, validate=True):
+        """
+        Submits a job to the process pool. See :meth:`gsf.task.Task.submit`.
+
+        :param parameters: A dictionary of key-value pairs of parameter names and values,
+            passed to the task function as keyword arguments. The values must be picklable.
+        :param validate: If True, check the parameters against the task parameter definitions
+            first and raise a ParameterValidationError instead of submitting an invalid job.
+        :return: GSF Job object
+        """
+        definition = self._definition()
+        if validate:
+            self.validator.validate(parameters)
+        executor = self._executor or default_executor()
+        return add_job(executor.submit(_run, definition.function, dict(parameters)))
+
+    def invalidate(self):
+        """
+        Discards the compiled validator so that the parameters are read again on next use.
+
+        :return: None
+        """
+        self._validator.invalidate()
+
+    def _definition(self):
+        definition = registry.task(self._service_name, self._task_name)
+        if definition is None:
+            raise TaskNotFoundError('No local task {} in service {}'.format(
+                self._task_name, self._service_name))
+        return definition
+
+
+def _run(function, parameters):
+    """Calls a task function in a worker process and checks it returned its outputs."""
+    outputs = function(**parameters)
+    if outputs is None:
+        return dict()
+    if not isinstance(outputs, dict):
+        raise TypeError('Task function {} must return a dictionary of outputs, not {!r}'.format(
+            function.__name__, outputs))
+    return outputs
@@ -0,0 +1,250 @@
+"""
+Benchmarks the hot paths of the GSF client against a local stand-in server.
+
+Results are written as JSON so that runs of different releases can be compared::
+
+    python -m gsf.test.bench --output before.json
+    # upgrade gsf
+    python -m gsf.test.bench --output after.json --compare before.json
+
+With ``--compare``, benchmarks that are slower than the baseline by more than the threshold
+are listed and the command exits with status 1.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from gsf import Server
+from gsf.ese.http import Transport
+from gsf.ese.job import _build_result
+from gsf.ese.task import _parse_task_info
+from gsf.test.standin import StandInServer, SPECTRAL_INDEX
+
+try:
+    _clock = time.perf_counter
+except AttributeError:
+    _clock = time.time
+
+#: Fractional slow-down over the baseline reported as a regression.
+DEFAULT_THRESHOLD = 0.2
+
+#: Number of timed runs of each benchmark; the median is reported.
+DEFAULT_REPEAT = 5
+
+PARAMETERS = dict(INPUT_RASTER=dict(url='http://localhost:9191/ese/data/qb_boulder_msi',
+                                    factory='URLRaster'),
+                  INDEX='Normalized Difference Vegetation Index')
+
+_JOB_PROPERTIES = ('status', 'progress', 'progress_message', 'error_message', 'results')
+
+#: The registered benchmarks, in the order they run.
+BENCHMARKS = []
+
+
+def benchmark(number, timed=False):
+    """
+    Registers a benchmark. The decorated function is called with a context dictionary and
+    returns the function to time, which is called *number* times per run. If *timed* is True,
+    the function measures itself and returns the elapsed seconds.
+    """
+    def decorator(setup):
+        BENCHMARKS.append((setup.__name__, setup, number, timed))
+        return setup
+    return decorator
+
+
+def import_time(module='gsf'):
+    """Returns the seconds taken to import *module* in a new interpreter."""
+    output = subprocess.check_output([
+        sys.executable, '-c',
+        'import time; start = time.time(); import {}; print(time.time() - start)'.format(module)])
+    return float(output.decode('ascii').strip())
+
+
+@benchmark(number=200)
+def server_services_cold(context):
+    server = context['server']
+
+    def run():
+        server.invalidate()
+        server.services()
+    return run
+
+
+@benchmark(number=10000)
+def server_services_warm(context):
+    server = context['server']
+    server.services()
+    return server.services
+
+
+@benchmark(number=200)
+def task_parameters_cold(context):
+    task = context['task']
+
+    def run():
+        task.invalidate()
+        task.parameters
+    return run
+
+
+@benchmark(number=10000)
+def task_parameters_warm(context):
+    task = context['task']
+    task.parameters
+    return lambda: task.parameters
+
+
+@benchmark(number=10000)
+def task_parse_info(context):
+    return lambda: _parse_task_info(SPECTRAL_INDEX)
+
+
+@benchmark(number=200)
+def task_submit(context):
+    task = context['task']
+    return lambda: task.submit(PARAMETERS)
+
+
+@benchmark(number=10000)
+def task_validate(context):
+    validator = context['task'].validator
+    return lambda: validator.errors(PARAMETERS)
+
+
+def _job_property(name):
+    def setup(context):
+        job = context['server'].job(context['running_job'].job_id)
+        job.max_age = 0
+        return lambda: getattr(job, name)
+    setup.__name__ = 'job_poll_' + name
+    return setup
+
+
+for _name in _JOB_PROPERTIES:
+    benchmark(number=200)(_job_property(_name))
+
+
+@benchmark(number=10000)
+def job_build_results(context):
+    status = dict(results=[dict(name='OUTPUT_{}'.format(index), value=dict(
+        url='http://localhost:9191/ese/jobs/1/output{}.dat'.format(index),
+        auxiliary_url=['http://localhost:9191/ese/jobs/1/output{}.hdr'.format(index)],
+        factory='URLRaster')) for index in range(5)])
+    return lambda: _build_result(status)
+
+
+@benchmark(number=1, timed=True)
+def import_gsf(context):
+    return import_time
+
+
+def run_benchmarks(repeat=DEFAULT_REPEAT, names=None, standin=None):
+    """
+    Runs the benchmarks and returns their results.
+
+    :param repeat: The number of timed runs of each benchmark.
+    :param names: The names of the benchmarks to run, or None for all of them.
+    :param standin: The StandInServer to use, or None to start one.
+    :return: a dictionary of benchmark name to a dictionary with the median and minimum
+        ``seconds`` per call, the ``calls_per_second`` and the number of ``calls`` per run
+    """
+    own_standin = standin is None
+    if own_standin:
+        standin = StandInServer(job_duration=0.01).start()
+    transport = Transport(catalog_cache=None)
+    try:
+        server = Server(standin.host, str(standin.port), transport=transport)
+        task = server.service('ENVI').task('SpectralIndex')
+        job_duration = standin.job_duration
+        standin.job_duration = 24 * 60 * 60.0
+        running_job = task.submit(PARAMETERS)
+        standin.job_duration = job_duration
+        context = dict(server=server, task=task, running_job=running_job, transport=transport)
+
+        results = dict()
+        for name, setup, number, timed in BENCHMARKS:
+            if names and name not in names:
+                continue
+            func = setup(context)
+            func()
+            timings = []
+            for _ in range(repeat):
+                if timed:
+                    timings.append(sum(func() for _ in range(number)) / number)
+                    continue
+                start = _clock()
+                for _ in range(number):
+                    func()
+                timings.append((_clock() - start) / number)
+            timings.sort()
+            median = timings[len(timings) // 2]
+            results[name] = dict(seconds=median, min_seconds=timings[0],
+                                 calls_per_second=1.0 / median if median else None,
+                                 calls=number)
+        return results
+    finally:
+        transport.close()
+        if own_standin:
+            standin.stop()
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares results with a baseline.
+
+    :return: a list of (name, baseline seconds, seconds, ratio) tuples for the benchmarks that
+        are slower than the baseline by more than *threshold*
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if not base or not base['seconds']:
+            continue
+        ratio = result['seconds'] / base['seconds']
+        if ratio > 1 + threshold:
+            regressions.append((name, base['seconds'], result['seconds'], ratio))
+    return regressions
+
+
+def main(args=None):
+    """Runs the benchmarks from the command line. Returns the exit status."""
+    parser = argparse.ArgumentParser(description='Benchmarks the GSF client.')
+    parser.add_argument('--output', help='file to write the JSON results to')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='JSON results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='slow-down reported as a regression, e.g. 0.2 for 20%%')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('names', nargs='*', help='benchmarks to run, all by default')
+    options = parser.parse_args(args)
+
+    results = run_benchmarks(options.repeat, options.names)
+    report = dict(python=platform.python_version(),
+                  implementation=platform.python_implementation(),
+                  platform=platform.platform(), timestamp=time.time(), results=results)
+    for name, _, _, _ in BENCHMARKS:
+        if name in results:
+            print('{:<28} {:>12.1f} us {:>12.0f} /s'.format(
+                name, results[name]['seconds'] * 1e6, results[name]['calls_per_second'] or 0))
+    if options.output:
+        with open(options.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+
+    if options.compare:
+        with open(options.compare) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = compare(results, baseline, options.threshold)
+        for name, before, after, ratio in regressions:
+            print('REGRESSION {}: {:.1f} us -> {:.1f} us ({:+.0%})'.format(
+                name, before * 1e6, after * 1e6, ratio - 1))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,42 @@
 
 
-GSF_SERVER = dict(name='localhost',
-                  port='9191')
+import os
+import threading
+
+#: Environment variable naming the host:port of a GSF server to run the tests against. When it
+#: is not set, the tests run against an in-process gsf.test.standin.StandInServer.
+SERVER_ENVIRONMENT_VARIABLE = 'GSF_TEST_SERVER'
+
+#: True when the tests run against the stand-in server rather than a real GSF server.
+USE_STANDIN = not os.environ.get(SERVER_ENVIRONMENT_VARIABLE)
+
+_standin = None
+_standin_lock = threading.Lock()
+
+
+def standin():
+    """
+    Returns the stand-in server shared by the tests, starting it on first use, or None when the
+    tests run against a real GSF server.
+    """
+    global _standin
+    if not USE_STANDIN:
+        return None
+    with _standin_lock:
+        if _standin is None:
+            from gsf.test.standin import StandInServer
+            _standin = StandInServer(job_duration=0.5).start()
+    return _standin
+
+
+def gsf_server():
+    """Returns the (name, port) of the GSF server to run the tests against."""
+    if not USE_STANDIN:
+        name, _, port = os.environ[SERVER_ENVIRONMENT_VARIABLE].partition(':')
+        return name, port or '9191'
+    server = standin()
+    return server.host, str(server.port)
+
 
 GSF_SERVICE = dict(name='ENVI')
 
@@ -0,0 +1,531 @@
+"""
+Implements an in-process stand-in for the ESE endpoints of a GSF server, so the tests and
+benchmarks can run without GSF or ENVI installed.
+
+The stand-in serves the service list, service and task descriptions, submitJob, the job list,
+job status, job status events and job output files. Its catalog size, job durations, progress
+curves, failure rate and latency are configurable.
+
+:Example:
+
+>>> from gsf import Server
+>>> from gsf.test.standin import StandInServer
+>>> with StandInServer(services=5, job_duration=0.2, failure_rate=0.1) as standin:
+...     server = Server('127.0.0.1', str(standin.port))
+...     job = server.service('ENVI').task('SpectralIndex').submit(parameters)
+...     job.wait_for_done()
+
+It can also be run on its own, e.g. to benchmark against it from another process::
+
+    python -m gsf.test.standin --port 9191 --services 20 --job-duration 1
+"""
+import argparse
+import gzip
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+from io import BytesIO
+
+# Python 3
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs
+
+SPECTRAL_INDEX = dict(
+    name='SpectralIndex',
+    displayName='Spectral Index',
+    description='This task creates a spectral index raster from one pre-defined spectral index.',
+    parameters=[
+        dict(name='INPUT_RASTER', displayName='Input Raster', dataType='ENVIRASTER',
+             direction='INPUT', parameterType='required', description='Specify a raster.'),
+        dict(name='INDEX', displayName='Index', dataType='STRING', direction='INPUT',
+             parameterType='required', description='Specify a string with the index name.',
+             choiceList=['Normalized Difference Vegetation Index', 'Enhanced Vegetation Index',
+                         'Normalized Difference Water Index']),
+        dict(name='OUTPUT_RASTER_URI', displayName='Output Raster URI', dataType='ENVIURI',
+             direction='INPUT', parameterType='optional',
+             description='Specify a string with the fully qualified filename and path.'),
+        dict(name='OUTPUT_RASTER', displayName='Output Raster', dataType='ENVIRASTER',
+             direction='OUTPUT', parameterType='required', description='The output raster.'),
+    ])
+
+#: Shapes of the job progress over its duration. Each maps the elapsed fraction of the job to
+#: the completed fraction.
+PROGRESS_CURVES = dict(
+    linear=lambda fraction: fraction,
+    ease_in=lambda fraction: fraction * fraction,
+    ease_out=lambda fraction: 1 - (1 - fraction) ** 2,
+    steps=lambda fraction: int(fraction * 4) / 4.0,
+    none=lambda fraction: 0.0,
+)
+
+#: Bytes per chunk of the response bodies sent with chunked transfer encoding.
+CHUNK_SIZE = 512
+
+#: Seconds between two checks for job status changes by the event stream.
+EVENT_INTERVAL = 0.05
+
+#: Seconds after which the event stream sends a keep-alive comment if no job has changed.
+EVENT_KEEPALIVE = 1.0
+
+
+class _HTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class StandInServer(object):
+    """
+    A multi-threaded HTTP server implementing the ESE endpoints used by :mod:`gsf.ese`.
+
+    The catalog holds the ENVI service with the SpectralIndex task, plus *services* synthetic
+    services named ``Service1``, ``Service2``... with *tasks_per_service* tasks each. Jobs
+    of any task succeed with an OUTPUT_RASTER result made of a data file and a header file.
+
+    Requests naming an absolute URI, as sent to a proxy, are answered as if made to the
+    stand-in itself and counted as ``proxied``. ``/redirect/<path>`` answers a 302 redirect to
+    ``/<path>``.
+
+    :param host: The interface to listen on.
+    :param port: The port to listen on, or 0 for a free port.
+    :param services: The number of synthetic services added to the catalog.
+    :param tasks_per_service: The number of tasks of each synthetic service.
+    :param job_duration: Seconds a job runs: a number, a (minimum, maximum) pair for a random
+        duration, or a function returning the duration of a job given its parameters.
+    :param progress: The name of a curve in PROGRESS_CURVES, or a function mapping the
+        elapsed fraction of a job to its completed fraction.
+    :param failure_rate: The probability that a job fails.
+    :param latency: Seconds added before every response: a number or a (minimum, maximum)
+        pair.
+    :param output_size: The size in bytes of the output data file of each job.
+    :param seed: The seed of the random durations, failures and latencies.
+    :param job_listing: If False, the job list endpoint answers 404 Not Found, like a server
+        without it. If ``unfiltered``, it ignores its query parameters and lists every job.
+    :param events: If False, the job status event stream answers 404 Not Found, like a server
+        without it.
+    :param keep_alive: If False, connections are closed after every response without notice,
+        like a server whose keep-alive timeout has passed.
+    :param chunked: If True, response bodies are sent with chunked transfer encoding.
+    :param ranges: If False, Range headers are ignored and output files are always sent whole.
+    :param gzip_files: If True, output files are sent gzip compressed to clients that accept it.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, services=0, tasks_per_service=10,
+                 job_duration=0.5, progress='linear', failure_rate=0.0, latency=0.0,
+                 output_size=64 * 1024, seed=None, job_listing=True, events=True,
+                 keep_alive=True, chunked=False, ranges=True, gzip_files=False):
+        self.job_duration = job_duration
+        self.progress = PROGRESS_CURVES[progress] if not callable(progress) else progress
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.output_size = output_size
+        self.job_listing = job_listing
+        self.events = events
+        self.keep_alive = keep_alive
+        self.chunked = chunked
+        self.ranges = ranges
+        self.gzip_files = gzip_files
+        self.catalog = _build_catalog(services, tasks_per_service)
+        self.requests = dict()
+        self._random = random.Random(seed)
+        self._jobs = dict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self._httpd = _HTTPServer((host, port), _Handler)
+        self._httpd.standin = self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def host(self):
+        """The address the server listens on."""
+        return self._httpd.server_address[0]
+
+    @property
+    def port(self):
+        """The port the server listens on."""
+        return self._httpd.server_address[1]
+
+    @property
+    def url(self):
+        """The URL of the ESE root endpoint."""
+        return 'http://{}:{}/ese'.format(self.host, self.port)
+
+    def start(self):
+        """Starts serving on a daemon thread and returns the server."""
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                            name='gsf-standin')
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops serving, ends the event streams and closes the listening socket."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        """Serves on the calling thread until interrupted."""
+        self._httpd.serve_forever()
+
+    def submit(self, service_name, task_name, parameters):
+        """Creates a job as if it had been submitted, and returns its id."""
+        duration = self.job_duration
+        with self._lock:
+            if callable(duration):
+                duration = duration(parameters)
+            elif isinstance(duration, (tuple, list)):
+                duration = self._random.uniform(*duration)
+            failed = self._random.random() < self.failure_rate
+            job_id = next(self._ids)
+            self._jobs[job_id] = dict(start=time.time(), duration=duration, failed=failed,
+                                      service=service_name, task=task_name)
+        return job_id
+
+    def status(self, job_id):
+        """Returns the ESE status document of a job, or None if there is no such job."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        elapsed = time.time() - job['start']
+        fraction = min(elapsed / job['duration'], 1.0) if job['duration'] > 0 else 1.0
+        status = dict(jobId=job_id, jobProgress=int(100 * self.progress(fraction)),
+                      jobProgressMessage='', jobErrorMessage='', results=[],
+                      jobSubmitted=job['start'])
+        if fraction < 1.0:
+            status['jobStatus'] = 'esriJobExecuting'
+        elif job['failed']:
+            status.update(jobStatus='esriJobFailed', jobProgress=100,
+                          jobErrorMessage='Task failed by the stand-in server')
+        else:
+            url = '{}/jobs/{}/'.format(self.url, job_id)
+            status.update(jobStatus='esriJobSucceeded', jobProgress=100,
+                          results=[dict(name='OUTPUT_RASTER', value=dict(
+                              url=url + 'output.dat', auxiliary_url=[url + 'output.hdr'],
+                              factory='URLRaster'))])
+        return status
+
+    def list_jobs(self, offset=0, limit=None, statuses=None, since=None, job_ids=None):
+        """
+        Returns the status documents of the jobs matching the filters, in increasing id order.
+
+        :param statuses: ESE status names, such as ``esriJobFailed``, to select.
+        :param since: Seconds since the epoch; only jobs submitted at or after it are listed.
+        :param job_ids: The ids of the jobs to select.
+        """
+        with self._lock:
+            jobs = sorted(self._jobs.items())
+        selected = []
+        for job_id, job in jobs:
+            if job_ids is not None and job_id not in job_ids:
+                continue
+            if since is not None and job['start'] < since:
+                continue
+            status = self.status(job_id)
+            if statuses is not None and status['jobStatus'] not in statuses:
+                continue
+            selected.append(status)
+        return selected[offset:None if limit is None else offset + limit]
+
+    def output(self, job_id, name):
+        """Returns the contents of an output file of a succeeded job, or None."""
+        status = self.status(job_id)
+        if status is None or status['jobStatus'] != 'esriJobSucceeded':
+            return None
+        if name == 'output.hdr':
+            return 'ENVI\nsamples = {}\nlines = 1\nbands = 1\ndata type = 1\n'.format(
+                self.output_size).encode('ascii')
+        if name == 'output.dat':
+            seed = hashlib.sha1(str(job_id).encode('ascii')).digest()
+            return (seed * (self.output_size // len(seed) + 1))[:self.output_size]
+        return None
+
+    def delay(self):
+        """Sleeps for the configured latency."""
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            with self._lock:
+                latency = self._random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+    def count(self, endpoint):
+        """Counts a request to an endpoint in the requests dictionary."""
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+
+def _build_catalog(services, tasks_per_service):
+    catalog = dict(ENVI=dict(description='ENVI processing routines',
+                             tasks=dict(SpectralIndex=SPECTRAL_INDEX)))
+    for service_index in range(1, services + 1):
+        tasks = dict()
+        for task_index in range(1, tasks_per_service + 1):
+            name = 'Task{}'.format(task_index)
+            tasks[name] = dict(
+                name=name, displayName='Task {}'.format(task_index),
+                description='Synthetic task {} of service {}.'.format(task_index, service_index),
+                parameters=[
+                    dict(name='INPUT_RASTER', displayName='Input Raster', dataType='ENVIRASTER',
+                         direction='INPUT', parameterType='required', description='A raster.'),
+                    dict(name='GAIN', displayName='Gain', dataType='DOUBLE[*]',
+                         direction='INPUT', parameterType='optional', description='Gains.',
+                         min=0, max=100),
+                    dict(name='OUTPUT_RASTER', displayName='Output Raster',
+                         dataType='ENVIRASTER', direction='OUTPUT', parameterType='required',
+                         description='The output raster.'),
+                ])
+        catalog['Service{}'.format(service_index)] = dict(
+            description='Synthetic service {}'.format(service_index), tasks=tasks)
+    return catalog
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers the ESE requests for the StandInServer of the HTTP server."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_HEAD(self):
+        self._dispatch('HEAD')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        standin = self.server.standin
+        standin.delay()
+        body = self._read_body() if method == 'POST' else None
+        if '://' in self.path.split('?')[0]:
+            standin.count('proxied')
+            self.path = '/' + self.path.partition('://')[2].partition('/')[2]
+        path = [segment for segment in self.path.split('?')[0].split('/') if segment]
+        if path and path[0] == 'redirect':
+            standin.count('redirect')
+            return self._send(302, [('Location', self.path[len('/redirect'):])], b'')
+        if not path or path[0] != 'ese':
+            return self._send_json(404, dict(error='Not Found'))
+        path = path[1:]
+        catalog = standin.catalog
+
+        if path == ['services'] and method == 'GET':
+            standin.count('services')
+            return self._send_json(200, dict(services=[dict(name=name)
+                                                       for name in sorted(catalog)]))
+        if len(path) == 2 and path[0] == 'services' and method == 'GET':
+            standin.count('service')
+            service = catalog.get(path[1])
+            if service is None:
+                return self._send_json(400, dict(error='Bad Request'))
+            return self._send_json(200, dict(name=path[1], description=service['description'],
+                                             tasks=sorted(service['tasks'])))
+        if len(path) in (3, 4) and path[0] == 'services':
+            service = catalog.get(path[1])
+            task = service and service['tasks'].get(path[2])
+            if task is None:
+                return self._send_json(404, dict(error='Not Found'))
+            if len(path) == 3 and method == 'GET':
+                standin.count('task')
+                return self._send_json(200, task)
+            if path[3] == 'submitJob' and method == 'POST':
+                standin.count('submitJob')
+                try:
+                    parameters = json.loads(body.decode('utf-8'))
+                except ValueError:
+                    return self._send_json(400, dict(error='Invalid JSON'))
+                job_id = standin.submit(path[1], path[2], parameters)
+                return self._send_json(200, dict(jobId=job_id, jobStatus='esriJobSubmitted'))
+        if path == ['jobs'] and method == 'GET' and standin.job_listing:
+            standin.count('jobs')
+            query = parse_qs(self.path.partition('?')[2])
+            if standin.job_listing == 'unfiltered':
+                query = dict()
+
+            def values(name):
+                return query[name][0].split(',') if name in query else None
+            return self._send_json(200, dict(jobs=standin.list_jobs(
+                offset=int(query.get('offset', ['0'])[0]),
+                limit=int(query['limit'][0]) if 'limit' in query else None,
+                statuses=values('status'),
+                since=float(query['since'][0]) if 'since' in query else None,
+                job_ids=[int(job_id) for job_id in values('jobIds')]
+                if 'jobIds' in query else None)))
+        if path == ['jobs', 'events'] and method == 'GET' and standin.events:
+            standin.count('events')
+            return self._send_events(standin)
+        if len(path) == 3 and path[0] == 'jobs':
+            try:
+                job_id = int(path[1])
+            except ValueError:
+                job_id = None
+            if path[2] == 'status' and method == 'GET':
+                standin.count('status')
+                status = standin.status(job_id)
+                if status is None:
+                    return self._send_json(404, dict(error='Not Found'))
+                return self._send_json(200, status)
+            data = standin.output(job_id, path[2])
+            if data is not None:
+                standin.count('output')
+                return self._send_file(method, data)
+        self._send_json(404, dict(error='Not Found'))
+
+    def _read_body(self):
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if not size:
+                    while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.read(2)
+            body = b''.join(chunks)
+        else:
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Encoding', '').lower() == 'gzip':
+            body = gzip.GzipFile(fileobj=BytesIO(body)).read()
+        return body
+
+    def _send_json(self, status, document):
+        body = json.dumps(document).encode('utf-8')
+        headers = [('Content-Type', 'application/json; charset=utf-8')]
+        if len(body) > 1024 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = _gzip(body)
+            headers.append(('Content-Encoding', 'gzip'))
+        self._send(status, headers, body)
+
+    def _send_file(self, method, data):
+        etag = '"{}"'.format(hashlib.sha1(data).hexdigest())
+        headers = [('Content-Type', 'application/octet-stream'), ('ETag', etag)]
+        status = 200
+        ranges = ''
+        if self.server.standin.gzip_files and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            headers.append(('Content-Encoding', 'gzip'))
+            return self._send(status, headers, _gzip(data), head_only=method == 'HEAD')
+        if self.server.standin.ranges:
+            headers.append(('Accept-Ranges', 'bytes'))
+            if self.headers.get('If-Range', etag) == etag:
+                ranges = self.headers.get('Range', '')
+        if ranges.startswith('bytes='):
+            start = int(ranges[len('bytes='):].split('-')[0] or 0)
+            if start >= len(data):
+                headers.append(('Content-Range', 'bytes */{}'.format(len(data))))
+                return self._send(416, headers, b'')
+            headers.append(('Content-Range', 'bytes {}-{}/{}'.format(
+                start, len(data) - 1, len(data))))
+            data = data[start:]
+            status = 206
+        self._send(status, headers, data, head_only=method == 'HEAD')
+
+    def _send_events(self, standin):
+        # Streams the status document of every job whose status or progress changed, until the
+        # client disconnects or the stand-in stops.
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        sent = dict()
+        last_write = time.time()
+        try:
+            while not standin._stopped.wait(EVENT_INTERVAL):
+                events = []
+                for status in standin.list_jobs():
+                    state = (status['jobStatus'], status['jobProgress'])
+                    if sent.get(status['jobId']) != state:
+                        sent[status['jobId']] = state
+                        events.append('data: {}\n\n'.format(json.dumps(status)))
+                if not events and time.time() - last_write >= EVENT_KEEPALIVE:
+                    events.append(': keep-alive\n\n')
+                if events:
+                    self.wfile.write(''.join(events).encode('utf-8'))
+                    self.wfile.flush()
+                    last_write = time.time()
+        except (IOError, OSError):
+            pass
+
+    def _send(self, status, headers, body, head_only=False):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        chunked = self.server.standin.chunked
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if head_only:
+            pass
+        elif chunked:
+            for start in range(0, len(body), CHUNK_SIZE):
+                chunk = body[start:start + CHUNK_SIZE]
+                self.wfile.write('{:x}\r\n'.format(len(chunk)).encode('ascii') + chunk + b'\r\n')
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            self.wfile.write(body)
+        if not self.server.standin.keep_alive:
+            self.close_connection = True
+
+
+def _gzip(data):
+    buffer = BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as gzip_file:
+        gzip_file.write(data)
+    return buffer.getvalue()
+
+
+def main(args=None):
+    """Runs a stand-in server until interrupted."""
+    parser = argparse.ArgumentParser(description='Runs a stand-in ESE server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9191)
+    parser.add_argument('--services', type=int, default=0,
+                        help='number of synthetic services')
+    parser.add_argument('--tasks-per-service', type=int, default=10)
+    parser.add_argument('--job-duration', type=float, default=0.5, help='seconds per job')
+    parser.add_argument('--progress', choices=sorted(PROGRESS_CURVES), default='linear')
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds added to every response')
+    options = parser.parse_args(args)
+    standin = StandInServer(options.host, options.port, options.services,
+                            options.tasks_per_service, options.job_duration, options.progress,
+                            options.failure_rate, options.latency)
+    print('Serving ESE on {}'.format(standin.url))
+    try:
+        standin.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Tests the asyncio client classes
+"""
+import asyncio
+import json
+import unittest
+
+from gsf.error import JobTimeoutError, ServerNotFoundError
+from gsf.ese import aio
+from gsf.ese.aio import AsyncServer, AsyncTransport
+from gsf.test import config
+from gsf.test.standin import StandInServer
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def track_connections(transport):
+    """Records the connections opened by a transport in the returned list."""
+    connections = []
+    connect = transport._connect
+
+    async def tracking_connect(key):
+        connection = await connect(key)
+        connections.append(connection)
+        return connection
+    transport._connect = tracking_connect
+    return connections
+
+
+@unittest.skipIf(not config.USE_STANDIN, 'needs the stand-in server')
+class TestAsync(unittest.TestCase):
+    """
+    Test the asyncio client against the stand-in server
+    """
+
+    async def submit_and_wait(self, standin):
+        async with AsyncServer(standin.host, str(standin.port)) as server:
+            task = server.service(config.GSF_SERVICE['name']).task(config.GSF_TASK['name'])
+            self.assertIn('INPUT_RASTER', [parameter['name']
+                                           for parameter in await task.parameters])
+            job = await task.submit(config.GSF_TASK['parameters'])
+            progress = []
+            await job.wait_for_done(timeout=5,
+                                    callback=lambda snapshot: progress.append(snapshot.progress))
+            self.assertEqual(progress[-1], 100)
+            self.assertEqual(await job.status, 'Succeeded')
+            return await job.results
+
+    def test_submit(self):
+        """Verify a job is submitted, waited for, and its results read."""
+        with StandInServer(job_duration=0.1) as standin:
+            results = run(self.submit_and_wait(standin))
+            self.assertTrue(results['OUTPUT_RASTER']['url'].endswith('output.dat'))
+            self.assertEqual(standin.requests['submitJob'], 1)
+
+    def test_chunked(self):
+        """Verify chunked response bodies are read."""
+        with StandInServer(job_duration=0.1, chunked=True) as standin:
+            results = run(self.submit_and_wait(standin))
+            self.assertIn('OUTPUT_RASTER', results)
+
+    def test_gzip(self):
+        """Verify compressed response bodies, chunked or not, are decompressed."""
+        for chunked in (False, True):
+            with StandInServer(chunked=chunked) as standin:
+                url = standin.url + '/services/ENVI/SpectralIndex'
+                expected = json.loads(json.dumps(standin.catalog['ENVI']['tasks'][
+                    'SpectralIndex']))
+
+                async def get():
+                    transport = AsyncTransport()
+                    response = await transport._send('GET', url, None,
+                                                     {'Accept-Encoding': 'gzip'})
+                    self.assertEqual(response[2].get('content-encoding'), 'gzip')
+                    document = await transport.get(url)
+                    await transport.close()
+                    return document
+                self.assertEqual(run(get()), expected)
+
+    def test_wait_timeout(self):
+        """Verify waiting for a job times out."""
+        with StandInServer(job_duration=60) as standin:
+            async def wait():
+                async with AsyncServer(standin.host, str(standin.port)) as server:
+                    job = server.job(standin.submit('ENVI', 'SpectralIndex', {}))
+                    with self.assertRaises(JobTimeoutError):
+                        await job.wait_for_done(timeout=0.2)
+            run(wait())
+
+    def test_cancel(self):
+        """Verify a cancelled request closes its connection instead of leaking it."""
+        with StandInServer(latency=0.5) as standin:
+            async def cancel():
+                transport = AsyncTransport()
+                connections = track_connections(transport)
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(
+                        transport.request('GET', standin.url + '/services'), 0.1)
+                self.assertEqual(len(connections), 1)
+                self.assertTrue(connections[0].writer.transport.is_closing())
+                self.assertEqual(transport._state().idle.get(('http', '{}:{}'.format(
+                    standin.host, standin.port)), []), [])
+                await transport.close()
+            run(cancel())
+
+    def test_reuse(self):
+        """Verify requests share a connection, and a connection closed while idle is replaced."""
+        for keep_alive in (True, False):
+            with StandInServer(keep_alive=keep_alive) as standin:
+                async def get_twice():
+                    transport = AsyncTransport()
+                    connections = track_connections(transport)
+                    await transport.request('GET', standin.url + '/services')
+                    await asyncio.sleep(0.05)
+                    await transport.request('GET', standin.url + '/services')
+                    await transport.close()
+                    return len(connections)
+                self.assertEqual(run(get_twice()), 1 if keep_alive else 2)
+
+    def test_event_loops(self):
+        """Verify a transport and a task can be used from successive event loops."""
+        with StandInServer() as standin:
+            transport = AsyncTransport(pool_size=1)
+            server = AsyncServer(standin.host, str(standin.port), transport=transport)
+            task = server.service(config.GSF_SERVICE['name']).task(config.GSF_TASK['name'])
+
+            async def use():
+                await asyncio.gather(*[transport.request('GET', standin.url + '/services')
+                                       for _ in range(3)])
+                parameters = await task.parameters
+                await transport.close()
+                return len(parameters)
+            self.assertEqual(run(use()), run(use()))
+            self.assertEqual(standin.requests['services'], 6)
+
+    def test_shared_get(self):
+        """Verify coroutines getting the same URL share one request and not its document."""
+        with StandInServer(latency=0.1) as standin:
+            async def get_all():
+                transport = AsyncTransport()
+                documents = await asyncio.gather(*[transport.get(standin.url + '/services')
+                                                   for _ in range(3)])
+                await transport.close()
+                return documents
+            documents = run(get_all())
+            self.assertEqual(standin.requests['services'], 1)
+            self.assertEqual(len(set(id(document) for document in documents)), 3)
+
+    def test_post_not_replayed(self):
+        """Verify a POST that fails on a reused connection is not sent again."""
+        dropped = aio._AsyncConnection.dropped
+        aio._AsyncConnection.dropped = lambda connection: False
+        try:
+            with StandInServer(keep_alive=False) as standin:
+                async def submit_twice():
+                    transport = AsyncTransport()
+                    url = standin.url + '/services/ENVI/SpectralIndex/submitJob'
+                    await transport.post(url, config.GSF_TASK['parameters'])
+                    await asyncio.sleep(0.05)
+                    with self.assertRaises(ServerNotFoundError):
+                        await transport.post(url, config.GSF_TASK['parameters'])
+                    await transport.close()
+                run(submit_twice())
+                self.assertEqual(standin.requests['submitJob'], 1)
+        finally:
+            aio._AsyncConnection.dropped = dropped
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Tests the NumPy parameter encoding
+"""
+import json
+import unittest
+
+from gsf.ese.arrays import encode_body
+from gsf.ese.http import get_codec, orjson
+from gsf.ese.validation import ParameterValidator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class TestArrays(unittest.TestCase):
+    """
+    Test the NumPy parameter encoding
+    """
+    def codecs(self):
+        return [get_codec('json')] + ([get_codec('orjson')] if orjson is not None else [])
+
+    def test_plain_body(self):
+        """Verify parameters without arrays are encoded in one piece."""
+        self.assertEqual(json.loads(encode_body(dict(INDEX='Other'), get_codec('json'))),
+                         dict(INDEX='Other'))
+
+    def test_streamed_body(self):
+        """Verify arrays and NumPy scalars are encoded in pieces to the same JSON as lists."""
+        parameters = dict(GAIN=numpy.linspace(0, 1, 1001),
+                          KERNEL=numpy.arange(3000, dtype=numpy.int16).reshape(1000, 3),
+                          CUBE=numpy.arange(2 * 300 * 2).reshape(2, 300, 2),
+                          SCALE=numpy.float32(0.5), INDEX='Other')
+        for codec in self.codecs():
+            pieces = list(encode_body(parameters, codec, chunk_elements=100))
+            self.assertEqual(json.loads(b''.join(pieces).decode('utf-8')),
+                             dict((name, value.tolist() if hasattr(value, 'tolist') else value)
+                                  for name, value in parameters.items()))
+            self.assertEqual(list(encode_body(parameters, codec, chunk_elements=100)), pieces)
+
+    def test_validate_arrays(self):
+        """Verify array dtype, shape and values are checked."""
+        validator = ParameterValidator([
+            dict(name='GAIN', type='DOUBLE', dimensions='[*]', min=0, max=10),
+            dict(name='KERNEL', type='BYTE', dimensions='[3,2]')])
+        codes = lambda **parameters: [error.code for error in validator.errors(parameters)]
+        self.assertEqual(codes(GAIN=numpy.ones(5), KERNEL=numpy.ones((2, 3), numpy.uint8)), [])
+        self.assertEqual(codes(GAIN=numpy.ones((5, 1))), ['dimensions'])
+        self.assertEqual(codes(GAIN=numpy.array(['a'])), ['type'])
+        self.assertEqual(codes(GAIN=numpy.array([1, 11.0])), ['range'])
+        self.assertEqual(codes(KERNEL=numpy.ones((3, 2))), ['dimensions'])
+        self.assertEqual(codes(KERNEL=numpy.full((2, 3), 256)), ['range'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+"""
+Tests the client benchmark suite
+"""
+import unittest
+
+from gsf.test import bench, config
+
+
+class TestBench(unittest.TestCase):
+    """
+    Test the client benchmark suite
+    """
+
+    def test_run_benchmarks(self):
+        """Verify selected benchmarks run and report timings."""
+        results = bench.run_benchmarks(repeat=1, names=['server_services_warm', 'task_validate'],
+                                       standin=config.standin())
+        self.assertEqual(sorted(results), ['server_services_warm', 'task_validate'])
+        for result in results.values():
+            self.assertGreater(result['seconds'], 0)
+            self.assertLessEqual(result['min_seconds'], result['seconds'])
+
+    def test_compare(self):
+        """Verify only slow-downs beyond the threshold are reported."""
+        baseline = dict(fast=dict(seconds=1.0), slow=dict(seconds=1.0), new=dict(seconds=0))
+        results = dict(fast=dict(seconds=1.1), slow=dict(seconds=1.5), new=dict(seconds=1.0),
+                       added=dict(seconds=1.0))
+        self.assertEqual(bench.compare(results, baseline, threshold=0.2),
+                         [('slow', 1.0, 1.5, 1.5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Tests the GSF response cache
+"""
+import gc
+import threading
+import time
+import unittest
+import warnings
+
+from gsf.cache import LRUCache, SingleFlight
+from gsf.decorators import cached, memoize
+
+
+class Cached(object):
+    """Counts the calls of a cached method."""
+
+    def __init__(self):
+        self.calls = 0
+
+    @cached(maxsize=2)
+    def value(self, key):
+        self.calls += 1
+        time.sleep(0.01)
+        return key
+
+
+class TestCache(unittest.TestCase):
+    """
+    Test the GSF response cache
+    """
+
+    def test_lru_eviction(self):
+        """Verify the least recently used entry is evicted when the cache is full."""
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_ttl(self):
+        """Verify entries expire after the ttl."""
+        cache = LRUCache(ttl=0.01)
+        cache.set('a', 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+
+    def test_single_flight(self):
+        """Verify concurrent misses on the same instance compute the value once."""
+        obj = Cached()
+        threads = [threading.Thread(target=obj.value, args=('a',)) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(obj.calls, 1)
+
+    def test_single_flight_call(self):
+        """Verify concurrent calls with the same key share one call and its exception."""
+        flights = SingleFlight()
+        calls = []
+        results = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            raise ValueError('shared')
+
+        def call():
+            try:
+                flights.call('key', slow)
+            except ValueError as err:
+                results.append(err)
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(flights.merged, 4)
+        self.assertEqual(flights.call('key', lambda: 42), 42)
+
+    def test_single_flight_share(self):
+        """Verify waiting callers receive the copy made by share."""
+        flights = SingleFlight()
+        results = []
+
+        def slow():
+            time.sleep(0.05)
+            return {'key': 'value'}
+
+        threads = [threading.Thread(target=lambda: results.append(
+            flights.call('key', slow, dict))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(flights.merged, 4)
+        self.assertEqual(len(set(id(result) for result in results)), 5)
+        self.assertEqual(results[0], {'key': 'value'})
+
+    def test_invalidate(self):
+        """Verify invalidate discards the values cached for one instance only."""
+        first, second = Cached(), Cached()
+        first.value('a')
+        second.value('a')
+        first.value.invalidate()
+        first.value('a')
+        second.value('a')
+        self.assertEqual((first.calls, second.calls), (2, 1))
+
+    def test_instances_not_pinned(self):
+        """Verify the cache does not keep instances alive."""
+        obj = Cached()
+        obj.value('a')
+        del obj
+        gc.collect()
+        self.assertEqual(Cached.value.stats.size, 0)
+
+    def test_memoize(self):
+        """Verify the deprecated memoize decorator still caches, and warns."""
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+
+            class Memoized(Cached):
+                @memoize
+                def value(self, key):
+                    self.calls += 1
+                    return key
+        self.assertTrue(issubclass(caught[0].category, DeprecationWarning))
+        obj = Memoized()
+        self.assertEqual([obj.value('a'), obj.value('a'), obj.value('b')], ['a', 'a', 'b'])
+        self.assertEqual(obj.calls, 2)
+
+    def test_memoize_function(self):
+        """Verify the deprecated memoize decorator caches plain functions."""
+        calls = []
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+
+            @memoize
+            def square(x):
+                calls.append(x)
+                return x * x
+
+            @memoize
+            def constant():
+                calls.append(None)
+                return 42
+        self.assertEqual([square(3), square(3), square(x=3)], [9, 9, 9])
+        self.assertEqual([constant(), constant()], [42, 42])
+        self.assertEqual(calls, [3, 3, None])
+        self.assertEqual(square.__name__, 'square')
@@ -0,0 +1,104 @@
+"""
+Tests the on-disk catalog cache
+"""
+import json
+import shutil
+import tempfile
+import unittest
+
+from gsf.error import ServerNotFoundError
+from gsf.ese.diskcache import DiskCache
+from gsf.ese.http import Response, JSONCodec, Transport
+from gsf.ese.server import Server
+from gsf.test import config
+from gsf.test.standin import StandInServer
+
+
+class RecordingTransport(object):
+    """Answers catalog requests with a fixed document and records the request headers."""
+
+    codec = JSONCodec()
+
+    def __init__(self, document, etag='"1"'):
+        self.document = document
+        self.etag = etag
+        self.requests = []
+        self.reachable = True
+
+    def send(self, method, url, body=None, headers=None):
+        self.requests.append(headers or {})
+        if not self.reachable:
+            raise ServerNotFoundError('unreachable')
+        if (headers or {}).get('If-None-Match') == self.etag:
+            return Response(304, 'Not Modified', {'etag': self.etag}, b'')
+        return Response(200, 'OK', {'etag': self.etag}, json.dumps(self.document).encode('utf-8'))
+
+
+class TestDiskCache(unittest.TestCase):
+    """
+    Test the on-disk catalog cache
+    """
+    url = 'http://localhost:9191/ese/services/ENVI'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.transport = RecordingTransport(dict(name='ENVI'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fresh_document_skips_request(self):
+        """Verify a cached document younger than the ttl is read without a request."""
+        DiskCache(self.directory).fetch(self.url, self.transport)
+        document = DiskCache(self.directory).fetch(self.url, self.transport)
+        self.assertEqual(document, dict(name='ENVI'))
+        self.assertEqual(len(self.transport.requests), 1)
+
+    def test_parse_result_is_cached(self):
+        """Verify the parsed document is stored, so it is not parsed again."""
+        parse = lambda document: dict(document, parsed=True)
+        DiskCache(self.directory).fetch(self.url, self.transport, parse)
+        document = DiskCache(self.directory).fetch(self.url, self.transport)
+        self.assertTrue(document['parsed'])
+
+    def test_revalidation(self):
+        """Verify a stale document is revalidated with its ETag."""
+        cache = DiskCache(self.directory, ttl=0)
+        cache.fetch(self.url, self.transport)
+        document = cache.fetch(self.url, self.transport)
+        self.assertEqual(document, dict(name='ENVI'))
+        self.assertEqual(self.transport.requests[-1].get('If-None-Match'), '"1"')
+
+    def test_stale_document_when_unreachable(self):
+        """Verify a stale document is returned when the server cannot be reached."""
+        cache = DiskCache(self.directory, ttl=0)
+        cache.fetch(self.url, self.transport)
+        self.transport.reachable = False
+        self.assertEqual(cache.fetch(self.url, self.transport), dict(name='ENVI'))
+
+    @unittest.skipIf(not config.USE_STANDIN, 'needs the stand-in server')
+    def test_invalidate(self):
+        """Verify invalidating a server, service or task requests its document again."""
+        with StandInServer() as standin:
+            transport = Transport(catalog_cache=DiskCache(self.directory))
+
+            def connect():
+                server = Server(standin.host, str(standin.port), transport=transport)
+                service = server.service(config.GSF_SERVICE['name'])
+                task = service.task(config.GSF_TASK['name'])
+                server.services()
+                service.tasks()
+                task.parameters
+                return server, service, task
+
+            connect()
+            server, service, task = connect()
+            counts = dict(services=1, service=1, task=1)
+            self.assertEqual(dict((name, standin.requests[name]) for name in counts), counts)
+            for item, name in ((server, 'services'), (service, 'service'), (task, 'task')):
+                item.invalidate()
+                connect()
+                counts[name] += 1
+                self.assertEqual(dict((name, standin.requests[name]) for name in counts),
+                                 counts)
+            transport.close()
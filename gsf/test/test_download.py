@@ -0,0 +1,116 @@
+"""
+Tests the streaming and resuming of output downloads
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from gsf.error import ServerNotFoundError
+from gsf.ese.download import (PART_SUFFIX, VALIDATOR_SUFFIX, DEFAULT_CHUNK_SIZE, download,
+                              fetch_files, remote_size, _download)
+from gsf.ese.http import Transport
+from gsf.test import config
+from gsf.test.standin import StandInServer
+
+
+class _Stream(object):
+    """A writable destination that cannot seek, such as a pipe."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+
+    def flush(self):
+        pass
+
+
+@unittest.skipIf(not config.USE_STANDIN, 'needs the stand-in server')
+class TestDownload(unittest.TestCase):
+    """
+    Test downloads from the stand-in server
+    """
+
+    def setUp(self):
+        self.standin = StandInServer(job_duration=0.0, output_size=4096).start()
+        self.transport = Transport()
+        job_id = self.standin.submit('ENVI', 'SpectralIndex', {})
+        self.url = '{}/jobs/{}/output.dat'.format(self.standin.url, job_id)
+        self.data = self.standin.output(job_id, 'output.dat')
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'output.dat')
+
+    def tearDown(self):
+        self.transport.close()
+        self.standin.stop()
+        shutil.rmtree(self.directory)
+
+    def leave_part(self, data, validator=None):
+        with open(self.path + PART_SUFFIX, 'wb') as part_file:
+            part_file.write(data)
+        if validator is not None:
+            with open(self.path + PART_SUFFIX + VALIDATOR_SUFFIX, 'wb') as validator_file:
+                validator_file.write(validator.encode('utf-8'))
+
+    def etag(self):
+        return self.transport.send('HEAD', self.url).headers['etag']
+
+    def assert_downloaded(self, report, resumed_from):
+        self.assertEqual(report.resumed_from, resumed_from)
+        self.assertEqual(report.size, len(self.data))
+        with open(self.path, 'rb') as output_file:
+            self.assertEqual(output_file.read(), self.data)
+        self.assertEqual(os.listdir(self.directory), ['output.dat'])
+
+    def test_download(self):
+        """Verify a file is downloaded whole."""
+        self.assert_downloaded(download(self.url, self.directory, self.transport), 0)
+
+    def test_resume(self):
+        """Verify a partial file of the same version is resumed."""
+        self.leave_part(self.data[:1000], self.etag())
+        self.assert_downloaded(download(self.url, self.path, self.transport), 1000)
+
+    def test_changed_file(self):
+        """Verify a partial file of another version is downloaded again."""
+        self.leave_part(b'x' * 1000, '"another version"')
+        self.assert_downloaded(download(self.url, self.path, self.transport), 0)
+
+    def test_no_validator(self):
+        """Verify a partial file whose version is unknown is downloaded again."""
+        self.leave_part(b'x' * 1000)
+        self.assert_downloaded(download(self.url, self.path, self.transport), 0)
+
+    def test_complete_part(self):
+        """Verify a partial file holding the whole file is kept."""
+        self.leave_part(self.data, self.etag())
+        report = download(self.url, self.path, self.transport)
+        self.assertEqual(report.transferred, 0)
+        self.assert_downloaded(report, len(self.data))
+
+    def test_longer_part(self):
+        """Verify a partial file longer than the file is downloaded again."""
+        self.leave_part(self.data + b'extra', self.etag())
+        self.assert_downloaded(download(self.url, self.path, self.transport), 0)
+
+    def test_skip_existing(self):
+        """Verify files already downloaded are skipped, even by a server that compresses them."""
+        self.standin.gzip_files = True
+        self.assertEqual(remote_size(self.url, self.transport), len(self.data))
+        self.assertEqual(len(fetch_files([(self.url, self.path, self.transport)])), 1)
+        self.assertEqual(fetch_files([(self.url, self.path, self.transport)]), [None])
+        with open(self.path, 'rb') as output_file:
+            self.assertEqual(output_file.read(), self.data)
+
+    def test_not_seekable(self):
+        """Verify a download that must start over into a stream raises a clear error."""
+        self.standin.ranges = False
+        with self.assertRaises(ServerNotFoundError):
+            _download(self.url, _Stream(), None, 10, None, None, self.transport,
+                      DEFAULT_CHUNK_SIZE, 0, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+"""
+Tests that importing the gsf package does not import its implementation. The import time itself
+is measured by the import_gsf benchmark in gsf.test.bench.
+"""
+import subprocess
+import sys
+import unittest
+
+
+@unittest.skipIf(sys.version_info < (3, 7), 'Lazy imports require Python 3.7 or later')
+class TestImport(unittest.TestCase):
+    """
+    Test the lazy import of the gsf package
+    """
+
+    def test_lazy_backend(self):
+        """Verify the implementation is imported on first use only."""
+        output = subprocess.check_output([sys.executable, '-c', '''
+import sys
+import gsf
+print('gsf.ese' in sys.modules)
+from gsf import Server
+print('gsf.ese.server' in sys.modules, 'numpy' in sys.modules, Server.__module__)
+'''])
+        self.assertEqual(output.decode('ascii').split(),
+                         ['False', 'True', 'False', 'gsf.ese.server'])
+
+
+if __name__ == '__main__':
+    unittest.main()
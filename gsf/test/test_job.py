@@ -1,8 +1,11 @@
 
+import os
+import shutil
+import tempfile
 import unittest
 
 from gsf.test.util import assert_time_lt
-from gsf import Server
+from gsf import Server, wait_all, as_completed
 from gsf.job import Job
 from gsf.error import JobNotFoundError
 from gsf.test import config
@@ -13,7 +16,7 @@ class TestJob(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.server = Server(config.GSF_SERVER['name'])
+        cls.server = Server(*config.gsf_server())
         cls.service = cls.server.service(config.GSF_SERVICE['name'])
         cls.task = cls.service.task(config.GSF_TASK['name'])
         cls.job = cls.task.submit(config.GSF_TASK['parameters'])
@@ -58,6 +61,68 @@ class TestJob(unittest.TestCase):
         """Verify results returns a dictionary."""
         self.assertIsInstance(self.job.results, dict)
 
+    def test_refresh(self):
+        """Verify refresh returns a status snapshot matching the job properties."""
+        snapshot = self.job.refresh()
+        self.assertEqual(snapshot.job_id, self.job.job_id)
+        self.assertEqual(snapshot.status, self.job.status)
+        self.assertTrue(snapshot.done)
+
+    def test_snapshot_is_reused(self):
+        """Verify a finished job keeps its snapshot instead of requesting a new one."""
+        job = self.server.job(self.job.job_id)
+        self.assertIs(job.snapshot, job.snapshot)
+        self.assertIs(job.refresh(), job.snapshot)
+
+    def test_results_copied(self):
+        """Verify changing the results of a finished job does not change them for others."""
+        job = self.server.job(self.job.job_id)
+        results = job.results
+        expected = dict(results)
+        results.clear()
+        self.assertEqual(job.results, expected)
+        self.assertEqual(job.snapshot.results, expected)
+
+    def test_download(self):
+        """Verify an output file is downloaded to the destination directory."""
+        directory = tempfile.mkdtemp()
+        try:
+            report = self.job.download('OUTPUT_RASTER', directory)
+            self.assertTrue(os.path.isfile(report.path))
+            self.assertEqual(os.path.getsize(report.path), report.size)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_fetch_all(self):
+        """Verify every output is fetched and listed in the manifest, and not fetched twice."""
+        directory = tempfile.mkdtemp()
+        try:
+            manifest = self.job.fetch_all(directory)
+            self.assertIn('OUTPUT_RASTER', manifest)
+            path = manifest['OUTPUT_RASTER']['path']
+            self.assertTrue(os.path.isfile(path))
+            self.assertTrue(os.path.isfile(os.path.join(directory, 'manifest.json')))
+            modified = os.path.getmtime(path)
+            self.assertEqual(self.job.fetch_all(directory), manifest)
+            self.assertEqual(os.path.getmtime(path), modified)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_wait_all(self):
+        """Verify wait_all returns every finished job as done."""
+        jobs = [self.job, self.server.job(self.job.job_id)]
+        done, not_done = wait_all(jobs)
+        self.assertEqual(done, set(jobs))
+        self.assertEqual(not_done, set())
+
+    def test_as_completed(self):
+        """Verify as_completed yields each submitted job once it is done."""
+        jobs = [self.task.submit(config.GSF_TASK['parameters']) for _ in range(2)]
+        completed = list(as_completed(jobs))
+        self.assertEqual(set(completed), set(jobs))
+        for job in completed:
+            self.assertEqual(job.status, 'Succeeded')
+
     def test_invalid_id(self):
         """Verify getting an invalid job id throws and exception."""
         job = self.server.job(-1)
@@ -0,0 +1,144 @@
+"""
+Tests the local process pool backend
+"""
+import gc
+import os
+import time
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+
+import gsf
+from gsf.error import (JobNotFoundError, JobTimeoutError, ParameterValidationError,
+                       ServiceNotFoundError, TaskNotFoundError)
+from gsf.local import job as local_job
+from gsf.local import Server, register, register_service, unregister, wait_all
+
+SERVICE = 'LocalTest'
+
+
+@register(SERVICE, display_name='Add', parameters=[
+    dict(name='A', display_name='A', description='', type='DOUBLE', direction='input',
+         required=True),
+    dict(name='B', display_name='B', description='', type='DOUBLE', direction='input',
+         required=False)])
+def add(A, B=1.0):
+    """Adds two numbers."""
+    return dict(SUM=A + B, PID=os.getpid())
+
+
+@register(SERVICE)
+def fail(MESSAGE):
+    raise RuntimeError(MESSAGE)
+
+
+@register(SERVICE, name='Sleep')
+def sleep(SECONDS):
+    time.sleep(SECONDS)
+
+
+class TestLocal(unittest.TestCase):
+    """
+    Test the local process pool backend
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        register_service(SERVICE, 'Functions for the local backend tests')
+        cls.executor = ProcessPoolExecutor(max_workers=2)
+        cls.server = Server(executor=cls.executor)
+        cls.service = cls.server.service(SERVICE)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_service(self):
+        """Verify services and tasks are listed from the registry."""
+        self.assertIn(SERVICE, self.server.services())
+        self.assertEqual(self.service.tasks(), ['add', 'fail', 'Sleep'])
+        self.assertEqual(self.service.description, 'Functions for the local backend tests')
+        task = self.service.task('add')
+        self.assertEqual(task.display_name, 'Add')
+        self.assertEqual(task.description, 'Adds two numbers.')
+        self.assertEqual(self.service.task('fail').parameters[0]['required'], True)
+
+    def test_not_found(self):
+        """Verify unknown services, tasks and jobs raise the usual errors."""
+        with self.assertRaises(ServiceNotFoundError):
+            self.server.service('doesnotexist').tasks()
+        with self.assertRaises(TaskNotFoundError):
+            self.service.task('doesnotexist').submit(dict())
+        with self.assertRaises(JobNotFoundError):
+            self.server.job(-1)
+
+    def test_submit(self):
+        """Verify a job runs in a worker process and returns its outputs."""
+        job = self.service.task('add').submit(dict(A=1.5, B=2))
+        job.wait_for_done(timeout=30)
+        self.assertEqual(job.status, 'Succeeded')
+        self.assertEqual(job.progress, 100)
+        self.assertEqual(job.results['SUM'], 3.5)
+        self.assertNotEqual(job.results['PID'], os.getpid())
+        self.assertIs(self.server.job(job.job_id), job)
+
+    def test_finished_jobs_released(self):
+        """Verify finished jobs are not kept once the caller no longer uses them."""
+        job = self.service.task('add').submit(dict(A=1))
+        job_id = job.job_id
+        job.wait_for_done(timeout=30)
+        self.assertIs(self.server.job(job_id), job)
+        # The future's done callbacks run just after waiters are woken up.
+        deadline = time.time() + 5
+        while job_id in local_job._running_jobs and time.time() < deadline:
+            time.sleep(0.01)
+        del job
+        gc.collect()
+        with self.assertRaises(JobNotFoundError):
+            self.server.job(job_id)
+
+    def test_submit_failure(self):
+        """Verify an exception raised by the task function fails the job."""
+        job = self.service.task('fail').submit(dict(MESSAGE='bad input'))
+        job.wait_for_done(timeout=30)
+        self.assertEqual(job.status, 'Failed')
+        self.assertEqual(job.error_message, 'bad input')
+        self.assertEqual(job.results, {})
+
+    def test_submit_invalid(self):
+        """Verify parameters are validated against the task definition."""
+        with self.assertRaises(ParameterValidationError):
+            self.service.task('add').submit(dict(B='two'))
+
+    def test_wait(self):
+        """Verify waiting for several jobs and timing out."""
+        task = self.service.task('Sleep')
+        slow = task.submit(dict(SECONDS=2))
+        fast = task.submit(dict(SECONDS=0))
+        done, not_done = wait_all([slow, fast], timeout=1)
+        self.assertEqual((done, not_done), ({fast}, {slow}))
+        self.assertEqual(slow.status, 'Started')
+        with self.assertRaises(JobTimeoutError):
+            slow.wait_for_done(timeout=0.1)
+
+    def test_use(self):
+        """Verify the backend of the gsf names is selected at runtime."""
+        try:
+            gsf.use('local')
+            self.assertIs(gsf.Server, Server)
+        finally:
+            gsf.use('ese')
+        self.assertEqual(gsf.Server.__module__, 'gsf.ese.server')
+        with self.assertRaises(ValueError):
+            gsf.use('doesnotexist')
+
+    def test_unregister(self):
+        """Verify tasks can be removed."""
+        register('Temporary')(add)
+        self.assertEqual(self.server.service('Temporary').tasks(), ['add'])
+        unregister('Temporary')
+        self.assertNotIn('Temporary', self.server.services())
+
+
+if __name__ == '__main__':
+    unittest.main()
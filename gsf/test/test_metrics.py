@@ -0,0 +1,85 @@
+"""
+Tests the request metrics collector
+"""
+import gc
+import unittest
+
+from gsf.error import ServerNotFoundError
+from gsf.ese import http
+from gsf.ese.http import RequestEvent
+from gsf.ese.metrics import MetricsCollector, endpoint
+from gsf.test import config
+from gsf.test.standin import StandInServer
+
+
+class TestMetricsCollector(unittest.TestCase):
+    """
+    Test the request metrics collector
+    """
+    url = 'http://localhost:9191/ese/jobs/42/status'
+
+    def setUp(self):
+        self.collector = MetricsCollector(buckets=(0.1, 1.0), slow_threshold=1.0)
+
+    def record(self, elapsed, status=200, error=None, received=100):
+        self.collector.request_started('GET', self.url)
+        self.collector.request_finished(
+            RequestEvent('GET', self.url, status, elapsed, 0, received, error))
+
+    def test_endpoint(self):
+        """Verify numeric path segments are grouped."""
+        self.assertEqual(endpoint(self.url), '/ese/jobs/{id}/status')
+
+    def test_summary(self):
+        """Verify latency buckets, bytes, errors and the slow log are recorded."""
+        self.record(0.05)
+        self.record(0.5, status=404)
+        self.record(2.0, status=None, error=ServerNotFoundError('refused'), received=0)
+        metrics = self.collector.summary()[('GET', '/ese/jobs/{id}/status')]
+        self.assertEqual(metrics['count'], 3)
+        self.assertEqual(metrics['buckets'], [(0.1, 1), (1.0, 2), (float('inf'), 3)])
+        self.assertEqual(metrics['bytes_received'], 200)
+        self.assertEqual(metrics['errors'], {'404': 1, 'connection': 1})
+        self.assertEqual(metrics['in_flight'], 0)
+        self.assertEqual([event.elapsed for event in self.collector.slow_requests], [2.0])
+
+    def test_prometheus(self):
+        """Verify the Prometheus text export."""
+        self.record(0.05)
+        text = self.collector.prometheus()
+        self.assertIn('# TYPE gsf_http_request_duration_seconds histogram', text)
+        self.assertIn('gsf_http_request_duration_seconds_bucket{method="GET",'
+                      'endpoint="/ese/jobs/{id}/status",le="+Inf"} 1', text)
+        self.assertIn('gsf_http_response_bytes_total{method="GET",'
+                      'endpoint="/ese/jobs/{id}/status"} 100', text)
+
+    def test_install(self):
+        """Verify installing adds the collector to the request hooks once."""
+        self.collector.install()
+        self.collector.install()
+        try:
+            self.assertEqual(http._hooks.count(self.collector), 1)
+        finally:
+            self.collector.uninstall()
+        self.assertNotIn(self.collector, http._hooks)
+
+    @unittest.skipIf(not config.USE_STANDIN, 'needs the stand-in server')
+    def test_abandoned_stream(self):
+        """Verify a streaming response dropped without being closed ends its request."""
+        with StandInServer() as standin:
+            transport = http.Transport()
+            self.collector.install()
+            try:
+                response = transport.open('GET', standin.url + '/services')
+                del response
+                gc.collect()
+            finally:
+                self.collector.uninstall()
+            transport.close()
+        metrics = self.collector.summary()[('GET', '/ese/services')]
+        self.assertEqual(metrics['count'], 1)
+        self.assertEqual(metrics['in_flight'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Tests the job status monitor
+"""
+import socket
+import threading
+import time
+import unittest
+
+from gsf.ese.job import wait_all
+from gsf.ese.monitor import EventStreamNotifier, Notifier, StatusMonitor
+from gsf.ese.polling import Poller
+from gsf.ese.server import Server
+from gsf.test import config
+from gsf.test.standin import StandInServer
+
+
+@unittest.skipIf(not config.USE_STANDIN, 'needs the stand-in server')
+class TestStatusMonitor(unittest.TestCase):
+    """
+    Test the StatusMonitor against the stand-in server
+    """
+
+    def submit(self, standin, count=1):
+        task = Server(standin.host, str(standin.port)).service(
+            config.GSF_SERVICE['name']).task(config.GSF_TASK['name'])
+        return [task.submit(config.GSF_TASK['parameters']) for _ in range(count)]
+
+    def watch(self, monitor, job):
+        statuses, progress = [], []
+        monitor.watch(job, on_status=lambda job, snapshot: statuses.append(snapshot.status),
+                      on_progress=lambda job, snapshot: progress.append(snapshot.progress))
+        return statuses, progress
+
+    def test_events(self):
+        """Verify status changes are pushed by the server instead of polled."""
+        with StandInServer(job_duration=0.3) as standin:
+            monitor = StatusMonitor(Server(standin.host, str(standin.port)))
+            self.assertTrue(monitor.notified)
+            job, = self.submit(standin)
+            statuses, progress = self.watch(monitor, job)
+            monitor.wait(job, timeout=5)
+            self.assertEqual(statuses, ['Started', 'Succeeded'])
+            self.assertEqual(progress, sorted(set(progress)))
+            self.assertEqual(progress[-1], 100)
+            self.assertEqual(job.status, 'Succeeded')
+            self.assertEqual(standin.requests['status'], 1)
+            monitor.close()
+
+    def test_polling_fallback(self):
+        """Verify jobs are polled when the server does not send notifications."""
+        with StandInServer(job_duration=0.3, events=False) as standin:
+            poller = Poller()
+            monitor = StatusMonitor(Server(standin.host, str(standin.port)), poller=poller)
+            self.assertFalse(monitor.notified)
+            job, = self.submit(standin)
+            statuses, progress = self.watch(monitor, job)
+            monitor.wait(job, timeout=5)
+            self.assertEqual(statuses[-1], 'Succeeded')
+            self.assertEqual(progress[-1], 100)
+            self.assertGreater(standin.requests['status'], 1)
+            monitor.close()
+            poller.close()
+
+    def test_disconnect(self):
+        """Verify jobs are polled once the event stream is interrupted."""
+        standin = StandInServer(job_duration=0.3).start()
+        poller = Poller()
+        monitor = StatusMonitor(Server(standin.host, str(standin.port)), poller=poller)
+        job, = self.submit(standin)
+        monitor.watch(job)
+        standin._stopped.set()
+        deadline = time.time() + 5
+        while monitor.notified and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(monitor.notified)
+        monitor.wait(job, timeout=5)
+        self.assertEqual(job.status, 'Succeeded')
+        monitor.close()
+        poller.close()
+        standin.stop()
+
+    def test_raising_handler(self):
+        """Verify an exception raised by a handler does not stop the monitor, notified or not."""
+        def fail(*args):
+            raise RuntimeError('handler failure')
+
+        for events in (True, False):
+            with StandInServer(job_duration=0.2, events=events) as standin:
+                poller = Poller()
+                monitor = StatusMonitor(Server(standin.host, str(standin.port)), poller=poller)
+                failing, job = self.submit(standin, 2)
+                monitor.watch(failing, fail, on_status=fail, on_progress=fail)
+                monitor.wait(job, timeout=5)
+                monitor.wait(failing, timeout=5)
+                self.assertEqual(monitor.notified, events)
+                monitor.close()
+                poller.close()
+
+    def test_raising_listener(self):
+        """Verify the notifier reports a disconnection when its listener raises."""
+        def fail(snapshot):
+            raise RuntimeError('listener failure')
+
+        with StandInServer(job_duration=0.1) as standin:
+            disconnected = threading.Event()
+            notifier = EventStreamNotifier(standin.url + '/jobs/events')
+            self.assertTrue(notifier.start(fail, disconnected.set))
+            self.submit(standin)
+            self.assertTrue(disconnected.wait(5))
+            notifier.close()
+
+    def test_notifier_timeouts(self):
+        """Verify the long read timeout of the event stream does not apply to connecting."""
+        self.assertRaises(TypeError, Notifier)
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        try:
+            notifier = EventStreamNotifier('http://127.0.0.1:{}/ese/jobs/events'.format(
+                listener.getsockname()[1]), connect_timeout=0.2)
+            start = time.time()
+            self.assertFalse(notifier.start(lambda snapshot: None, lambda: None))
+            self.assertLess(time.time() - start, 5)
+        finally:
+            listener.close()
+
+        with StandInServer() as standin:
+            notifier = EventStreamNotifier(standin.url + '/jobs/events', timeout=123)
+            self.assertTrue(notifier.start(lambda snapshot: None, lambda: None))
+            self.assertEqual(notifier._response._pooled.sock.gettimeout(), 123)
+            notifier.close()
+
+    def test_wait_all(self):
+        """Verify the monitor can stand in for the poller of the wait functions."""
+        with StandInServer(job_duration=(0.1, 0.3), seed=1) as standin:
+            monitor = StatusMonitor(Server(standin.host, str(standin.port)))
+            jobs = self.submit(standin, 5)
+            done, not_done = wait_all(jobs, timeout=5, poller=monitor)
+            self.assertEqual((done, not_done), (set(jobs), set()))
+            self.assertEqual(standin.requests['status'], len(jobs))
+            monitor.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Tests the adaptive polling of job status
+"""
+import threading
+import time
+import unittest
+
+from gsf.error import JobTimeoutError
+from gsf.ese.job import JobStatus
+from gsf.ese.polling import PollSchedule, Poller
+from gsf.ese.server import Server
+from gsf.test import config
+from gsf.test.standin import StandInServer
+
+
+def started(progress, timestamp):
+    return JobStatus(1, 'Started', progress, '', '', {}, timestamp)
+
+
+class TestPollSchedule(unittest.TestCase):
+    """
+    Test the adaptive poll intervals
+    """
+
+    def test_backoff(self):
+        """Verify the interval grows by the backoff factor up to the maximum."""
+        schedule = PollSchedule(min_interval=0.1, max_interval=1.0, backoff=2.0, jitter=0)
+        intervals = [schedule.next_interval() for _ in range(6)]
+        for interval, expected in zip(intervals, [0.1, 0.2, 0.4, 0.8, 1.0, 1.0]):
+            self.assertAlmostEqual(interval, expected)
+
+    def test_jitter(self):
+        """Verify the jitter spreads intervals within its bounds, and within min and max."""
+        schedule = PollSchedule(min_interval=1.0, max_interval=10.0, backoff=1.0, jitter=0.1)
+        intervals = [schedule.next_interval() for _ in range(200)]
+        self.assertTrue(all(0.9 <= interval <= 1.1 for interval in intervals))
+        self.assertGreater(len(set(intervals)), 1)
+
+        schedule = PollSchedule(min_interval=1.0, max_interval=1.0, jitter=0.5)
+        self.assertEqual(set(schedule.next_interval() for _ in range(50)), {1.0})
+
+    def test_progress_estimate(self):
+        """Verify the next poll is not scheduled after the estimated end of the job."""
+        schedule = PollSchedule(min_interval=0.1, max_interval=30.0, backoff=10.0, jitter=0)
+        self.assertAlmostEqual(schedule.next_interval(started(10, 100.0)), 0.1)
+        # 50% in one second leaves 40% for 0.8 seconds, sooner than the grown 1 second.
+        self.assertAlmostEqual(schedule.next_interval(started(60, 101.0)), 0.8)
+        # Without progress, the backed-off interval is used.
+        self.assertAlmostEqual(schedule.next_interval(started(60, 102.0)), 10.0)
+
+
+@unittest.skipIf(not config.USE_STANDIN, 'needs the stand-in server')
+class TestWaitForDone(unittest.TestCase):
+    """
+    Test Job.wait_for_done against the stand-in server
+    """
+
+    def job(self, standin):
+        return Server(standin.host, str(standin.port)).job(
+            standin.submit('ENVI', 'SpectralIndex', {}))
+
+    def test_callback(self):
+        """Verify the callback receives every polled snapshot, ending with the final one."""
+        with StandInServer(job_duration=0.3) as standin:
+            snapshots = []
+            self.job(standin).wait_for_done(callback=snapshots.append, min_interval=0.05,
+                                            jitter=0)
+            self.assertGreater(len(snapshots), 1)
+            self.assertEqual(len(snapshots), standin.requests['status'])
+            self.assertEqual(snapshots[-1].status, 'Succeeded')
+            self.assertFalse(any(snapshot.done for snapshot in snapshots[:-1]))
+            progress = [snapshot.progress for snapshot in snapshots]
+            self.assertEqual(progress, sorted(progress))
+
+    def test_timeout(self):
+        """Verify a JobTimeoutError is raised once the timeout has passed."""
+        with StandInServer(job_duration=60) as standin:
+            job = self.job(standin)
+            start = time.time()
+            with self.assertRaises(JobTimeoutError):
+                job.wait_for_done(timeout=0.3, min_interval=0.05, jitter=0)
+            self.assertGreaterEqual(time.time() - start, 0.3)
+            self.assertLess(time.time() - start, 1.0)
+
+
+@unittest.skipIf(not config.USE_STANDIN, 'needs the stand-in server')
+class TestPoller(unittest.TestCase):
+    """
+    Test the Poller against the stand-in server
+    """
+
+    def test_raising_callback(self):
+        """Verify an exception raised by a callback does not stop the other watches."""
+        def fail(*args):
+            raise RuntimeError('callback failure')
+
+        with StandInServer(job_duration=0.1) as standin:
+            task = Server(standin.host, str(standin.port)).service(
+                config.GSF_SERVICE['name']).task(config.GSF_TASK['name'])
+            jobs = [task.submit(config.GSF_TASK['parameters']) for _ in range(3)]
+            poller = Poller(threads=1)
+            done = threading.Event()
+            poller.watch(jobs[0], fail)
+            poller.watch(jobs[1], fail, fail)
+            poller.watch(jobs[2], lambda job: done.set())
+            self.assertTrue(done.wait(5))
+
+            # Threads that stopped anyway are replaced on the next watch.
+            poller._workers.append(threading.Thread(target=lambda: None))
+            again = threading.Event()
+            poller.watch(jobs[2], lambda job: again.set())
+            self.assertTrue(again.wait(5))
+            self.assertTrue(all(worker.is_alive() for worker in poller._workers))
+            poller.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+"""
+Tests the reuse of jobs for identical submissions
+"""
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from gsf.ese.http import Transport
+from gsf.ese.resultcache import DiskStore, MemoryStore, ResultCache, result_key
+from gsf.ese.server import Server
+from gsf.test import config
+from gsf.test.standin import StandInServer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+URI = 'http://localhost:9191/ese/services/ENVI/SpectralIndex'
+
+
+class TestResultCache(unittest.TestCase):
+    """
+    Test the result cache and its stores
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_key(self):
+        """Verify the key ignores dictionary order but not values or the task."""
+        key = result_key(URI, dict(A=1, B=dict(x=[1, 2], y='z')))
+        self.assertEqual(key, result_key(URI, dict(B=dict(y='z', x=[1, 2]), A=1)))
+        self.assertNotEqual(key, result_key(URI, dict(A=2, B=dict(x=[1, 2], y='z'))))
+        self.assertNotEqual(key, result_key(URI + '2', dict(A=1, B=dict(x=[1, 2], y='z'))))
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_array_key(self):
+        """Verify arrays are keyed by their dtype, shape and data, whatever their layout."""
+        values = numpy.arange(12.0).reshape(3, 4)
+        key = result_key(URI, dict(A=values, B=[1, numpy.float32(2)]))
+        self.assertEqual(key, result_key(URI, dict(A=values.copy(), B=[1, 2.0])))
+        self.assertEqual(result_key(URI, dict(A=values.T)),
+                         result_key(URI, dict(A=numpy.ascontiguousarray(values.T))))
+        self.assertNotEqual(key, result_key(URI, dict(A=values.reshape(4, 3), B=[1, 2.0])))
+        self.assertNotEqual(key, result_key(URI, dict(A=values.astype(numpy.float32),
+                                                      B=[1, 2.0])))
+        changed = values.copy()
+        changed[2, 3] = -1
+        self.assertNotEqual(key, result_key(URI, dict(A=changed, B=[1, 2.0])))
+
+    def test_ttl(self):
+        """Verify entries expire."""
+        cache = ResultCache(ttl=0.05)
+        cache.set('key', 42)
+        self.assertEqual(cache.get('key'), 42)
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('key'))
+
+    def test_memory_store_size(self):
+        """Verify the memory store evicts beyond its size."""
+        cache = ResultCache(MemoryStore(maxsize=2))
+        for job_id in range(3):
+            cache.set(str(job_id), job_id)
+        self.assertEqual([cache.get(str(job_id)) for job_id in range(3)], [None, 1, 2])
+
+    def test_disk_store(self):
+        """Verify the disk store is shared between caches and bounded in size."""
+        ResultCache(DiskStore(self.directory)).set('key', 42)
+        self.assertEqual(ResultCache(DiskStore(self.directory)).get('key'), 42)
+
+        store = DiskStore(self.directory, maxsize=2)
+        cache = ResultCache(store)
+        for job_id in range(3):
+            cache.set('bounded{}'.format(job_id), job_id)
+            time.sleep(0.01)
+        self.assertEqual(len(store), 2)
+        self.assertIsNotNone(cache.get('bounded2'))
+        cache.clear()
+        self.assertEqual(len(store), 0)
+
+    def test_disk_store_prune_interval(self):
+        """Verify the disk store is not listed on every write."""
+        store = DiskStore(self.directory, maxsize=16)
+        prune = store._prune
+        prunes = []
+        store._prune = lambda: (prunes.append(1), prune())
+        for job_id in range(32):
+            store.set('key{}'.format(job_id), dict(job_id=job_id, stored=time.time()))
+        self.assertEqual(len(prunes), 16)
+        self.assertLessEqual(len(store), 16 + 2)
+
+
+@unittest.skipIf(not config.USE_STANDIN, 'needs the stand-in server')
+class TestResultReuse(unittest.TestCase):
+    """
+    Test Task.submit with a result cache
+    """
+
+    def submit_count(self, standin):
+        return sum(count for endpoint, count in standin.requests.items()
+                   if endpoint.endswith('submitJob'))
+
+    def test_reuse(self):
+        """Verify an identical submission returns the earlier job, unless opted out."""
+        with StandInServer(job_duration=0.1) as standin:
+            transport = Transport(result_cache=ResultCache())
+            task = Server(standin.host, str(standin.port), transport=transport).service(
+                config.GSF_SERVICE['name']).task(config.GSF_TASK['name'])
+            job = task.submit(config.GSF_TASK['parameters'])
+            job.wait_for_done()
+            self.assertEqual(task.submit(config.GSF_TASK['parameters']), job)
+            self.assertEqual(self.submit_count(standin), 1)
+
+            fresh = task.submit(config.GSF_TASK['parameters'], reuse=False)
+            self.assertNotEqual(fresh, job)
+            self.assertEqual(task.submit(config.GSF_TASK['parameters']), fresh)
+            self.assertEqual(self.submit_count(standin), 2)
+            transport.close()
+
+    def task(self, standin, transport):
+        return Server(standin.host, str(standin.port), transport=transport).service(
+            config.GSF_SERVICE['name']).task(config.GSF_TASK['name'])
+
+    def test_submit_many(self):
+        """Verify submit_many reuses earlier jobs, unless opted out."""
+        with StandInServer(job_duration=0.1) as standin:
+            transport = Transport(result_cache=ResultCache())
+            task = self.task(standin, transport)
+            job = task.submit(config.GSF_TASK['parameters'])
+            batch = task.submit_many([config.GSF_TASK['parameters']] * 4)
+            self.assertEqual(list(batch), [job] * 4)
+            self.assertEqual(self.submit_count(standin), 1)
+
+            batch = task.submit_many([config.GSF_TASK['parameters']] * 2, reuse=False)
+            self.assertNotIn(job, list(batch))
+            self.assertEqual(self.submit_count(standin), 3)
+            transport.close()
+
+    def test_concurrent_submit(self):
+        """Verify identical submissions made at the same time share one job."""
+        with StandInServer(job_duration=0.1, latency=0.2) as standin:
+            transport = Transport(result_cache=ResultCache())
+            task = self.task(standin, transport)
+            task.parameters
+            jobs = []
+            threads = [threading.Thread(target=lambda: jobs.append(
+                task.submit(config.GSF_TASK['parameters']))) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len(set(jobs)), 1)
+            self.assertEqual(self.submit_count(standin), 1)
+            transport.close()
+
+    def test_failed_not_reused(self):
+        """Verify a failed job is submitted again."""
+        with StandInServer(job_duration=0.0, failure_rate=1.0) as standin:
+            transport = Transport(result_cache=ResultCache())
+            task = Server(standin.host, str(standin.port), transport=transport).service(
+                config.GSF_SERVICE['name']).task(config.GSF_TASK['name'])
+            job = task.submit(config.GSF_TASK['parameters'])
+            job.wait_for_done()
+            self.assertNotEqual(task.submit(config.GSF_TASK['parameters']), job)
+            self.assertEqual(self.submit_count(standin), 2)
+            transport.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,6 @@ Created on Jan 6, 2016
 """
 import time
 import unittest
-import xmlrunner
 
 
 from gsf.test.util import assert_time_lt
@@ -12,6 +11,7 @@ from gsf import Server
 from gsf.server import Server as BaseServer
 from gsf.error import ServerNotFoundError
 from gsf.test import config
+from gsf.test.standin import StandInServer
 
 
 class TestServer(unittest.TestCase):
@@ -19,7 +19,7 @@ class TestServer(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.server = Server(config.GSF_SERVER['name'])
+        cls.server = Server(*config.gsf_server())
 
     @classmethod
     def tearDownClass(cls):
@@ -29,16 +29,81 @@ class TestServer(unittest.TestCase):
     def test_init(self):
         """Verify a server instance can be created quickly."""
         start_time = time.time()
-        server = Server(config.GSF_SERVER['name'])
+        server = Server(*config.gsf_server())
         self.assertIsInstance(server, BaseServer, 'server object does not implement gsf.Server')
 
     def test_services(self):
         """Verify services returns a list."""
         self.assertIsInstance(self.server.services(), list)
 
+    def test_catalog(self):
+        """Verify catalog indexes the services and tasks of the server."""
+        catalog = self.server.catalog(concurrency=4)
+        self.assertIn(config.GSF_SERVICE['name'], catalog.services())
+        self.assertIn(config.GSF_TASK['name'], catalog.tasks(config.GSF_SERVICE['name']))
+        task = catalog.task(config.GSF_SERVICE['name'], config.GSF_TASK['name'])
+        self.assertIsInstance(task.parameters, list)
+
     def test_invalid_server(self):
         """Verify invalid host name throws an exception."""
         server = Server('fefabef')
         with self.assertRaises(ServerNotFoundError):
             services = server.services()
 
+
+@unittest.skipIf(not config.USE_STANDIN, 'needs the stand-in server')
+class TestJobListing(unittest.TestCase):
+    """Tests listing jobs and getting the status of many jobs."""
+
+    def setUp(self):
+        self.standin = StandInServer(job_duration=0.0, seed=1).start()
+        self.server = Server(self.standin.host, str(self.standin.port))
+        self.job_ids = [self.standin.submit('ENVI', 'SpectralIndex', {}) for _ in range(5)]
+
+    def tearDown(self):
+        self.standin.stop()
+
+    def test_jobs(self):
+        """Verify jobs pages lazily through every job."""
+        jobs = self.server.jobs(page_size=2)
+        self.assertEqual(next(jobs).job_id, self.job_ids[0])
+        self.assertEqual(self.standin.requests['jobs'], 1)
+        self.assertEqual([record.job_id for record in jobs], self.job_ids[1:])
+        self.assertEqual(self.standin.requests['jobs'], 3)
+
+    def test_jobs_filters(self):
+        """Verify jobs selects by status and submission time."""
+        self.assertEqual(len(list(self.server.jobs(status='Succeeded'))), 5)
+        self.assertEqual(list(self.server.jobs(status=['Failed', 'Started'])), [])
+        self.assertEqual(list(self.server.jobs(since=time.time() + 60)), [])
+        with self.assertRaises(ValueError):
+            self.server.jobs(status='Done')
+
+    def test_job_statuses(self):
+        """Verify job_statuses gets many statuses in few requests."""
+        statuses = self.server.job_statuses(self.job_ids + [999], page_size=4)
+        self.assertEqual(self.standin.requests['jobs'], 2)
+        self.assertEqual([statuses[job_id].status for job_id in self.job_ids],
+                         ['Succeeded'] * 5)
+        self.assertIsNone(statuses[999])
+
+    def test_job_statuses_fallback(self):
+        """Verify job_statuses requests each status when the server cannot list jobs."""
+        self.standin.job_listing = False
+        statuses = self.server.job_statuses(self.job_ids + [999])
+        self.assertEqual(self.standin.requests['status'], 6)
+        self.assertEqual(statuses[self.job_ids[0]].status, 'Succeeded')
+        self.assertIsNone(statuses[999])
+
+    def test_unfiltered_server(self):
+        """Verify the filters are applied again when the server ignores them."""
+        self.standin.job_listing = 'unfiltered'
+        self.assertEqual([record.job_id for record in self.server.jobs(page_size=2)],
+                         self.job_ids)
+        self.assertEqual(list(self.server.jobs(status='Failed')), [])
+        self.assertEqual(list(self.server.jobs(since=time.time() + 60)), [])
+        self.assertEqual(len(list(self.server.jobs(since=time.time() - 60))), 5)
+        statuses = self.server.job_statuses(self.job_ids[3:] + [999])
+        self.assertEqual([statuses[job_id].job_id for job_id in self.job_ids[3:]],
+                         self.job_ids[3:])
+        self.assertIsNone(statuses[999])
@@ -13,7 +13,7 @@ class TestService(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.server = Server(config.GSF_SERVER['name'])
+        cls.server = Server(*config.gsf_server())
         cls.service = cls.server.service(config.GSF_SERVICE['name'])
 
     @classmethod
@@ -2,15 +2,21 @@
 Tests the GSF Task interface
 """
 
+import copy
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 
 from gsf import Server
 from gsf.task import Task
 from gsf.job import Job
-from gsf.error import TaskNotFoundError
+from gsf.error import TaskNotFoundError, ParameterValidationError, JobFailedError
 
 from gsf.test import config
+from gsf.test.standin import StandInServer, SPECTRAL_INDEX
+from gsf.ese.task import _parse_task_info
 from gsf.test.util import assert_time_lt
 
 
@@ -20,7 +26,7 @@ class TestTask(unittest.TestCase):
     """
     @classmethod
     def setUpClass(cls):
-        cls.server = Server(config.GSF_SERVER['name'])
+        cls.server = Server(*config.gsf_server())
         cls.service = cls.server.service(config.GSF_SERVICE['name'])
         cls.task = cls.service.task(config.GSF_TASK['name'])
 
@@ -65,6 +71,90 @@ class TestTask(unittest.TestCase):
         job.wait_for_done()
         self.assertEqual(job.status, 'Succeeded', 'Failed to submit Job')
 
+    def test_submit_invalid(self):
+        """Verify invalid parameters are rejected before a job is submitted."""
+        with self.assertRaises(ParameterValidationError) as context:
+            self.task.submit(dict(config.GSF_TASK['parameters'], INDEX='doesnotexist'))
+        self.assertEqual([error.parameter for error in context.exception.errors], ['INDEX'])
+
+    def test_submit_async(self):
+        """Verify submit_async returns a future that resolves to the job results."""
+        future = self.task.submit_async(config.GSF_TASK['parameters'])
+        self.assertIsInstance(future.result(), dict)
+
+    @unittest.skipIf(not config.USE_STANDIN, 'needs the stand-in server')
+    def test_submit_async_failure(self):
+        """Verify the future of a failed job raises JobFailedError."""
+        with StandInServer(job_duration=0.1, failure_rate=1.0) as standin:
+            task = Server(standin.host, str(standin.port)).service(
+                config.GSF_SERVICE['name']).task(config.GSF_TASK['name'])
+            future = task.submit_async(config.GSF_TASK['parameters'])
+            with self.assertRaises(JobFailedError):
+                future.result(timeout=10)
+
+    @unittest.skipIf(not config.USE_STANDIN, 'needs the stand-in server')
+    def test_submit_async_cancel(self):
+        """Verify a queued submission can be cancelled, and one being sent cannot."""
+        with StandInServer(job_duration=0.1, latency=0.2) as standin:
+            task = Server(standin.host, str(standin.port)).service(
+                config.GSF_SERVICE['name']).task(config.GSF_TASK['name'])
+            executor = ThreadPoolExecutor(max_workers=1)
+            release = threading.Event()
+            executor.submit(release.wait)
+            queued = task.submit_async(config.GSF_TASK['parameters'], executor=executor)
+            self.assertTrue(queued.cancel())
+            release.set()
+
+            sending = task.submit_async(config.GSF_TASK['parameters'], executor=executor)
+            deadline = time.time() + 5
+            while not sending.running() and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertFalse(sending.cancel())
+            self.assertIsInstance(sending.result(timeout=10), dict)
+            executor.shutdown()
+            self.assertEqual(standin.requests['submitJob'], 1)
+
+    @unittest.skipIf(not config.USE_STANDIN, 'needs the stand-in server')
+    def test_submit_async_errors(self):
+        """Verify submission errors are raised by the future."""
+        with StandInServer() as standin:
+            service = Server(standin.host, str(standin.port)).service(config.GSF_SERVICE['name'])
+            future = service.task(config.GSF_TASK['name']).submit_async(
+                dict(config.GSF_TASK['parameters'], INDEX='doesnotexist'))
+            with self.assertRaises(ParameterValidationError):
+                future.result(timeout=10)
+            future = service.task('doesnotexist').submit_async(config.GSF_TASK['parameters'])
+            with self.assertRaises(TaskNotFoundError):
+                future.result(timeout=10)
+
+    def test_submit_many(self):
+        """Verify submit_many returns a job per input in order and records failures."""
+        parameters_list = [config.GSF_TASK['parameters'], dict(INVALID=object()),
+                           config.GSF_TASK['parameters']]
+        batch = self.task.submit_many(parameters_list, concurrency=2)
+        self.assertEqual(len(batch), 3)
+        self.assertIsInstance(batch[0], Job)
+        self.assertIsNone(batch[1])
+        self.assertEqual(list(batch.errors), [1])
+        self.assertEqual(len(batch.jobs()), 2)
+
+    def test_submit_many_invalid_id(self):
+        """Verify a job id that is not an integer is recorded as an error of its submission."""
+        task = self.service.task(config.GSF_TASK['name'])
+        job_ids = iter(['7', 'not a number', 9])
+        task._submit = lambda parameters: next(job_ids)
+        batch = task.submit_many([config.GSF_TASK['parameters']] * 3, concurrency=1)
+        self.assertEqual(batch.job_ids, [7, None, 9])
+        self.assertIsInstance(batch.errors[1], ValueError)
+        self.assertIn('not a number', str(batch.errors[1]))
+
+    def test_parse_task_info(self):
+        """Verify parsing a task description leaves the shared document unchanged."""
+        info = copy.deepcopy(SPECTRAL_INDEX)
+        parsed = _parse_task_info(info)
+        self.assertEqual(info, SPECTRAL_INDEX)
+        self.assertEqual(parsed['parameters'][0]['display_name'], 'Input Raster')
+
     def test_invalid_task(self):
         """Verify an invalid task name throws an exception."""
         task = self.service.task('ehfaefehfeabr')
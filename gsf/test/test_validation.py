@@ -0,0 +1,63 @@
+"""
+Tests the client-side parameter validation
+"""
+import unittest
+
+from gsf.error import ParameterValidationError
+from gsf.ese.validation import ParameterValidator
+
+PARAMETERS = [
+    dict(name='INPUT_RASTER', type='ENVIRASTER', direction='input', required=True),
+    dict(name='INDEX', type='STRING', direction='input', required=True,
+         choice_list=['Normalized Difference Vegetation Index', 'Other']),
+    dict(name='GAIN', type='DOUBLE', dimensions='[*]', direction='input', required=False,
+         min=0, max=10),
+    dict(name='KERNEL', type='BYTE', dimensions='[3,2]', direction='input', required=False),
+    dict(name='OUTPUT_RASTER', type='ENVIRASTER', direction='output', required=True),
+]
+
+VALID = dict(INPUT_RASTER=dict(url='http://localhost:9191/ese/data/qb_boulder_msi',
+                               factory='URLRaster'),
+             INDEX='Other')
+
+
+class TestParameterValidator(unittest.TestCase):
+    """
+    Test the client-side parameter validation
+    """
+    def setUp(self):
+        self.validator = ParameterValidator(PARAMETERS)
+
+    def codes(self, **parameters):
+        return [(error.parameter, error.code)
+                for error in self.validator.errors(dict(VALID, **parameters))]
+
+    def test_valid(self):
+        """Verify valid parameters produce no errors and required outputs are not required."""
+        self.assertEqual(self.codes(GAIN=[0.5, 2], KERNEL=[[1, 2, 3], [4, 5, 6]]), [])
+        self.validator.validate(VALID)
+
+    def test_missing_and_unknown(self):
+        """Verify missing required and unknown parameters are reported."""
+        errors = self.validator.errors(dict(INDEX='Other', INDX='Other'))
+        self.assertEqual([(error.parameter, error.code) for error in errors],
+                         [('INPUT_RASTER', 'missing'), ('INDX', 'unknown')])
+
+    def test_values(self):
+        """Verify type, choice, range and dimension errors are reported."""
+        self.assertEqual(self.codes(INDEX='NDVI'), [('INDEX', 'choice')])
+        self.assertEqual(self.codes(GAIN=[1, 'a']), [('GAIN', 'type')])
+        self.assertEqual(self.codes(GAIN=[1, 11]), [('GAIN', 'range')])
+        self.assertEqual(self.codes(GAIN=1.0), [('GAIN', 'dimensions')])
+        self.assertEqual(self.codes(KERNEL=[[1, 2], [3, 4], [5, 6]]), [('KERNEL', 'dimensions')])
+        self.assertEqual(self.codes(KERNEL=[[1, 2, 3], [4, 5, 256]]), [('KERNEL', 'range')])
+
+    def test_validate_raises(self):
+        """Verify validate raises with every error attached."""
+        with self.assertRaises(ParameterValidationError) as context:
+            self.validator.validate(dict(INDEX='NDVI'))
+        self.assertEqual(len(context.exception.errors), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
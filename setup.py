@@ -48,7 +48,10 @@ setup(name='gsf',
       author='Exelis Visual Information Solutions, Inc.',
       author_email='gsf@harris.com',
       packages=['gsf',
-                'gsf.ese'],
+                'gsf.ese',
+                'gsf.local'],
+      install_requires=['futures; python_version < "3"'],
+      extras_require=dict(fast=['orjson'], numpy=['numpy']),
       cmdclass=dict(test=TestCommand),
       license='MIT',
       keywords='gsf envi idl',